@@ -0,0 +1,85 @@
+"""
+Message Templates for the Overlapping Intervals Tracer
+======================================================
+
+The 'action' and 'explanation' text of every trace step comes from these
+templates, keyed '<phase>.<field>'. The tracer can leave the text
+unrendered (render_messages=False), in which case each field holds just
+the template's argument list, and render_step() fills it in when the step
+is displayed.
+"""
+
+from typing import Dict, Any
+
+
+MESSAGES = {
+    'initialization.action': "Algorithm started",
+    'initialization.explanation': "Input: {0} intervals to process",
+
+    'sorting.action': "Sorted intervals",
+    'sorting.explanation': (
+        "Sorted by start time (ascending), then end time (descending). "
+        "This ensures longer intervals come first when starts are equal."
+    ),
+
+    'recursive_call.action': "Enter recursive call (depth {0})",
+    'recursive_call.explanation': (
+        "Processing {0} remaining interval(s) "
+        "with max_end_so_far = {1}"
+    ),
+
+    'base_case.action': "Base case reached",
+    'base_case.explanation': "No more intervals to process. Return empty list.",
+
+    'examination.action': "Examining interval {0}",
+    'examination.explanation': (
+        "Current interval: {0}. Checking if covered by max_end_so_far ({1})."
+    ),
+
+    'decision_covered.action': "Interval {0} is COVERED",
+    'decision_covered.explanation': (
+        "Since {0} ≤ {1}, this interval ends before or at "
+        "the current maximum end time. It is completely covered by a previous interval. "
+        "Skip this interval and continue with the rest."
+    ),
+
+    'decision_keep.action': "Interval {0} is NOT COVERED",
+    'decision_keep.explanation': (
+        "Since {0} > {1}, this interval extends beyond "
+        "the current maximum end time. Keep this interval in the result. "
+        "Update max_end_so_far from {1} to {2}."
+    ),
+
+    'return.action': "Return from depth {0}",
+    'return.explanation': "Returning {0} interval(s) to caller.",
+
+    'completion.action': "Algorithm completed",
+    'completion.explanation': (
+        "Removed {0} covered interval(s). "
+        "Result contains {1} interval(s)."
+    ),
+}
+
+MESSAGE_FIELDS = ('action', 'explanation')
+
+
+def render_step(step: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render the message fields of a step.
+
+    Args:
+        step: Trace step, with rendered or unrendered message fields
+
+    Returns:
+        The step with 'action' and 'explanation' as text (the step itself
+        if they already are)
+    """
+    if all(isinstance(step.get(field), str) for field in MESSAGE_FIELDS):
+        return step
+
+    rendered = dict(step)
+    for field in MESSAGE_FIELDS:
+        args = step.get(field)
+        if args is not None and not isinstance(args, str):
+            rendered[field] = MESSAGES[f"{step['phase']}.{field}"].format(*args)
+    return rendered
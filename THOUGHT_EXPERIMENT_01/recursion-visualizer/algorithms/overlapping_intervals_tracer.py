@@ -4,10 +4,14 @@ Instrumented Overlapping Intervals Algorithm with Trace Capture
 
 This module provides a tracer version of the overlapping intervals algorithm
 that captures execution steps for visualization purposes.
+
+Step text comes from the templates in overlapping_intervals_messages.
 """
 
 from typing import List, Tuple, Dict, Any
 
+from overlapping_intervals_messages import MESSAGES
+
 
 class OverlappingIntervalsTracer:
     """
@@ -16,9 +20,16 @@ class OverlappingIntervalsTracer:
     Captures each step of the recursive algorithm for later visualization.
     """
     
-    def __init__(self):
+    def __init__(self, render_messages: bool = True):
+        """
+        Args:
+            render_messages: If False, leave each step's 'action' and
+                'explanation' unrendered, as template argument lists; see
+                overlapping_intervals_messages.render_step()
+        """
         self.trace: List[Dict[str, Any]] = []
         self.step_counter = 0
+        self.render_messages = render_messages
         
     def run(self, intervals: List[Tuple[int, int]]) -> Dict[str, Any]:
         """
@@ -39,8 +50,8 @@ class OverlappingIntervalsTracer:
         # Capture initial state
         self._add_step(
             phase="initialization",
-            action="Algorithm started",
-            explanation=f"Input: {len(intervals)} intervals to process",
+            action=self._message("initialization.action"),
+            explanation=self._message("initialization.explanation", len(intervals)),
             intervals_state=self._create_intervals_state(intervals, "pending"),
             variables={
                 "input_intervals": intervals,
@@ -53,11 +64,8 @@ class OverlappingIntervalsTracer:
         
         self._add_step(
             phase="sorting",
-            action="Sorted intervals",
-            explanation=(
-                "Sorted by start time (ascending), then end time (descending). "
-                "This ensures longer intervals come first when starts are equal."
-            ),
+            action=self._message("sorting.action"),
+            explanation=self._message("sorting.explanation"),
             intervals_state=self._create_intervals_state(sorted_intervals, "sorted"),
             variables={
                 "sorted_intervals": sorted_intervals,
@@ -72,10 +80,9 @@ class OverlappingIntervalsTracer:
         # Capture final state
         self._add_step(
             phase="completion",
-            action="Algorithm completed",
-            explanation=(
-                f"Removed {len(intervals) - len(result)} covered interval(s). "
-                f"Result contains {len(result)} interval(s)."
+            action=self._message("completion.action"),
+            explanation=self._message(
+                "completion.explanation", len(intervals) - len(result), len(result)
             ),
             intervals_state=self._create_final_state(sorted_intervals, result),
             variables={
@@ -131,10 +138,9 @@ class OverlappingIntervalsTracer:
         # Capture recursive call entry
         self._add_step(
             phase="recursive_call",
-            action=f"Enter recursive call (depth {depth})",
-            explanation=(
-                f"Processing {len(remaining)} remaining interval(s) "
-                f"with max_end_so_far = {max_end_so_far}"
+            action=self._message("recursive_call.action", depth),
+            explanation=self._message(
+                "recursive_call.explanation", len(remaining), max_end_so_far
             ),
             intervals_state=self._create_intervals_state(remaining, "examining"),
             variables={
@@ -151,8 +157,8 @@ class OverlappingIntervalsTracer:
         if not remaining:
             self._add_step(
                 phase="base_case",
-                action="Base case reached",
-                explanation="No more intervals to process. Return empty list.",
+                action=self._message("base_case.action"),
+                explanation=self._message("base_case.explanation"),
                 intervals_state=[],
                 variables={
                     "remaining": [],
@@ -171,8 +177,8 @@ class OverlappingIntervalsTracer:
         
         self._add_step(
             phase="examination",
-            action=f"Examining interval {current}",
-            explanation=f"Current interval: {current}. Checking if covered by max_end_so_far ({max_end_so_far}).",
+            action=self._message("examination.action", current),
+            explanation=self._message("examination.explanation", current, max_end_so_far),
             intervals_state=self._mark_current(remaining, current),
             variables={
                 "current": current,
@@ -189,11 +195,9 @@ class OverlappingIntervalsTracer:
             # COVERED
             self._add_step(
                 phase="decision_covered",
-                action=f"Interval {current} is COVERED",
-                explanation=(
-                    f"Since {current[1]} ≤ {max_end_so_far}, this interval ends before or at "
-                    f"the current maximum end time. It is completely covered by a previous interval. "
-                    f"Skip this interval and continue with the rest."
+                action=self._message("decision_covered.action", current),
+                explanation=self._message(
+                    "decision_covered.explanation", current[1], max_end_so_far
                 ),
                 intervals_state=self._mark_covered(remaining, current),
                 variables={
@@ -215,11 +219,9 @@ class OverlappingIntervalsTracer:
             
             self._add_step(
                 phase="decision_keep",
-                action=f"Interval {current} is NOT COVERED",
-                explanation=(
-                    f"Since {current[1]} > {max_end_so_far}, this interval extends beyond "
-                    f"the current maximum end time. Keep this interval in the result. "
-                    f"Update max_end_so_far from {max_end_so_far} to {new_max_end}."
+                action=self._message("decision_keep.action", current),
+                explanation=self._message(
+                    "decision_keep.explanation", current[1], max_end_so_far, new_max_end
                 ),
                 intervals_state=self._mark_kept(remaining, current),
                 variables={
@@ -239,8 +241,8 @@ class OverlappingIntervalsTracer:
         # Capture return
         self._add_step(
             phase="return",
-            action=f"Return from depth {depth}",
-            explanation=f"Returning {len(result)} interval(s) to caller.",
+            action=self._message("return.action", depth),
+            explanation=self._message("return.explanation", len(result)),
             intervals_state=self._create_intervals_state(result, "result"),
             variables={
                 "result": result,
@@ -254,6 +256,12 @@ class OverlappingIntervalsTracer:
         
         return result
     
+    def _message(self, template_id: str, *args) -> Any:
+        """Render a message template, or keep its arguments if rendering is off."""
+        if self.render_messages:
+            return MESSAGES[template_id].format(*args)
+        return list(args)
+    
     def _add_step(self, **kwargs):
         """Add a step to the trace."""
         step = {
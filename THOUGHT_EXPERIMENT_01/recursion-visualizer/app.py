@@ -13,6 +13,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent / 'algorithms'))
 
 from overlapping_intervals_tracer import OverlappingIntervalsTracer
+from overlapping_intervals_messages import render_step
 
 app = Flask(__name__)
 app.secret_key = 'dev-secret-key-change-in-production'  # Change this in production!
@@ -48,6 +49,9 @@ def problem(algorithm_id):
     2. Captures the full execution trace
     3. Stores trace in session
     4. Renders the visualization page at step 0
+    
+    Step text is stored unrendered (template arguments only), which keeps
+    the session small; each step is rendered when it is displayed.
     """
     if algorithm_id != 'overlapping-intervals':
         return "Algorithm not found", 404
@@ -56,7 +60,7 @@ def problem(algorithm_id):
     test_intervals = [(540, 660), (600, 720), (540, 720), (900, 960)]
     
     # Run tracer
-    tracer = OverlappingIntervalsTracer()
+    tracer = OverlappingIntervalsTracer(render_messages=False)
     output = tracer.run(test_intervals)
     
     # Store in session
@@ -67,7 +71,7 @@ def problem(algorithm_id):
     session['current_step'] = 0
     
     # Get first step data
-    step_data = output['trace'][0]
+    step_data = render_step(output['trace'][0])
     total_steps = len(output['trace'])
     
     return render_template(
@@ -104,7 +108,7 @@ def get_step(algorithm_id, step_num):
     session['current_step'] = step_num
     
     # Get step data
-    step_data = trace[step_num]
+    step_data = render_step(trace[step_num])
     
     return render_template(
         'partials/step.html',
@@ -166,7 +170,7 @@ def debug_trace():
         'total_steps': len(session['trace']),
         'current_step': session.get('current_step', 0),
         'metadata': session.get('metadata', {}),
-        'sample_steps': session['trace'][:3]  # Show first 3 steps
+        'sample_steps': [render_step(step) for step in session['trace'][:3]]  # Show first 3 steps
     })
 
 
@@ -4,42 +4,289 @@ Provides consistent interface and metadata loading.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import inspect
 import json
 import os
 
+from core.cost import CostModel
+from core.validation import ValidationError, Validator, compile_schema
+import config
+
+
+# metadata.json path -> (mtime, parsed metadata)
+_metadata_cache: Dict[str, Tuple[Optional[float], Optional[Dict]]] = {}
+# Bumped whenever any metadata is (re)loaded
+_metadata_generation = 0
+
+
+def read_metadata(path: str) -> Optional[Dict]:
+    """
+    Read a metadata.json, parsing it again only when its mtime changes.
+    
+    Args:
+        path: Path of the metadata.json file
+    
+    Returns:
+        Parsed metadata (shared between callers, do not modify), or None
+        if the file doesn't exist
+    """
+    global _metadata_generation
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+    
+    cached = _metadata_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    metadata = None
+    if mtime is not None:
+        with open(path, 'r') as f:
+            metadata = json.load(f)
+    _metadata_cache[path] = (mtime, metadata)
+    _metadata_generation += 1
+    return metadata
+
+
+def metadata_generation() -> int:
+    """Get a counter that changes whenever any metadata is (re)loaded"""
+    return _metadata_generation
+
 
 class BaseAlgorithm(ABC):
     """Abstract base class for all algorithms"""
     
-    def __init__(self):
-        self.metadata = self.load_metadata()
+    @property
+    def metadata(self) -> Dict:
+        """Algorithm metadata (shared, do not modify)"""
+        return self.get_metadata()
     
-    @abstractmethod
-    def execute_traced(self, input_data: Any) -> Tuple[Dict, Any]:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Each default is built on the other, so one of them must be overridden
+        if (cls.iter_traced is BaseAlgorithm.iter_traced
+                and cls.execute_traced is BaseAlgorithm.execute_traced):
+            raise TypeError(
+                f"{cls.__name__} must implement iter_traced() or execute_traced()"
+            )
+    
+    def iter_traced(self, input_data: Any, **options) -> Iterator[Tuple[str, Any]]:
+        """
+        Execute algorithm, yielding trace events as they happen.
+        
+        Events are (kind, value) pairs, in this order:
+            ('metadata', dict): the trace metadata, once
+            ('step', dict): one per step, in step_number order
+            ('trace', dict): the complete trace, except its steps, once
+            ('result', value): the algorithm's result, once
+        
+        Closing the generator early stops the algorithm. The default
+        runs execute_traced() and replays its trace, for algorithms that
+        only implement that.
+        
+        Args:
+            input_data: Algorithm input (format depends on algorithm)
+            **options: Algorithm-specific trace options (e.g. normalized)
+        """
+        trace, result = self.execute_traced(input_data, **options)
+        yield 'metadata', trace.get('metadata', {})
+        for step in trace.get('steps', []):
+            yield 'step', step
+        yield 'trace', {**trace, 'steps': []}
+        yield 'result', result
+    
+    def execute_traced(self, input_data: Any, **options) -> Tuple[Dict, Any]:
         """
         Execute algorithm with full trace capture.
         
+        The default collects the events of iter_traced().
+        
         Args:
             input_data: Algorithm input (format depends on algorithm)
+            **options: Algorithm-specific trace options (e.g. normalized)
         
         Returns:
             tuple: (trace_dict, result)
         """
-        pass
+        return self.collect_trace(input_data, **options)
+    
+    def collect_trace(self, input_data: Any, max_steps: Optional[int] = None,
+                      cancel: Any = None, progress: Optional[Callable[[int], Any]] = None,
+                      **options) -> Tuple[Dict, Any]:
+        """
+        Run iter_traced() and collect its events into (trace_dict, result).
+        
+        When the step budget runs out or the run is cancelled, the algorithm
+        is stopped and the trace holds the steps so far, with 'truncated'
+        or 'cancelled' set to True and no result.
+        
+        Args:
+            input_data: Algorithm input (format depends on algorithm)
+            max_steps: Step budget (default: unlimited)
+            cancel: Checked before each step, e.g. a threading.Event; the
+                run stops once cancel.is_set() is True
+            progress: Called with the step count after each step
+            **options: Algorithm-specific trace options (e.g. normalized)
+        
+        Returns:
+            tuple: (trace_dict, result)
+        """
+        metadata: Dict = {}
+        steps = []
+        trace = None
+        result = None
+        stopped = None
+        
+        events = self.iter_traced(input_data, **options)
+        try:
+            for kind, value in events:
+                if kind == 'step':
+                    if cancel is not None and cancel.is_set():
+                        stopped = 'cancelled'
+                        break
+                    if max_steps is not None and len(steps) >= max_steps:
+                        stopped = 'truncated'
+                        break
+                    steps.append(value)
+                    if progress is not None:
+                        progress(len(steps))
+                elif kind == 'metadata':
+                    metadata = value
+                elif kind == 'trace':
+                    trace = value
+                elif kind == 'result':
+                    result = value
+        finally:
+            events.close()
+        
+        if stopped is not None:
+            return {
+                'metadata': metadata,
+                'steps': steps,
+                'total_steps': len(steps),
+                'duration': steps[-1]['timestamp'] if steps else 0,
+                stopped: True
+            }, None
+        return {**trace, 'steps': steps}, result
     
-    @abstractmethod
     def validate_input(self, input_data: Any) -> bool:
         """
         Validate input data format.
         
+        The default checks it against metadata['input_schema'] (anything
+        passes without one). Override for checks a schema can't express.
+        
         Args:
             input_data: Data to validate
         
         Returns:
             bool: True if valid, False otherwise
         """
-        pass
+        validator = self.get_input_validator()
+        if validator is None:
+            return True
+        try:
+            validator(input_data)
+        except ValidationError:
+            return False
+        return True
+    
+    def check_input(self, input_data: Any) -> Any:
+        """
+        Validate input data and get it in the form iter_traced() takes.
+        
+        Uses the input_schema validator, unless the class overrides
+        validate_input(). Schema inputs given as columns come back as
+        lists of records.
+        
+        Raises:
+            ValidationError: If the input is invalid
+        """
+        if type(self).validate_input is not BaseAlgorithm.validate_input:
+            if not self.validate_input(input_data):
+                raise ValidationError('Input does not match expected schema')
+            return input_data
+        validator = self.get_input_validator()
+        return input_data if validator is None else validator(input_data)
+    
+    @classmethod
+    def get_input_validator(cls) -> Optional[Validator]:
+        """
+        Get the validator compiled from metadata['input_schema'].
+        
+        Compiled again only when the metadata is reloaded. Inputs are
+        limited to config.MAX_INPUT_ITEMS records.
+        
+        Returns:
+            The validator, or None if the metadata has no input_schema
+        """
+        metadata = cls.get_metadata()
+        cached = cls.__dict__.get('_input_validator')
+        if cached is None or cached[0] is not metadata:
+            cached = (metadata, compile_schema(metadata.get('input_schema'),
+                                               config.MAX_INPUT_ITEMS))
+            cls._input_validator = cached
+        return cached[1]
+    
+    def input_size(self, input_data: Any) -> int:
+        """
+        Get the size n of a (checked) input, as used by the cost model.
+        
+        The default counts the records of the input_schema.
+        """
+        validator = self.get_input_validator()
+        if validator is not None and isinstance(input_data, dict):
+            return len(input_data.get(validator.key, ()))
+        return len(input_data) if hasattr(input_data, '__len__') else 1
+    
+    def generate_input(self, n: int) -> Any:
+        """
+        Generate an input of size n, for cost model calibration.
+        
+        Raises:
+            NotImplementedError: If the algorithm can't generate inputs
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not generate inputs")
+    
+    def estimate_cost(self, input_data: Any, mode: str = 'trace', level: str = 'full',
+                      normalized: bool = False, max_steps: Optional[int] = None,
+                      **options) -> Optional[Dict[str, int]]:
+        """
+        Predict the steps, bytes and ms of a run from the cost model.
+        
+        Args:
+            input_data: Checked input (see check_input)
+            mode, level, normalized, max_steps: The run's trace options;
+                others don't change the estimate
+        
+        Returns:
+            {'steps', 'bytes', 'ms'}, or None if the algorithm has no cost
+            model for these options
+        """
+        return self.get_cost_model().estimate(
+            self.input_size(input_data), mode, level, normalized, max_steps
+        )
+    
+    @classmethod
+    def cost_model_path(cls) -> str:
+        """Get the path of cost_model.json, next to metadata.json"""
+        return os.path.join(os.path.dirname(cls.metadata_path()), 'cost_model.json')
+    
+    @classmethod
+    def get_cost_model(cls) -> CostModel:
+        """
+        Get the cost model calibrated by `python -m core.cost <id>`.
+        
+        Re-read only when cost_model.json changes; empty if there is none.
+        """
+        model = read_metadata(cls.cost_model_path())
+        cached = cls.__dict__.get('_cost_model')
+        if cached is None or cached[0] is not model:
+            cached = (model, CostModel(model))
+            cls._cost_model = cached
+        return cached[1]
     
     @abstractmethod
     def get_default_example(self) -> Any:
@@ -51,25 +298,37 @@ class BaseAlgorithm(ABC):
         """
         pass
     
-    def load_metadata(self) -> Dict:
-        """Load metadata.json from algorithm directory"""
-        # Get the directory where the algorithm class is defined
-        import inspect
-        class_file = inspect.getfile(self.__class__)
-        class_dir = os.path.dirname(class_file)
-        metadata_path = os.path.join(class_dir, 'metadata.json')
-        
-        if os.path.exists(metadata_path):
-            with open(metadata_path, 'r') as f:
-                return json.load(f)
-        else:
+    @classmethod
+    def metadata_path(cls) -> str:
+        """Get the path of metadata.json in the algorithm's directory"""
+        path = cls.__dict__.get('_metadata_path')
+        if path is None:
+            # Get the directory where the algorithm class is defined
+            class_dir = os.path.dirname(inspect.getfile(cls))
+            path = os.path.join(class_dir, 'metadata.json')
+            cls._metadata_path = path
+        return path
+    
+    @classmethod
+    def get_metadata(cls) -> Dict:
+        """
+        Get the algorithm's metadata, loaded once per metadata.json.
+        
+        The file is re-read only when its mtime changes.
+        
+        Returns:
+            Parsed metadata (shared between callers, do not modify)
+        """
+        metadata = read_metadata(cls.metadata_path())
+        if metadata is None:
             # Return minimal metadata if file doesn't exist
-            return {
-                'id': self.__class__.__name__.lower(),
-                'name': self.__class__.__name__,
+            metadata = {
+                'id': cls.__name__.lower(),
+                'name': cls.__name__,
                 'category': 'Unknown',
                 'description': 'No description available'
             }
+        return metadata
     
     @property
     def id(self) -> str:
@@ -81,6 +340,11 @@ class BaseAlgorithm(ABC):
         """Get algorithm name"""
         return self.metadata['name']
     
+    @property
+    def version(self) -> str:
+        """Get algorithm version (bump it whenever the trace output changes)"""
+        return self.metadata.get('version', '0')
+    
     @property
     def category(self) -> str:
         """Get algorithm category"""
@@ -3,6 +3,7 @@ Remove Covered Intervals Algorithm
 Removes all intervals that are completely covered by other intervals.
 """
 
+import random
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -10,6 +11,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from algorithms.base_algorithm import BaseAlgorithm
 from algorithms.registry import registry
 from core.tracer import TraceGenerator
+from algorithms.interval_coverage.engine import solve
+from algorithms.interval_coverage.parallel import solve_parallel
+
+
+# 'trace': the full recursive trace. 'decisions': only the DECISION_MADE
+# steps, emitted in bulk from the vectorized engine. 'result': no steps.
+# 'parallel': a coarse trace of the multi-core divide and conquer.
+TRACE_MODES = ('trace', 'decisions', 'result', 'parallel')
 
 
 @registry.register
@@ -23,113 +32,173 @@ class IntervalCoverageAlgorithm(BaseAlgorithm):
     2. Recursively filter: keep interval if its end extends beyond max_end
     """
 
-    def validate_input(self, input_data):
-        """Validate intervals format"""
-        if not isinstance(input_data, dict):
-            return False
-
-        if 'intervals' not in input_data:
-            return False
-
-        intervals = input_data['intervals']
-        if not isinstance(intervals, list):
-            return False
+    trace_modes = TRACE_MODES
+
+    def iter_traced(self, input_data, normalized=False, render_messages=True,
+                    mode='trace', workers=None, level='full', include=(),
+                    exclude=()):
+        """
+        Execute with full trace capture, yielding steps as they are captured.
+
+        Args:
+            input_data: {'intervals': [...]}
+            normalized: If True, list the intervals once in the trace's
+                interval_table and refer to them by row index in every step.
+                Sub-lists of the sorted intervals become [start, stop)
+                ranges into the trace's sorted_order.
+            render_messages: If False, leave the comparison / reason /
+                efficiency texts unrendered, as argument lists for the
+                templates in metadata['messages'].
+            mode: 'trace' (default) for the full recursive trace,
+                'decisions' for just the DECISION_MADE steps, or 'result'
+                for no steps at all. The last two decide every interval
+                at once with the vectorized engine. 'parallel' sorts
+                chunks of the input in worker processes and traces only
+                the chunks and the max_end carried between them.
+            workers: Worker processes for 'parallel' (default: one per CPU)
+            level: Capture level - 'summary' (input, sorted order and
+                result), 'decisions' (plus every keep/covered decision) or
+                'full' (plus every call); see metadata['event_levels']
+            include: Event types to capture whatever the level
+            exclude: Event types not to capture
+
+        Yields:
+            Trace events, see BaseAlgorithm.iter_traced()
+        """
+        if mode not in TRACE_MODES:
+            raise ValueError(f"Unknown trace mode: {mode}")
 
-        # Check each interval has required fields
-        for interval in intervals:
-            if not isinstance(interval, dict):
-                return False
-            required_fields = ['start', 'end']
-            if not all(k in interval for k in required_fields):
-                return False
-            if interval['start'] >= interval['end']:
-                return False
-
-        return True
-
-    def execute_traced(self, input_data):
-        """Execute with full trace capture"""
         intervals = input_data['intervals']
-        tracer = TraceGenerator()
+        tracer = TraceGenerator(
+            self.metadata.get('messages'),
+            render_messages,
+            # 'decisions' captures a step per interval before its one flush
+            columnar=mode == 'decisions',
+            level=level,
+            event_levels=self.metadata.get('event_levels'),
+            include=include,
+            exclude=exclude
+        )
 
         # Set metadata
         tracer.set_metadata({
             'algorithm': self.id,
             'input_size': len(intervals),
-            'algorithm_name': self.name
+            'algorithm_name': self.name,
+            'trace_format': 'normalized' if normalized else 'full',
+            'messages': 'rendered' if render_messages else 'templates',
+            'mode': mode,
+            'level': level,
+            'include': sorted(tracer.include),
+            'exclude': sorted(tracer.exclude)
         })
+        yield 'metadata', tracer.metadata
+
+        if mode == 'parallel':
+            yield from self._execute_parallel(intervals, tracer, workers)
+            return
+        if mode != 'trace':
+            yield from self._execute_vectorized(intervals, tracer, normalized, mode)
+            return
 
         # Capture initial state
-        tracer.capture('INITIAL_STATE', {
-            'intervals': intervals,
-            'count': len(intervals),
-            'description': 'Original unsorted intervals'
-        })
+        if tracer.wants('INITIAL_STATE'):
+            tracer.capture('INITIAL_STATE', {
+                'intervals': list(range(len(intervals))) if normalized else intervals,
+                'count': len(intervals),
+                'description': 'Original unsorted intervals'
+            })
 
         # Sort intervals
         tracer.capture('SORT_BEGIN', {
             'description': 'Sorting by (start ↑, end ↓)'
         })
 
-        sorted_intervals = sorted(
-            intervals,
-            key=lambda x: (x['start'], -x['end'])
+        order = sorted(
+            range(len(intervals)),
+            key=lambda row: (intervals[row]['start'], -intervals[row]['end'])
         )
+        sorted_intervals = [intervals[row] for row in order]
+
+        # Steps carry either the interval itself or its interval_table row
+        interval_values = order if normalized else sorted_intervals
 
         tracer.capture('SORT_COMPLETE', {
-            'sorted_intervals': sorted_intervals,
+            'sorted_intervals': [0, len(order)] if normalized else sorted_intervals,
             'description': 'Intervals sorted - ready for recursion'
         })
-
-        # Recursive processing with detailed trace
-        def recurse(remaining, max_end, depth, parent_id):
-            """
-            Recursive function to filter covered intervals.
-
-            Args:
-                remaining: List of intervals still to process
-                max_end: Maximum end value seen so far
-                depth: Current recursion depth
-                parent_id: ID of parent call (for tree structure)
-
-            Returns:
-                List of intervals to keep
-            """
+        yield from tracer.flush()
+
+        # Checked once: at lower levels most steps are skipped before their
+        # payload is built
+        wants_call_start = tracer.wants('CALL_START')
+        wants_base_case = tracer.wants('BASE_CASE')
+        wants_call_return = tracer.wants('CALL_RETURN')
+        wants_examining = tracer.wants('EXAMINING_INTERVAL')
+        wants_decision = tracer.wants('DECISION_MADE')
+        wants_max_end_update = tracer.wants('MAX_END_UPDATE')
+
+        # Recursive processing with detailed trace.
+        # The recursion runs on an explicit stack of frames instead of Python
+        # frames, so large inputs don't hit the interpreter's recursion limit.
+        # Each frame is (call_id, depth, kept_index); its return value is
+        # kept[kept_index:], the intervals kept from its position onwards.
+        frames = []
+        kept = []
+        kept_values = []
+        max_end = None
+        parent_id = None
+
+        # Descend: one call per interval, then the base case call
+        for position in range(len(sorted_intervals) + 1):
             call_id = tracer.next_call_id()
+            depth = position
+            remaining_count = len(sorted_intervals) - position
 
-            # Capture call start
-            tracer.capture('CALL_START', {
-                'call_id': call_id,
-                'depth': depth,
-                'remaining_count': len(remaining),
-                'remaining': remaining,
-                'max_end': max_end,
-                'parent_id': parent_id
-            })
-
-            # Base case: no more intervals
-            if not remaining:
-                tracer.capture('BASE_CASE', {
+            # Capture call start (normalized traces don't copy the sublist)
+            if wants_call_start:
+                tracer.capture('CALL_START', {
                     'call_id': call_id,
-                    'description': 'No intervals remaining - return empty list'
+                    'depth': depth,
+                    'remaining_count': remaining_count,
+                    'remaining': (
+                        [position, len(order)] if normalized
+                        else sorted_intervals[position:]
+                    ),
+                    'max_end': max_end,
+                    'parent_id': parent_id
                 })
 
-                tracer.capture('CALL_RETURN', {
-                    'call_id': call_id,
-                    'return_value': [],
-                    'depth': depth
-                })
-                return []
+            # Base case: no more intervals
+            if not remaining_count:
+                if wants_base_case:
+                    tracer.capture('BASE_CASE', {
+                        'call_id': call_id,
+                        'description': 'No intervals remaining - return empty list'
+                    })
+
+                if wants_call_return:
+                    tracer.capture('CALL_RETURN', {
+                        'call_id': call_id,
+                        'return_value': [],
+                        'depth': depth
+                    })
+                yield from tracer.flush()
+                break
 
             # Get current interval
-            current = remaining[0]
+            current = sorted_intervals[position]
+            current_value = interval_values[position]
 
-            tracer.capture('EXAMINING_INTERVAL', {
-                'call_id': call_id,
-                'interval': current,
-                'max_end': max_end,
-                'comparison': f"{current['end']} vs {max_end}"
-            })
+            if wants_examining:
+                tracer.capture('EXAMINING_INTERVAL', {
+                    'call_id': call_id,
+                    'interval': current_value,
+                    'max_end': max_end,
+                    'comparison': tracer.message(
+                        'EXAMINING_INTERVAL.comparison', current['end'], max_end
+                    )
+                })
 
             # Decision: covered or keep?
             # If max_end is None, this is the first interval - keep it
@@ -139,65 +208,237 @@ class IntervalCoverageAlgorithm(BaseAlgorithm):
                 is_covered = current['end'] <= max_end
             decision = 'covered' if is_covered else 'keep'
 
-            tracer.capture('DECISION_MADE', {
-                'call_id': call_id,
-                'interval': current,
-                'decision': decision,
-                'reason': f"end={current['end']} {'<=' if is_covered else '>'} max_end={max_end if max_end is not None else 'None (first)'}",
-                'will_keep': not is_covered
-            })
+            if wants_decision:
+                tracer.capture('DECISION_MADE', {
+                    'call_id': call_id,
+                    'interval': current_value,
+                    'decision': decision,
+                    'reason': tracer.message(
+                        'DECISION_MADE.reason',
+                        current['end'],
+                        '<=' if is_covered else '>',
+                        max_end if max_end is not None else 'None (first)'
+                    ),
+                    'will_keep': not is_covered
+                })
+
+            frames.append((call_id, depth, len(kept)))
 
             # Update max_end if keeping interval
-            new_max_end = max_end
             if decision == 'keep':
                 # If max_end is None, just use current end
                 if max_end is None:
                     new_max_end = current['end']
                 else:
                     new_max_end = max(max_end, current['end'])
-                tracer.capture('MAX_END_UPDATE', {
-                    'call_id': call_id,
-                    'old_max_end': max_end,
-                    'new_max_end': new_max_end,
-                    'interval': current
-                })
+                if wants_max_end_update:
+                    tracer.capture('MAX_END_UPDATE', {
+                        'call_id': call_id,
+                        'old_max_end': max_end,
+                        'new_max_end': new_max_end,
+                        'interval': current_value
+                    })
+                kept.append(current)
+                kept_values.append(current_value)
+                max_end = new_max_end
 
             # Recursive call for remaining intervals
-            child_result = recurse(
-                remaining[1:],
-                new_max_end,
-                depth + 1,
-                call_id
-            )
+            parent_id = call_id
+            yield from tracer.flush()
 
-            # Build result
-            if decision == 'keep':
-                result = [current] + child_result
-            else:
-                result = child_result
+        # Unwind: return from calls innermost first
+        while frames and wants_call_return:
+            call_id, depth, kept_index = frames.pop()
+            return_value = kept_values[kept_index:]
 
             tracer.capture('CALL_RETURN', {
                 'call_id': call_id,
-                'return_value': result,
+                'return_value': return_value,
                 'depth': depth,
-                'kept_count': len(result)
+                'kept_count': len(return_value)
             })
+            yield from tracer.flush()
 
-            return result
-
-        # Start recursion with a sentinel value that's JSON-safe
-        # Using None or a very small number instead of float('-inf')
-        result = recurse(sorted_intervals, None, 0, None)
+        result = kept
 
         # Capture completion
         tracer.capture('ALGORITHM_COMPLETE', {
-            'result': result,
+            'result': kept_values,
             'kept_count': len(result),
             'removed_count': len(intervals) - len(result),
-            'efficiency': f"{len(result)}/{len(intervals)} intervals kept"
+            'efficiency': tracer.message(
+                'ALGORITHM_COMPLETE.efficiency', len(result), len(intervals)
+            )
+        })
+        yield from tracer.flush()
+
+        trace = tracer.get_trace()
+        if normalized:
+            trace = {
+                **self._build_interval_table(intervals),
+                'sorted_order': order,
+                **trace
+            }
+
+        yield 'trace', trace
+        yield 'result', result
+
+    def _execute_vectorized(self, intervals, tracer, normalized, mode):
+        """
+        Decide every interval at once and emit the decisions in bulk.
+
+        Gives the same result, and the same DECISION_MADE steps, as the
+        recursive trace: the call at sorted position p has call_id p.
+        The steps are only yielded once every interval is decided.
+        """
+        ends = [interval['end'] for interval in intervals]
+        order, keep = solve([interval['start'] for interval in intervals], ends)
+
+        if mode == 'result':
+            if not isinstance(order, list):
+                order, keep = order[keep].tolist(), None
+            else:
+                order = [row for row, is_kept in zip(order, keep) if is_kept]
+            yield 'trace', tracer.get_trace()
+            yield 'result', [intervals[row] for row in order]
+            return
+
+        if not isinstance(order, list):
+            order, keep = order.tolist(), keep.tolist()
+
+        if not tracer.wants('DECISION_MADE'):
+            result = [intervals[row] for row, is_kept in zip(order, keep) if is_kept]
+        else:
+            result = self._capture_decisions(intervals, tracer, normalized, order, keep, ends)
+            yield from tracer.flush()
+
+        trace = tracer.get_trace()
+        if normalized:
+            trace = {
+                **self._build_interval_table(intervals),
+                'sorted_order': order,
+                **trace
+            }
+
+        yield 'trace', trace
+        yield 'result', result
+
+    @staticmethod
+    def _capture_decisions(intervals, tracer, normalized, order, keep, ends):
+        """Emit one DECISION_MADE step per interval, in sorted order"""
+        result = []
+        max_end = None
+        for position, (row, is_kept) in enumerate(zip(order, keep)):
+            end = ends[row]
+            tracer.capture('DECISION_MADE', {
+                'call_id': position,
+                'interval': row if normalized else intervals[row],
+                'decision': 'keep' if is_kept else 'covered',
+                'reason': tracer.message(
+                    'DECISION_MADE.reason',
+                    end,
+                    '>' if is_kept else '<=',
+                    max_end if max_end is not None else 'None (first)'
+                ),
+                'will_keep': is_kept
+            })
+            if is_kept:
+                result.append(intervals[row])
+                max_end = end if max_end is None else max(max_end, end)
+        return result
+
+    def _execute_parallel(self, intervals, tracer, workers):
+        """
+        Decide every interval with the multi-core engine.
+
+        The trace is coarse: one step per chunk of the divide-and-conquer
+        tree instead of one per call. Each chunk is shown as an interval
+        spanning its intervals, so a timeline can draw the tree.
+        """
+        order, keep, chunks = solve_parallel(
+            [interval['start'] for interval in intervals],
+            [interval['end'] for interval in intervals],
+            workers
+        )
+        spans = [
+            {'id': chunk['chunk_id'], 'start': chunk['start'], 'end': chunk['end']}
+            for chunk in chunks
+        ]
+
+        tracer.capture('PARTITION', {
+            'chunk_count': len(chunks),
+            'chunks': spans,
+            'description': 'Split into chunks by start, one per worker'
         })
 
-        return tracer.get_trace(), result
+        for chunk, span in zip(chunks, spans):
+            tracer.capture('CHUNK_SORTED', {
+                'chunk_id': chunk['chunk_id'],
+                'interval': span,
+                'size': chunk['size'],
+                'positions': chunk['positions']
+            })
+
+        for chunk, span in zip(chunks, spans):
+            tracer.capture('CHUNK_COMBINED', {
+                'chunk_id': chunk['chunk_id'],
+                'interval': span,
+                'carry_in': chunk['carry_in'],
+                'carry_out': chunk['carry_out'],
+                'kept_count': chunk['kept_count'],
+                'removed_count': chunk['size'] - chunk['kept_count']
+            })
+
+        if isinstance(order, list):
+            kept_rows = [row for row, is_kept in zip(order, keep) if is_kept]
+        else:
+            kept_rows = order[keep].tolist()
+        result = [intervals[row] for row in kept_rows]
+
+        tracer.capture('ALGORITHM_COMPLETE', {
+            'kept_count': len(result),
+            'removed_count': len(intervals) - len(result),
+            'efficiency': tracer.message(
+                'ALGORITHM_COMPLETE.efficiency', len(result), len(intervals)
+            )
+        })
+        yield from tracer.flush()
+
+        yield 'trace', tracer.get_trace()
+        yield 'result', result
+
+    @staticmethod
+    def _build_interval_table(intervals):
+        """Build the interval table and color palette of a normalized trace"""
+        palette = []
+        color_indexes = {}
+        table = []
+        for interval in intervals:
+            color = interval.get('color')
+            if color not in color_indexes:
+                color_indexes[color] = len(palette)
+                palette.append(color)
+            table.append({
+                'id': interval.get('id'),
+                'start': interval['start'],
+                'end': interval['end'],
+                'color_index': color_indexes[color]
+            })
+        return {'interval_table': table, 'palette': palette}
+
+    def generate_input(self, n):
+        """Generate n random intervals (the same ones for the same n)"""
+        rng = random.Random(n)
+        intervals = []
+        for row in range(n):
+            start = rng.randrange(10 * n + 1)
+            intervals.append({
+                'id': row + 1,
+                'start': start,
+                'end': start + rng.randrange(1, 2 * n + 2),
+                'color': 'blue'
+            })
+        return {'intervals': intervals}
 
     def get_default_example(self):
         """Return default example input"""
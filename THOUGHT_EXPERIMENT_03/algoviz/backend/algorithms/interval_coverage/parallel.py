@@ -0,0 +1,161 @@
+"""
+Multi-core divide-and-conquer engine for Remove Covered Intervals.
+
+1. Partition: split the start range into one chunk per worker, using
+   splitters sampled from the starts. Equal starts always share a chunk,
+   so the sorted chunks, concatenated, are the globally sorted order.
+2. Sort: each worker sorts its chunk and computes the running max of its
+   ends, as if the chunk were the whole input.
+3. Combine: walk the chunks in order, carrying the max end of everything
+   before each one. An interval is covered iff its end is <= the larger of
+   the carry and its in-chunk running max.
+
+Needs NumPy; without it the serial engine is used as a single chunk.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from algorithms.interval_coverage.engine import np, solve, _sort_order
+
+
+SAMPLES_PER_CHUNK = 1024
+
+
+def solve_parallel(starts, ends, workers=None):
+    """
+    Decide every interval, sorting chunks of the input in parallel.
+
+    Args:
+        starts: Interval starts, in input order
+        ends: Interval ends, in input order
+        workers: Worker processes (default: one per CPU)
+
+    Returns:
+        tuple: (order, keep, chunks). order and keep are as returned by
+            engine.solve(). chunks describes the divide-and-conquer tree,
+            in sorted order: one dict per non-empty chunk with its
+            'chunk_id', 'size', 'start' / 'end' (the span it covers),
+            'positions' ([first, stop) sorted positions), 'carry_in' /
+            'carry_out' (max end before / after it, None for the first
+            carry_in) and 'kept_count'.
+    """
+    workers = workers or os.cpu_count() or 1
+    count = len(starts)
+    if np is not None:
+        starts = np.asarray(starts)
+        ends = np.asarray(ends)
+
+    if (np is None or workers == 1 or count < 2
+            or starts.dtype.kind not in 'if' or ends.dtype.kind not in 'if'):
+        order, keep = solve(starts, ends)
+        return order, keep, _single_chunk(starts, ends, order, keep)
+
+    # 1. Partition by start
+    chunk_rows = _partition(starts, workers)
+
+    # 2. Sort each chunk in parallel (no more processes than chunks)
+    with ProcessPoolExecutor(max_workers=len(chunk_rows)) as pool:
+        sorted_chunks = list(pool.map(
+            _sort_chunk,
+            [starts[rows] for rows in chunk_rows],
+            [ends[rows] for rows in chunk_rows]
+        ))
+
+    # 3. Combine: carry the max end across chunk boundaries
+    order = np.empty(count, dtype=np.int64)
+    keep = np.empty(count, dtype=bool)
+    chunks = []
+    carry = None
+    position = 0
+    for chunk_id, (rows, (local_order, running_max)) in enumerate(
+        zip(chunk_rows, sorted_chunks)
+    ):
+        size = len(rows)
+        stop = position + size
+        chunk_order = rows[local_order]
+        chunk_ends = ends[chunk_order]
+
+        # Max end before each interval: in-chunk running max, then carry
+        max_before = np.empty_like(running_max)
+        max_before[1:] = running_max[:-1]
+        if carry is None:
+            chunk_keep = np.empty(size, dtype=bool)
+            chunk_keep[0] = True
+            np.greater(chunk_ends[1:], max_before[1:], out=chunk_keep[1:])
+        else:
+            max_before[0] = carry
+            np.maximum(max_before, carry, out=max_before)
+            chunk_keep = chunk_ends > max_before
+
+        order[position:stop] = chunk_order
+        keep[position:stop] = chunk_keep
+
+        carry_out = running_max[-1] if carry is None else max(carry, running_max[-1])
+        chunks.append({
+            'chunk_id': chunk_id,
+            'size': size,
+            'start': starts[chunk_order[0]].item(),
+            'end': chunk_ends.max().item(),
+            'positions': [position, stop],
+            'carry_in': None if carry is None else carry.item(),
+            'carry_out': carry_out.item(),
+            'kept_count': int(chunk_keep.sum())
+        })
+        carry = carry_out
+        position = stop
+
+    return order, keep, chunks
+
+
+def _partition(starts, workers):
+    """Split the rows into up to `workers` non-empty chunks of start ranges."""
+    count = len(starts)
+    sample_size = min(count, SAMPLES_PER_CHUNK * workers)
+    sample = np.sort(starts[np.linspace(0, count - 1, sample_size).astype(np.int64)])
+    splitters = np.unique(sample[
+        np.linspace(0, sample_size, workers + 1)[1:-1].astype(np.int64)
+    ])
+
+    chunk_ids = np.searchsorted(splitters, starts, side='right').astype(np.int32)
+    by_chunk = np.argsort(chunk_ids, kind='stable')  # keeps row order
+    bounds = np.searchsorted(chunk_ids[by_chunk], np.arange(len(splitters) + 2))
+    return [
+        by_chunk[first:stop]
+        for first, stop in zip(bounds[:-1], bounds[1:])
+        if stop > first
+    ]
+
+
+def _sort_chunk(starts, ends):
+    """
+    Worker: sort one chunk and take the running max of its ends.
+
+    Returns:
+        tuple: (local_order, running_max), positions local to the chunk
+    """
+    local_order = _sort_order(starts, ends)
+    return local_order, np.maximum.accumulate(ends[local_order])
+
+
+def _single_chunk(starts, ends, order, keep):
+    """Describe a serial solve as a one-chunk tree."""
+    count = len(order)
+    if not count:
+        return []
+    max_end = _plain(max(ends) if np is None else np.max(ends))
+    return [{
+        'chunk_id': 0,
+        'size': count,
+        'start': _plain(starts[order[0]]),
+        'end': max_end,
+        'positions': [0, count],
+        'carry_in': None,
+        'carry_out': max_end,
+        'kept_count': sum(keep) if np is None else int(np.count_nonzero(keep))
+    }]
+
+
+def _plain(value):
+    """Convert NumPy scalars to plain Python values for JSON."""
+    return value.item() if hasattr(value, 'item') else value
@@ -1,17 +1,87 @@
 """
 Central registry for all algorithms.
 Enables dynamic algorithm discovery and registration.
+
+Algorithms are discovered from their metadata.json files, which is all the
+catalog needs. An algorithm's module is imported (and its class registered
+by @registry.register) the first time an instance is requested.
 """
 
-from typing import Dict, Type, List
-from algorithms.base_algorithm import BaseAlgorithm
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, Type, List
+import importlib
+import os
+import threading
+
+from algorithms.base_algorithm import BaseAlgorithm, metadata_generation, read_metadata
+
+
+ALGORITHMS_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 class AlgorithmRegistry:
     """Central registry for all algorithms"""
     
-    def __init__(self):
+    def __init__(self, pool_size: int = 8):
+        """
+        Args:
+            pool_size: Idle instances kept per algorithm by acquire()
+        """
         self._algorithms: Dict[str, Type[BaseAlgorithm]] = {}
+        # id -> (metadata.json path, module to import), not imported yet
+        self._discovered: Dict[str, Tuple[str, str]] = {}
+        self._import_lock = threading.Lock()
+        self._pool_size = pool_size
+        self._pools: Dict[str, List[BaseAlgorithm]] = {}
+        self._pool_lock = threading.Lock()
+        self._catalog = None
+        self._catalog_key = None
+    
+    def discover(self, root: str = ALGORITHMS_DIR) -> List[str]:
+        """
+        Find algorithms by their metadata.json, without importing them.
+        
+        Every metadata.json with an "id" under root is an algorithm. Its
+        class is expected in the "module" named by the metadata, by default
+        the algorithm.py next to it.
+        
+        Args:
+            root: Directory of the algorithms package
+        
+        Returns:
+            Sorted IDs of the discovered algorithms
+        """
+        package_dir = os.path.dirname(root)
+        found = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(('.', '__')))
+            if 'metadata.json' not in filenames:
+                continue
+            
+            path = os.path.join(dirpath, 'metadata.json')
+            metadata = read_metadata(path)
+            if not metadata or 'id' not in metadata:
+                continue  # placeholder for an algorithm not written yet
+            
+            module = metadata.get('module') or '.'.join(
+                os.path.relpath(dirpath, package_dir).split(os.sep) + ['algorithm']
+            )
+            self._discovered[metadata['id']] = (path, module)
+            found.append(metadata['id'])
+        return sorted(found)
+    
+    def load_all(self, root: str = ALGORITHMS_DIR) -> List[str]:
+        """
+        Discover every algorithm and import its module now, e.g. once in a
+        worker process instead of on each first use.
+        
+        Returns:
+            Sorted IDs of the loaded algorithms
+        """
+        found = self.discover(root)
+        for algorithm_id in found:
+            self._get_class(algorithm_id)
+        return found
     
     def register(self, algorithm_class: Type[BaseAlgorithm]):
         """
@@ -28,9 +98,7 @@ class AlgorithmRegistry:
         Returns:
             The same class (for decorator pattern)
         """
-        instance = algorithm_class()
-        self._algorithms[instance.id] = algorithm_class
-        print(f"✓ Registered algorithm: {instance.id} ({instance.name})")
+        self._algorithms[algorithm_class.get_metadata()['id']] = algorithm_class
         return algorithm_class
     
     def get(self, algorithm_id: str) -> BaseAlgorithm:
@@ -46,9 +114,118 @@ class AlgorithmRegistry:
         Raises:
             ValueError: If algorithm not found
         """
-        if algorithm_id not in self._algorithms:
+        return self._get_class(algorithm_id)()
+    
+    @contextmanager
+    def acquire(self, algorithm_id: str) -> Iterator[BaseAlgorithm]:
+        """
+        Borrow an algorithm instance from the pool.
+        
+        Usage:
+            with registry.acquire('interval-coverage') as algorithm:
+                trace, result = algorithm.execute_traced(input_data)
+        
+        Args:
+            algorithm_id: Unique algorithm identifier
+        
+        Yields:
+            An instance only the caller uses until the block exits
+        
+        Raises:
+            ValueError: If algorithm not found
+        """
+        algorithm_class = self._get_class(algorithm_id)
+        with self._pool_lock:
+            pool = self._pools.setdefault(algorithm_id, [])
+            instance = pool.pop() if pool else None
+        if instance is None:
+            instance = algorithm_class()
+        try:
+            yield instance
+        finally:
+            with self._pool_lock:
+                if len(pool) < self._pool_size:
+                    pool.append(instance)
+    
+    def get_metadata(self, algorithm_id: str) -> Dict:
+        """
+        Get algorithm metadata by ID, without creating an instance.
+        
+        Raises:
+            ValueError: If algorithm not found
+        """
+        metadata = self._metadata_of(algorithm_id)
+        if metadata is None:
+            raise ValueError(f"Algorithm '{algorithm_id}' not found")
+        return metadata
+    
+    def is_loaded(self, algorithm_id: str) -> bool:
+        """Check whether an algorithm's module has been imported"""
+        return algorithm_id in self._algorithms
+    
+    def _ids(self) -> List[str]:
+        """Sorted IDs of all registered and discovered algorithms"""
+        return sorted(set(self._algorithms) | set(self._discovered))
+    
+    def _metadata_of(self, algorithm_id: str) -> Optional[Dict]:
+        """Metadata of a registered or discovered algorithm, None if unknown"""
+        if algorithm_id in self._algorithms:
+            return self._algorithms[algorithm_id].get_metadata()
+        if algorithm_id in self._discovered:
+            return read_metadata(self._discovered[algorithm_id][0])
+        return None
+    
+    def _get_class(self, algorithm_id: str) -> Type[BaseAlgorithm]:
+        """
+        Look up an algorithm class, importing its module on first use.
+        
+        Raises:
+            ValueError: If algorithm not found
+            ImportError: If its module doesn't register it
+        """
+        algorithm_class = self._algorithms.get(algorithm_id)
+        if algorithm_class is not None:
+            return algorithm_class
+        if algorithm_id not in self._discovered:
             raise ValueError(f"Algorithm '{algorithm_id}' not found")
-        return self._algorithms[algorithm_id]()
+        
+        module = self._discovered[algorithm_id][1]
+        with self._import_lock:
+            importlib.import_module(module)
+        if algorithm_id not in self._algorithms:
+            raise ImportError(f"Module '{module}' does not register algorithm '{algorithm_id}'")
+        return self._algorithms[algorithm_id]
+    
+    def catalog_version(self) -> tuple:
+        """
+        Get a token that changes whenever the catalog changes.
+        
+        Re-reads metadata.json files modified on disk, so callers can keep
+        anything derived from the catalog until the token changes.
+        """
+        ids = self._ids()
+        for algorithm_id in ids:
+            self._metadata_of(algorithm_id)
+        return (tuple(ids), metadata_generation())
+    
+    def _get_catalog(self) -> Dict:
+        """Get the metadata list, categories and per-category lists"""
+        key = self.catalog_version()
+        if self._catalog_key != key:
+            algorithms = [
+                metadata for metadata in map(self._metadata_of, key[0])
+                if metadata is not None
+            ]
+            by_category: Dict[str, List[Dict]] = {}
+            for meta in algorithms:
+                by_category.setdefault(meta['category'].lower(), []).append(meta)
+            self._catalog = {
+                'algorithms': algorithms,
+                'categories': sorted(set(meta['category'] for meta in algorithms)),
+                'by_category': by_category
+            }
+            self._catalog_key = key
+        return self._catalog
     
     def list_all(self) -> List[Dict]:
         """
@@ -57,10 +234,7 @@ class AlgorithmRegistry:
         Returns:
             List of algorithm metadata dictionaries
         """
-        return [
-            self._algorithms[alg_id]().metadata 
-            for alg_id in sorted(self._algorithms.keys())
-        ]
+        return list(self._get_catalog()['algorithms'])
     
     def list_by_category(self, category: str) -> List[Dict]:
         """
@@ -72,10 +246,7 @@ class AlgorithmRegistry:
         Returns:
             List of algorithm metadata for that category
         """
-        return [
-            meta for meta in self.list_all() 
-            if meta['category'].lower() == category.lower()
-        ]
+        return list(self._get_catalog()['by_category'].get(category.lower(), []))
     
     def get_categories(self) -> List[str]:
         """
@@ -84,12 +255,7 @@ class AlgorithmRegistry:
         Returns:
             Sorted list of category names
         """
-        categories = set(
-            algo().metadata['category'] 
-            for algo in self._algorithms.values()
-        )
-        return sorted(categories)
-
+        return list(self._get_catalog()['categories'])
 
 # Global registry instance
 registry = AlgorithmRegistry()
\ No newline at end of file
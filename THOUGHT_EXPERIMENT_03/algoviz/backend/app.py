@@ -3,27 +3,111 @@ Flask API server for algorithm visualization.
 Provides REST endpoints for algorithm discovery and trace generation.
 """
 
-from flask import Flask, jsonify, request
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 from algorithms.registry import registry
+from core.cache import TraceCache, make_cache_key
+from core.cost import AdmissionControl, QueueTimeout, TraceRejected
+from core.jobs import Job, JobQueueFull, JobScheduler
+from core.serialization import TRACE_MIMETYPE, encode_response
+from core.shared_body import SharedBody, remove_segment, segment_name
+from core.trace_store import TraceStore
+from core.validation import ValidationError
+from core.tracer import CAPTURE_LEVELS
+from core.worker_jobs import initialize_worker, iter_traced_job, trace_body_job
+from core.worker_pool import JobTimeout, PoolBusy, WorkerFailed, WorkerPool
+import atexit
+import config
 
-# Import all algorithms to register them
-from algorithms.interval_coverage.algorithm import IntervalCoverageAlgorithm
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Seconds between reads of a job's step count while a request waits on it
+# (state changes wake it at once)
+JOB_POLL_INTERVAL = 0.1
+
+# Find algorithms by their metadata.json; each module is imported on first use
+registry.discover()
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = config.MAX_REQUEST_BYTES
 CORS(app)  # Enable CORS for React frontend
 
+# Serialized trace responses, shared by identical requests
+trace_cache = TraceCache(config.TRACE_CACHE_MAX_BYTES, config.TRACE_CACHE_MAX_ENTRY_BYTES)
+
+# Budgets checked against each request's estimated trace cost
+admission = AdmissionControl(
+    config.TRACE_BUDGET_STEPS,
+    config.TRACE_BUDGET_BYTES,
+    config.TRACE_BUDGET_MS,
+    downgrade=bool(config.TRACE_DOWNGRADE),
+    heavy_ms=config.TRACE_HEAVY_MS,
+    heavy_slots=config.TRACE_HEAVY_SLOTS,
+    queue_timeout=config.TRACE_QUEUE_TIMEOUT
+)
+
+# Worker processes running trace requests (None: run in this process)
+worker_pool = WorkerPool(
+    config.TRACE_WORKERS,
+    job_timeout=config.TRACE_JOB_TIMEOUT,
+    memory_limit=config.TRACE_WORKER_MEMORY_MB * 2 ** 20 or None,
+    max_jobs=config.TRACE_WORKER_MAX_JOBS,
+    queue_timeout=config.TRACE_POOL_QUEUE_TIMEOUT,
+    max_queue=config.TRACE_POOL_MAX_QUEUE,
+    initializer=initialize_worker
+) if config.TRACE_WORKERS else None
+
+# Background trace jobs, shortest predicted first (run by _run_job)
+job_scheduler = JobScheduler(
+    lambda job: _run_job(job),
+    workers=config.JOB_WORKERS,
+    max_queued=config.JOB_MAX_QUEUED,
+    aging=config.JOB_AGING_MS,
+    fairness_half_life=config.JOB_FAIRNESS_HALF_LIFE,
+    ttl=config.JOB_RESULT_TTL,
+    max_finished=config.JOB_MAX_FINISHED
+)
+atexit.register(job_scheduler.clear)
+
+# Traces served by step range through a handle
+trace_store = TraceStore(config.TRACE_STORE_MAX_TRACES, config.TRACE_STORE_TTL,
+                         config.TRACE_STORE_MAX_STEPS)
+
+
+# Serialized catalog responses: name -> (catalog version, body)
+_catalog_responses = {}
+
+
+def _catalog_response(name, build):
+    """
+    Serve a catalog response, re-encoding it only when the catalog changes.
+    
+    Args:
+        name: Cache slot of the response
+        build: Function returning the response payload
+    """
+    version = registry.catalog_version()
+    cached = _catalog_responses.get(name)
+    if cached is None or cached[0] != version:
+        cached = (version, app.json.dumps(build()).encode('utf-8'))
+        _catalog_responses[name] = cached
+    return Response(cached[1], mimetype='application/json')
+
 
 @app.route('/api/algorithms', methods=['GET'])
 def list_algorithms():
     """Get list of all available algorithms."""
     try:
-        algorithms = registry.list_all()
-        return jsonify({
-            'success': True,
-            'algorithms': algorithms,
-            'count': len(algorithms)
-        })
+        def build():
+            algorithms = registry.list_all()
+            return {
+                'success': True,
+                'algorithms': algorithms,
+                'count': len(algorithms)
+            }
+        return _catalog_response('algorithms', build)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -35,10 +119,9 @@ def list_algorithms():
 def list_categories():
     """Get list of all algorithm categories."""
     try:
-        categories = registry.get_categories()
-        return jsonify({
+        return _catalog_response('categories', lambda: {
             'success': True,
-            'categories': categories
+            'categories': registry.get_categories()
         })
     except Exception as e:
         return jsonify({
@@ -52,7 +135,15 @@ def list_by_category(category):
     """Get algorithms by category."""
     try:
         algorithms = registry.list_by_category(category)
-        return jsonify({
+        if not algorithms:
+            # Only known categories are kept, so arbitrary names can't grow the cache
+            return jsonify({
+                'success': True,
+                'category': category,
+                'algorithms': [],
+                'count': 0
+            })
+        return _catalog_response(f'category:{category}', lambda: {
             'success': True,
             'category': category,
             'algorithms': algorithms,
@@ -69,10 +160,9 @@ def list_by_category(category):
 def get_algorithm_info(algorithm_id):
     """Get detailed algorithm metadata."""
     try:
-        algorithm = registry.get(algorithm_id)
         return jsonify({
             'success': True,
-            'algorithm': algorithm.metadata
+            'algorithm': registry.get_metadata(algorithm_id)
         })
     except ValueError as e:
         return jsonify({
@@ -90,8 +180,8 @@ def get_algorithm_info(algorithm_id):
 def get_example(algorithm_id):
     """Get default example input for an algorithm."""
     try:
-        algorithm = registry.get(algorithm_id)
-        example = algorithm.get_default_example()
+        with registry.acquire(algorithm_id) as algorithm:
+            example = algorithm.get_default_example()
         return jsonify({
             'success': True,
             'example': example
@@ -108,30 +198,766 @@ def get_example(algorithm_id):
         }), 500
 
 
+@app.route('/api/algorithm/<algorithm_id>/messages', methods=['GET'])
+def get_messages(algorithm_id):
+    """Get the message templates used to render an algorithm's step texts."""
+    try:
+        return jsonify({
+            'success': True,
+            'messages': registry.get_metadata(algorithm_id).get('messages', {})
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+class InvalidOption(Exception):
+    """A trace request query parameter is invalid"""
+    
+    def __init__(self, error, details):
+        super().__init__(error)
+        self.error = error
+        self.details = details
+
+
+def _trace_options(metadata):
+    """
+    Parse the trace options of a request's query parameters.
+    
+    Returns:
+        Options for BaseAlgorithm.collect_trace(), without the defaults
+    
+    Raises:
+        InvalidOption: If a parameter is invalid
+    """
+    trace_format = request.args.get('format', 'full')
+    if trace_format not in ('full', 'normalized'):
+        raise InvalidOption('Invalid trace format',
+                            "format must be 'full' or 'normalized'")
+    options = {'normalized': True} if trace_format == 'normalized' else {}
+    
+    messages = request.args.get('messages', 'rendered')
+    if messages not in ('rendered', 'templates'):
+        raise InvalidOption('Invalid messages option',
+                            "messages must be 'rendered' or 'templates'")
+    if messages == 'templates':
+        options['render_messages'] = False
+    
+    mode = request.args.get('mode', 'trace')
+    if mode not in ('trace', 'decisions', 'result', 'parallel'):
+        raise InvalidOption('Invalid mode',
+                            "mode must be 'trace', 'decisions', 'result' or 'parallel'")
+    if mode != 'trace':
+        options['mode'] = mode
+    
+    if 'workers' in request.args:
+        workers = request.args.get('workers', type=int)
+        if (mode != 'parallel' or not workers or workers < 1
+                or workers > config.TRACE_MAX_PARALLEL_WORKERS):
+            raise InvalidOption('Invalid workers option',
+                                'workers must be an integer from 1 to '
+                                f'{config.TRACE_MAX_PARALLEL_WORKERS}, with mode=parallel')
+        options['workers'] = workers
+    
+    level = request.args.get('level', 'full')
+    if level not in CAPTURE_LEVELS:
+        raise InvalidOption('Invalid capture level',
+                            f"level must be one of: {', '.join(CAPTURE_LEVELS)}")
+    if level != 'full':
+        options['level'] = level
+    
+    event_types = metadata.get('event_levels')
+    for name in ('include', 'exclude'):
+        if name not in request.args:
+            continue
+        selected = sorted(set(filter(None, request.args[name].split(','))))
+        unknown = [t for t in selected if event_types is not None and t not in event_types]
+        if unknown:
+            raise InvalidOption(f'Invalid {name} option',
+                                f"Unknown event types: {', '.join(unknown)}")
+        options[name] = selected
+    
+    if 'max_steps' in request.args:
+        max_steps = request.args.get('max_steps', type=int)
+        if not max_steps or max_steps < 1:
+            raise InvalidOption('Invalid max_steps option',
+                                'max_steps must be a positive integer')
+        options['max_steps'] = max_steps
+    
+    return options
+
+
 @app.route('/api/algorithm/<algorithm_id>/trace', methods=['POST'])
 def generate_trace(algorithm_id):
-    """Generate execution trace for algorithm with user input."""
+    """
+    Generate execution trace for algorithm with user input.
+    
+    Query parameters:
+        format: 'full' (default) or 'normalized' - normalized traces list
+            the input once and reference it from every step
+        messages: 'rendered' (default) or 'templates' - with templates,
+            step texts are sent as argument lists for the templates served
+            by /api/algorithm/<algorithm_id>/messages
+        mode: 'trace' (default), 'decisions', 'result' or 'parallel' -
+            algorithms with a bulk engine can skip the step-by-step
+            narrative and return only the decision steps, only the result,
+            or a coarse trace of a multi-core run
+        workers: worker processes for mode=parallel, at most
+            TRACE_MAX_PARALLEL_WORKERS
+        level: 'summary', 'decisions' or 'full' (default) - which event
+            types are captured, per the algorithm's metadata event_levels
+        include, exclude: comma-separated event types to capture whatever
+            the level, or never to capture
+        max_steps: step budget - the algorithm is stopped once it is spent
+            and the trace is returned with 'truncated': true and no result
+        page_size: return a trace handle and the first page_size steps
+            instead of the whole trace (see _handle_response)
+    
+    Before running, the trace's cost is estimated (see /estimate). Over
+    the configured budgets, the request runs at the highest capture level
+    that fits (the X-Trace-Level header says which) or is rejected with
+    413. Runs estimated to be slow wait for a heavy-run slot, or get 503.
+    
+    The trace is collected in a worker process (see config TRACE_WORKERS).
+    No free worker in time, or a run over the worker memory limit, gets
+    503; a run over the job timeout is killed and gets 504. The worker
+    hands the serialized body over in shared memory; bodies too large to
+    cache are sent straight from it. Streamed (NDJSON) and page_size runs
+    are sent their events by the worker as they happen, under the same
+    limits, and stop after TRACE_BUDGET_STEPS steps; a limit hit after
+    the response has started ends the stream with an error event (or the
+    stored trace with an error). With TRACE_WORKERS=0 every run is in
+    this process, without the timeout or memory limit.
+    
+    Send "Accept: application/x-algoviz-trace" to get the compact binary
+    encoding from core.serialization instead of JSON.
+    
+    Send "Accept: application/x-ndjson" to get the events of iter_traced()
+    as they happen, one JSON object per line (see _stream_trace). Streamed
+    responses are not cached.
+    
+    Responses are cached by (algorithm id, version, input, options), with
+    the options admission control picked, so the input is validated and
+    the budgets checked before the lookup. A hit returns the stored body
+    as-is. The X-Trace-Cache header says which.
+    """
     try:
-        algorithm = registry.get(algorithm_id)
+        metadata = registry.get_metadata(algorithm_id)
         input_data = request.json
         
-        # Validate input
-        if not algorithm.validate_input(input_data):
-            return jsonify({
-                'success': False,
-                'error': 'Invalid input format',
-                'details': 'Input does not match expected schema'
-            }), 400
+        options = _trace_options(metadata)
+        
+        if 'page_size' in request.args:
+            page_size = request.args.get('page_size', type=int)
+            if not page_size or not 1 <= page_size <= config.TRACE_PAGE_MAX_SIZE:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid page_size option',
+                    'details': f'page_size must be an integer from 1 to {config.TRACE_PAGE_MAX_SIZE}'
+                }), 400
+            return _handle_response(algorithm_id, input_data, options, page_size)
+                
+        mimetype = request.accept_mimetypes.best_match(
+            ['application/json', TRACE_MIMETYPE, NDJSON_MIMETYPE], 'application/json'
+        )
+        if mimetype == NDJSON_MIMETYPE:
+            with registry.acquire(algorithm_id) as algorithm:
+                try:
+                    input_data = algorithm.check_input(input_data)
+                except ValidationError as e:
+                    return _invalid_input(e)
+                options, estimate = _admit(algorithm, input_data, options)
+            return _with_level(Response(_stream_trace(algorithm_id, input_data, options, estimate),
+                                        mimetype=NDJSON_MIMETYPE), options)
+        encoding = 'binary' if mimetype == TRACE_MIMETYPE else 'json'
+        
+        with registry.acquire(algorithm_id) as algorithm:
+            # Validate input
+            try:
+                checked_input = algorithm.check_input(input_data)
+            except ValidationError as e:
+                return _invalid_input(e)
+            
+            options, estimate = _admit(algorithm, checked_input, options)
+            
+            # Identical requests get the already serialized response
+            cache_key = make_cache_key(algorithm_id, algorithm.version, input_data,
+                                       options, encoding)
+            body = trace_cache.get(cache_key)
+            if body is not None:
+                return _with_level(_trace_response(body, mimetype, 'hit'), options)
+            
+            if worker_pool is None:
+                with admission.slot(estimate):
+                    trace, result = algorithm.collect_trace(checked_input, **options)
+                body = encode_response({
+                    'success': True,
+                    'trace': trace,
+                    'result': result
+                }, encoding)
+        
+        if worker_pool is not None:
+            with admission.slot(estimate):
+                shared = _run_in_worker(algorithm_id, checked_input, options, encoding)
+            if len(shared) > trace_cache.max_entry_bytes:
+                # Too large to cache: sent from the worker's segment. WSGI
+                # servers only write bytes, so each chunk is copied as it goes.
+                chunks = (chunk.tobytes() for chunk in shared.chunks())
+                response = _trace_response(chunks, mimetype, 'miss')
+                response.content_length = len(shared)
+                response.call_on_close(shared.close)
+                return _with_level(response, options)
+            body = shared.tobytes()
+            shared.close()
+        
+        trace_cache.put(cache_key, body)
+        return _with_level(_trace_response(body, mimetype, 'miss'), options)
         
-        # Execute algorithm and get trace
-        trace, result = algorithm.execute_traced(input_data)
+    except InvalidOption as e:
+        return jsonify({
+            'success': False,
+            'error': e.error,
+            'details': e.details
+        }), 400
+    except TraceRejected as e:
+        return _trace_rejected(e)
+    except QueueTimeout as e:
+        return _queue_timeout(e)
+    except (PoolBusy, WorkerFailed) as e:
+        return _pool_unavailable(e)
+    except JobTimeout as e:
+        return _job_timeout(e)
+    except HTTPException:
+        raise  # e.g. 413 from reading a body over MAX_REQUEST_BYTES
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Execution failed: {str(e)}'
+        }), 500
+
+
+@app.route('/api/algorithm/<algorithm_id>/estimate', methods=['POST'])
+def estimate_trace(algorithm_id):
+    """
+    Estimate the cost of a trace request without running it.
+    
+    Takes the same input and query parameters as the trace endpoint.
+    Returns the input size, the estimated steps, bytes and ms at the
+    requested level and at every capture level (null where the algorithm
+    has no cost model), and what admission control would do: 'run',
+    'downgrade' (with the level it would run at) or 'reject', and whether
+    the run would wait for a heavy-run slot.
+    """
+    try:
+        options = _trace_options(registry.get_metadata(algorithm_id))
+        input_data = request.json
         
+        with registry.acquire(algorithm_id) as algorithm:
+            try:
+                checked_input = algorithm.check_input(input_data)
+            except ValidationError as e:
+                return _invalid_input(e)
+            
+            level = options.get('level', 'full')
+            levels = {
+                candidate: algorithm.estimate_cost(checked_input, **{**options, 'level': candidate})
+                for candidate in CAPTURE_LEVELS
+            }
+            try:
+                run_level, estimate = admission.decide(levels.get, level)
+                decision = {
+                    'action': 'run' if run_level == level else 'downgrade',
+                    'level': run_level,
+                    'queued': admission.is_heavy(estimate)
+                }
+            except TraceRejected as e:
+                decision = {'action': 'reject', 'reason': str(e)}
+            
+            return jsonify({
+                'success': True,
+                'input_size': algorithm.input_size(checked_input),
+                'estimate': levels[level],
+                'levels': levels,
+                'admission': decision,
+                'budgets': admission.budgets
+            })
+    
+    except InvalidOption as e:
+        return jsonify({
+            'success': False,
+            'error': e.error,
+            'details': e.details
+        }), 400
+    except HTTPException:
+        raise
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Estimate failed: {str(e)}'
+        }), 500
+
+
+def _invalid_input(error):
+    """Respond to input that failed validation"""
+    return jsonify({
+        'success': False,
+        'error': 'Invalid input format',
+        'details': str(error)
+    }), 400
+
+
+def _admit(algorithm, input_data, options):
+    """
+    Apply admission control to a checked input.
+    
+    Returns:
+        (options to run with, at the capture level picked, cost estimate)
+    
+    Raises:
+        TraceRejected: If the trace is over budget at every allowed level
+    """
+    level = options.get('level', 'full')
+    run_level, estimate = admission.decide(
+        lambda candidate: algorithm.estimate_cost(input_data, **{**options, 'level': candidate}),
+        level
+    )
+    if run_level != level:
+        options = {**options, 'level': run_level}
+    return options, estimate
+
+
+def _with_level(response, options):
+    """Tell the client the capture level a trace was run at"""
+    response.headers['X-Trace-Level'] = options.get('level', 'full')
+    return response
+
+
+def _trace_rejected(error):
+    """Respond to a request whose trace would be over budget"""
+    return jsonify({
+        'success': False,
+        'error': 'Trace too large',
+        'details': str(error)
+    }), 413
+
+
+def _queue_timeout(error):
+    """Respond to a request that found no heavy-run slot in time"""
+    response = jsonify({
+        'success': False,
+        'error': 'Server busy',
+        'details': str(error)
+    })
+    response.headers['Retry-After'] = str(config.TRACE_QUEUE_TIMEOUT)
+    return response, 503
+
+
+def _pool_unavailable(error):
+    """Respond to a request no trace worker or job slot could take"""
+    busy = isinstance(error, (PoolBusy, JobQueueFull))
+    response = jsonify({
+        'success': False,
+        'error': 'Server busy' if busy else 'Trace failed',
+        'details': str(error)
+    })
+    if busy:
+        response.headers['Retry-After'] = str(config.TRACE_POOL_QUEUE_TIMEOUT)
+    return response, 503
+
+
+def _job_timeout(error):
+    """Respond to a request whose trace ran past the job timeout"""
+    return jsonify({
+        'success': False,
+        'error': 'Trace timed out',
+        'details': str(error)
+    }), 504
+
+
+def _run_in_worker(algorithm_id, input_data, options, encoding, control=None):
+    """
+    Collect a trace response body in a worker process (in this process
+    without a worker pool).
+    
+    The worker serializes the body into a shared memory segment named
+    here, so the segment is removed even if the worker fails or is killed.
+    
+    Args:
+        control: Name of a JobControl for the run to report to
+    
+    Returns:
+        The body, as a SharedBody
+    """
+    segment = segment_name()
+    args = (algorithm_id, input_data, options, encoding, segment, control)
+    try:
+        if worker_pool is None:
+            size = trace_body_job(*args)
+        else:
+            size = worker_pool.run(trace_body_job, *args)
+        return SharedBody(segment, size)
+    except BaseException:
+        remove_segment(segment)
+        raise
+
+
+def _run_job(job):
+    """Run a background job (on a scheduler thread)"""
+    return _run_in_worker(job.algorithm_id, job.input_data, job.options,
+                          job.encoding, job.control.name)
+
+
+def _run_traced(algorithm_id, input_data, options, estimate=None):
+    """
+    Run an algorithm on a pooled instance, yielding its iter_traced() events.
+    
+    Waits for a heavy-run slot first if the estimate needs one. The run
+    goes to a trace worker, under its timeout and memory limit, unless
+    TRACE_WORKERS is 0; closing this generator stops it.
+    """
+    with admission.slot(estimate):
+        if worker_pool is not None:
+            yield from worker_pool.iterate(iter_traced_job, algorithm_id, input_data, options)
+            return
+        with registry.acquire(algorithm_id) as algorithm:
+            yield from algorithm.iter_traced(input_data, **options)
+
+
+def _step_limit(max_steps):
+    """The max_steps of a streamed or stored run: at most TRACE_BUDGET_STEPS"""
+    if not config.TRACE_BUDGET_STEPS:
+        return max_steps
+    if max_steps is None:
+        return config.TRACE_BUDGET_STEPS
+    return min(max_steps, config.TRACE_BUDGET_STEPS)
+
+
+def _handle_response(algorithm_id, input_data, options, page_size):
+    """
+    Start a stored run and respond with its handle and first page.
+    
+    The response holds the handle, the trace metadata, the first page_size
+    steps, total_steps (steps stored so far) and complete. Once complete it
+    also holds the trace (without steps) and result. The run goes on in the
+    background; read further steps from /api/trace/<handle>/steps.
+    Identical requests share a stored run while it is kept.
+    """
+    with registry.acquire(algorithm_id) as algorithm:
+        try:
+            checked_input = algorithm.check_input(input_data)
+        except ValidationError as e:
+            return _invalid_input(e)
+        options, estimate = _admit(algorithm, checked_input, options)
+        version = algorithm.version
+    
+    options = dict(options)
+    max_steps = _step_limit(options.pop('max_steps', None))
+    key = make_cache_key(algorithm_id, version, input_data,
+                         {**options, 'max_steps': max_steps}, 'handle')
+    stored = trace_store.start(
+        lambda: _run_traced(algorithm_id, checked_input, options, estimate), key, max_steps
+    )
+    stored.wait_for(page_size, config.TRACE_PAGE_TIMEOUT)
+    return _with_level(_steps_response(stored, 0, page_size), options)
+
+
+def _steps_response(stored, start, stop):
+    """Respond with steps [start, stop) of a stored trace and its state"""
+    steps = stored.get_steps(start, stop)
+    if stored.error is not None and len(steps) < stop - start:
+        response = jsonify({
+            'success': False,
+            'error': stored.error
+        })
+        response.status_code = 500
+        return response
+    summary = stored.summary()
+    return jsonify({
+        'success': True,
+        **summary,
+        'from': start,
+        'to': start + len(steps),
+        'steps': steps
+    })
+
+
+@app.route('/api/trace/<handle>', methods=['GET'])
+def get_stored_trace(handle):
+    """
+    Get the state of a stored trace: metadata, total_steps and complete,
+    plus the trace (without steps) and result once complete.
+    """
+    stored = trace_store.get(handle)
+    if stored is None:
         return jsonify({
+            'success': False,
+            'error': f"Trace '{handle}' not found or expired"
+        }), 404
+    if stored.error is not None:
+        return jsonify({
+            'success': False,
+            'error': stored.error
+        }), 500
+    return jsonify({
+        'success': True,
+        **stored.summary()
+    })
+
+
+@app.route('/api/trace/<handle>/steps', methods=['GET'])
+def get_trace_steps(handle):
+    """
+    Get steps [from, to) of a stored trace.
+    
+    Query parameters:
+        from: first step number (default 0)
+        to: step number to stop before (default from + TRACE_PAGE_SIZE),
+            at most TRACE_PAGE_MAX_SIZE steps after from
+    
+    Waits for steps the run hasn't produced yet. The range is cut short at
+    the end of the trace, or of the steps produced when the wait times
+    out; 'to' in the response is where it actually stops.
+    """
+    stored = trace_store.get(handle)
+    if stored is None:
+        return jsonify({
+            'success': False,
+            'error': f"Trace '{handle}' not found or expired"
+        }), 404
+    
+    start = request.args.get('from', 0, type=int)
+    stop = request.args.get('to', start + config.TRACE_PAGE_SIZE, type=int)
+    if start < 0 or stop < start or stop - start > config.TRACE_PAGE_MAX_SIZE:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid step range',
+            'details': f'from and to must satisfy 0 <= from <= to <= from + {config.TRACE_PAGE_MAX_SIZE}'
+        }), 400
+    
+    stored.wait_for(stop, config.TRACE_PAGE_TIMEOUT)
+    return _steps_response(stored, start, stop)
+
+
+@app.route('/api/algorithm/<algorithm_id>/jobs', methods=['POST'])
+def submit_job(algorithm_id):
+    """
+    Queue a trace request as a background job.
+    
+    Takes the same input and query parameters as the trace endpoint
+    (except page_size); the Accept header picks the result encoding (JSON
+    or the binary encoding). Responds 202 with the job's state and id:
+    poll /api/jobs/<job_id> for progress and get /api/jobs/<job_id>/result
+    once it is done. Jobs run shortest predicted first (see core.jobs);
+    send X-Client-Id to be told apart from other clients behind the same
+    address.
+    """
+    try:
+        options = _trace_options(registry.get_metadata(algorithm_id))
+        if 'page_size' in request.args:
+            raise InvalidOption('Invalid page_size option', 'Jobs return whole traces')
+        mimetype = request.accept_mimetypes.best_match(
+            ['application/json', TRACE_MIMETYPE], 'application/json'
+        )
+        
+        with registry.acquire(algorithm_id) as algorithm:
+            try:
+                checked_input = algorithm.check_input(request.json)
+            except ValidationError as e:
+                return _invalid_input(e)
+            options, estimate = _admit(algorithm, checked_input, options)
+        
+        client = request.headers.get('X-Client-Id') or request.remote_addr or ''
+        encoding = 'binary' if mimetype == TRACE_MIMETYPE else 'json'
+        job = job_scheduler.submit(
+            Job(client, algorithm_id, checked_input, options, encoding, estimate)
+        )
+        response = jsonify({
             'success': True,
-            'trace': trace,
-            'result': result
+            'job': job_scheduler.describe(job)
         })
+        response.status_code = 202
+        response.headers['Location'] = f'/api/jobs/{job.id}'
+        return _with_level(response, options)
+    
+    except InvalidOption as e:
+        return jsonify({
+            'success': False,
+            'error': e.error,
+            'details': e.details
+        }), 400
+    except TraceRejected as e:
+        return _trace_rejected(e)
+    except JobQueueFull as e:
+        return _pool_unavailable(e)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Job submission failed: {str(e)}'
+        }), 500
+
+
+def _job_wait(args):
+    """Seconds a job progress request asked to wait (its wait param)"""
+    wait = args.get('wait', 0, type=float) or 0
+    return min(max(wait, 0), config.JOB_POLL_MAX_WAIT)
+
+
+def _job_progress(job):
+    """What a waiting progress request waits to change: state and steps"""
+    summary = job_scheduler.describe(job)
+    return summary['state'], summary['steps']
+
+
+def _job_not_found(job_id):
+    return jsonify({
+        'success': False,
+        'error': f"Job '{job_id}' not found or expired"
+    }), 404
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the progress of a job: state ('queued', 'running', 'done',
+    'failed' or 'cancelled'), steps captured so far, estimated_steps and
+    estimated_ms (null without a cost model), the time it waited and ran,
+    and its queue_position while queued.
+    
+    Query params:
+        wait: seconds (at most JOB_POLL_MAX_WAIT) to hold the request until
+            the job's state or step count changes, for long polling
+    """
+    job = job_scheduler.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    wait = _job_wait(request.args)
+    if wait:
+        job_scheduler.wait(job, _job_progress(job), wait, JOB_POLL_INTERVAL)
+    return jsonify({
+        'success': True,
+        'job': job_scheduler.describe(job)
+    })
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """
+    Get the result of a finished job: the trace endpoint's response body,
+    in the encoding asked for at submission. Jobs not finished yet get 409,
+    failed ones 500 and cancelled ones 410. The result can be fetched
+    again until the job expires.
+    """
+    job = job_scheduler.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    body = job.body
+    # Pinned: the job may expire while the body is being sent
+    if job.state == 'done' and body is not None and body.pin():
+        mimetype = TRACE_MIMETYPE if job.encoding == 'binary' else 'application/json'
+        response = Response((chunk.tobytes() for chunk in body.chunks(close=False)),
+                            mimetype=mimetype)
+        response.content_length = len(body)
+        response.call_on_close(body.unpin)
+        return response
+    if job.state == 'done':
+        return _job_not_found(job_id)  # expired just now
+    if job.state == 'failed':
+        return jsonify({
+            'success': False,
+            'error': f'Execution failed: {job.error}'
+        }), 500
+    if job.state == 'cancelled':
+        return jsonify({
+            'success': False,
+            'error': 'Job was cancelled'
+        }), 410
+    return jsonify({
+        'success': False,
+        'error': 'Job not finished',
+        'job': job_scheduler.describe(job)
+    }), 409
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a job: a queued job is dropped, a running one stopped"""
+    job = job_scheduler.cancel(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return jsonify({
+        'success': True,
+        'job': job_scheduler.describe(job)
+    })
+
+
+@app.route('/api/algorithm/<algorithm_id>/batch', methods=['POST'])
+def generate_batch(algorithm_id):
+    """
+    Generate traces for many inputs of one algorithm.
+    
+    Takes {"inputs": [input, ...]} (at most BATCH_MAX_ITEMS) and the trace
+    endpoint's query parameters except page_size, applied to every input.
+    Traces are normalized unless format=full is given. Every input is
+    validated and checked against the budgets before any of them runs;
+    the valid ones then run in parallel on the worker pool.
+    
+    Responds with NDJSON, one line per input in submission order, each
+    sent as soon as its input and the ones before it are done:
+        {"index": i, "level": ..., "result": ..., "success": true, "trace": ...}
+        {"index": i, "success": false, "error": ..., "details": ...}
+    Results are cached like the trace endpoint's JSON responses.
+    """
+    try:
+        options = _trace_options(registry.get_metadata(algorithm_id))
+        if 'page_size' in request.args:
+            raise InvalidOption('Invalid page_size option', 'Batches return whole traces')
+        if 'format' not in request.args:
+            options['normalized'] = True
+        
+        payload = request.json
+        inputs = payload.get('inputs') if isinstance(payload, dict) else None
+        if not isinstance(inputs, list) or not inputs:
+            raise InvalidOption('Invalid batch', 'The body must be {"inputs": [input, ...]}')
+        if len(inputs) > config.BATCH_MAX_ITEMS:
+            raise InvalidOption('Batch too large',
+                                f'A batch has at most {config.BATCH_MAX_ITEMS} inputs')
         
+        with registry.acquire(algorithm_id) as algorithm:
+            items = [_batch_item(algorithm, input_data, options) for input_data in inputs]
+        return Response(_stream_batch(algorithm_id, items), mimetype=NDJSON_MIMETYPE)
+    
+    except InvalidOption as e:
+        return jsonify({
+            'success': False,
+            'error': e.error,
+            'details': e.details
+        }), 400
+    except HTTPException:
+        raise
     except ValueError as e:
         return jsonify({
             'success': False,
@@ -140,10 +966,180 @@ def generate_trace(algorithm_id):
     except Exception as e:
         return jsonify({
             'success': False,
-            'error': f'Execution failed: {str(e)}'
+            'error': f'Batch failed: {str(e)}'
         }), 500
 
 
+def _batch_item(algorithm, input_data, options):
+    """Validate and admit one batch input: its run arguments, or its error"""
+    try:
+        checked_input = algorithm.check_input(input_data)
+        run_options, estimate = _admit(algorithm, checked_input, options)
+    except ValidationError as e:
+        return {'error': 'Invalid input format', 'details': str(e)}
+    except TraceRejected as e:
+        return {'error': 'Trace too large', 'details': str(e)}
+    return {
+        'input': checked_input,
+        'options': run_options,
+        'estimate': estimate,
+        'key': make_cache_key(algorithm.id, algorithm.version, input_data, run_options, 'json')
+    }
+
+
+def _batch_body(algorithm_id, item):
+    """Get the JSON trace response of a batch input (bytes, or a SharedBody)"""
+    body = trace_cache.get(item['key'])
+    if body is not None:
+        return body
+    with admission.slot(item['estimate']):
+        shared = _run_in_worker(algorithm_id, item['input'], item['options'], 'json')
+    if len(shared) > trace_cache.max_entry_bytes:
+        return shared
+    body = shared.tobytes()
+    shared.close()
+    trace_cache.put(item['key'], body)
+    return body
+
+
+def _batch_error(error):
+    """Error message of a batch input that failed to run"""
+    if isinstance(error, JobTimeout):
+        return 'Trace timed out'
+    if isinstance(error, (PoolBusy, QueueTimeout)):
+        return 'Server busy'
+    if isinstance(error, WorkerFailed):
+        return 'Trace failed'
+    return 'Execution failed'
+
+
+def _discard_body(future):
+    """Free the result of a batch input that won't be sent"""
+    if not future.cancelled() and future.exception() is None:
+        body = future.result()
+        if isinstance(body, SharedBody):
+            body.close()
+
+
+def _stream_batch(algorithm_id, items):
+    """
+    Run the valid batch items, yielding their NDJSON lines in order.
+    
+    Each trace response body is spliced into its line as is, after the
+    index and level. Items run on as many threads as there are workers;
+    when the client disconnects, items not started are cancelled and
+    results not sent are freed.
+    """
+    dumps = app.json.dumps
+    executor = ThreadPoolExecutor(worker_pool.size if worker_pool is not None else 1,
+                                  thread_name_prefix='trace-batch')
+    futures = [
+        None if 'error' in item else executor.submit(_batch_body, algorithm_id, item)
+        for item in items
+    ]
+    sent = 0
+    try:
+        for index, (item, future) in enumerate(zip(items, futures)):
+            sent = index + 1
+            if future is None:
+                yield (dumps({'index': index, 'success': False, **item}) + '\n').encode('utf-8')
+                continue
+            try:
+                body = future.result()
+            except Exception as e:
+                yield (dumps({
+                    'index': index,
+                    'success': False,
+                    'error': _batch_error(e),
+                    'details': str(e)
+                }) + '\n').encode('utf-8')
+                continue
+            
+            prefix = '{"index": %d, "level": %s, ' % (index, dumps(item['options'].get('level', 'full')))
+            if isinstance(body, SharedBody):
+                # WSGI servers only write bytes: each chunk is copied as it goes
+                chunks = (chunk.tobytes() for chunk in body.chunks())
+            else:
+                chunks = iter((body,))
+            # The body is a JSON object: drop its '{' to continue the line's
+            yield prefix.encode('utf-8') + next(chunks)[1:]
+            yield from chunks
+            yield b'\n'
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        for future in futures[sent:]:
+            if future is not None:
+                future.add_done_callback(_discard_body)
+
+
+def _stream_trace(algorithm_id, input_data, options, estimate=None):
+    """
+    Stream the events of an algorithm run as NDJSON.
+    
+    Each line is {"event": kind, kind: value} for the metadata, step,
+    trace and result events of BaseAlgorithm.iter_traced(). A run stopped
+    by max_steps ends with {"event": "truncated", "total_steps": n}, and a
+    run that fails after the response has started with {"event": "error"}.
+    The algorithm stops when the client disconnects and the server closes
+    this generator.
+    """
+    options = dict(options)
+    max_steps = _step_limit(options.pop('max_steps', None))
+    dumps = app.json.dumps
+    events = _run_traced(algorithm_id, input_data, options, estimate)
+    try:
+        step_count = 0
+        for kind, value in events:
+            if kind == 'step':
+                if max_steps is not None and step_count >= max_steps:
+                    yield dumps({'event': 'truncated', 'total_steps': step_count}) + '\n'
+                    return
+                step_count += 1
+            yield dumps({'event': kind, kind: value}) + '\n'
+    except Exception as e:
+        yield dumps({'event': 'error', 'error': f'Execution failed: {str(e)}'}) + '\n'
+    finally:
+        events.close()
+
+
+def _trace_response(body, mimetype, cache_status):
+    """Wrap a serialized trace body in a response"""
+    response = Response(body, mimetype=mimetype)
+    response.headers['X-Trace-Cache'] = cache_status
+    response.vary.add('Accept')
+    return response
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Get trace cache and trace store statistics"""
+    return jsonify({
+        'success': True,
+        'cache': trace_cache.stats(),
+        'trace_store': trace_store.stats()
+    })
+
+
+@app.route('/api/pool/stats', methods=['GET'])
+def pool_stats():
+    """Get trace worker pool and job statistics"""
+    return jsonify({
+        'success': True,
+        'pool': worker_pool.stats() if worker_pool is not None else None,
+        'jobs': job_scheduler.stats()
+    })
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """Reject request bodies over MAX_REQUEST_BYTES before they are parsed"""
+    return jsonify({
+        'success': False,
+        'error': 'Request too large',
+        'details': f'Request bodies are limited to {config.MAX_REQUEST_BYTES} bytes'
+    }), 413
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -0,0 +1,292 @@
+"""
+ASGI entry point for the algoviz API: the routes of app.py on an event loop.
+
+    uvicorn asgi:app        (or python asgi.py)
+
+Every request is handled by the Flask app in app.py, called through WSGI
+on a bounded thread pool, so routes, options and error responses are the
+same as under app.py. Validation, execute_traced() and the wait for a
+trace worker run on those threads; the event loop only moves bytes.
+
+A response body is pulled from Flask one chunk at a time (items coalesced
+up to CHUNK_BYTES or CHUNK_SECONDS), and the next chunk is only produced
+once the previous one has been handed to the client's connection. A
+client that reads slowly therefore slows down its own trace stream
+instead of having it buffered, and holds no thread while it waits. A
+client that disconnects stops its stream at the next chunk.
+
+GET /api/jobs/<job_id>?wait=<seconds> long polls on the event loop: the
+request holds no thread until the job's state or step count changes.
+
+Against the Flask development server (app.run, a thread per connection),
+on one core with TRACE_WORKERS=1, while N clients long poll a queued job
+(wait=15) and a probe fetches /api/health:
+
+                     N      threads   RSS      /api/health p50 / p99
+    app.run          100    101       48 MB    12.6 / 14.1 ms
+                     500    501       65 MB    13.2 / 16.8 ms
+                     1000   1001      86 MB    12.7 / 16.1 ms
+    uvicorn asgi:app 100    3         49 MB     2.4 /  6.5 ms
+                     500    4         53 MB     2.8 /  7.2 ms
+                     1000   3         59 MB     3.3 / 22.3 ms
+
+Clients reading a trace slowly cost about the same on both, as long as the
+socket buffers can take the whole response; asgi.py keeps at most about
+two chunks per stream beyond that.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode
+import asyncio
+import io
+import re
+import sys
+import time
+
+from app import JOB_POLL_INTERVAL, _job_progress, _job_wait, job_scheduler, registry
+from app import app as flask_app
+import config
+
+# Response body bytes gathered before a chunk is sent
+CHUNK_BYTES = 64 * 1024
+
+# Seconds a partial chunk is held back for more items (streamed steps)
+CHUNK_SECONDS = 0.02
+
+_JOB_PATH = re.compile(r'^/api/jobs/([^/]+)$')
+
+# Threads running Flask handlers, shared by all requests
+executor = ThreadPoolExecutor(config.ASGI_THREADS, thread_name_prefix='asgi')
+
+# Threads pulling response bodies: apart, so streams already answered
+# don't wait behind handlers waiting for a trace worker
+body_executor = ThreadPoolExecutor(config.ASGI_THREADS, thread_name_prefix='asgi-body')
+
+
+class _WSGIArgs:
+    """Query params with Flask's args.get(name, default, type) interface"""
+
+    def __init__(self, query: Dict[str, List[str]]):
+        self._query = query
+
+    def get(self, name: str, default: Any = None, type: Any = None) -> Any:
+        values = self._query.get(name)
+        if not values:
+            return default
+        try:
+            return type(values[0]) if type is not None else values[0]
+        except ValueError:
+            return default
+
+
+def _environ(scope: Dict[str, Any], body: bytes, length: Optional[int] = None) -> Dict[str, Any]:
+    """Build the WSGI environ of an ASGI http request (length: declared body size)"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client')
+    raw_path = scope.get('raw_path')
+    path = raw_path.decode('latin-1') if raw_path else scope['path'].encode('utf-8').decode('latin-1')
+    root_path = scope.get('root_path', '')
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path,
+        'PATH_INFO': path,
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0] if client else '',
+        'CONTENT_LENGTH': str(len(body) if length is None else length),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name not in ('CONTENT_LENGTH', 'TRANSFER_ENCODING'):
+            # The body is passed whole, its length set above
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def _call_flask(environ: Dict[str, Any]) -> Tuple[int, List[Tuple[bytes, bytes]], Any]:
+    """Run the Flask app on a request (on an executor thread)"""
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        started[:] = [status, headers]
+
+    body = flask_app(environ, start_response)
+    status, headers = started
+    headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    return int(status.split(' ', 1)[0]), headers, body
+
+
+def _read_chunk(items) -> Tuple[bytes, bool]:
+    """
+    Pull body items until CHUNK_BYTES of them or CHUNK_SECONDS after the
+    first (on an executor thread).
+
+    Returns:
+        (chunk, whether the body is exhausted)
+    """
+    parts = []
+    size = 0
+    deadline = None
+    for item in items:
+        if item:
+            parts.append(item)
+            size += len(item)
+        if size >= CHUNK_BYTES:
+            return b''.join(parts), False
+        if deadline is None:
+            deadline = time.monotonic() + CHUNK_SECONDS
+        elif time.monotonic() >= deadline:
+            return b''.join(parts), False
+    return b''.join(parts), True
+
+
+def _declared_length(scope: Dict[str, Any]) -> Optional[int]:
+    for name, value in scope['headers']:
+        if name.lower() == b'content-length':
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+async def _read_body(receive) -> Optional[bytes]:
+    """
+    Read the request body, stopping past MAX_REQUEST_BYTES (Flask answers
+    413 by its length). None if the client disconnected.
+    """
+    parts = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body = message.get('body', b'')
+        parts.append(body)
+        size += len(body)
+        if size > config.MAX_REQUEST_BYTES or not message.get('more_body', False):
+            return b''.join(parts)
+
+
+async def _wait_for_job(scope: Dict[str, Any], job_id: str) -> bool:
+    """
+    Hold a job progress request with a wait param on the event loop until
+    the job's state or step count changes. Returns False if there was
+    nothing to wait for.
+    """
+    query = parse_qs(scope['query_string'].decode('latin-1'))
+    wait = _job_wait(_WSGIArgs(query))
+    job = job_scheduler.get(job_id) if wait else None
+    if job is None:
+        return False
+    seen = _job_progress(job)
+    deadline = time.monotonic() + wait
+    while _job_progress(job) == seen and time.monotonic() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+    return True
+
+
+def _without_wait(query_string: bytes) -> bytes:
+    query = parse_qs(query_string.decode('latin-1'), keep_blank_values=True)
+    query.pop('wait', None)
+    return urlencode(query, doseq=True).encode('latin-1')
+
+
+async def _watch_disconnect(receive) -> None:
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _http(scope: Dict[str, Any], receive, send):
+    loop = asyncio.get_running_loop()
+    length = _declared_length(scope)
+    if length is not None and length > config.MAX_REQUEST_BYTES:
+        body = b''  # not read: Flask answers 413 by the declared length
+    else:
+        length = None
+        body = await _read_body(receive)
+        if body is None:
+            return
+
+    match = _JOB_PATH.match(scope['path'])
+    if scope['method'] == 'GET' and match and await _wait_for_job(scope, match.group(1)):
+        # Waited here; Flask answers at once
+        scope = {**scope, 'query_string': _without_wait(scope['query_string'])}
+
+    status, headers, response = await loop.run_in_executor(
+        executor, _call_flask, _environ(scope, body, length)
+    )
+    items = iter(response)
+    disconnected = asyncio.ensure_future(_watch_disconnect(receive))
+    pending = None
+    try:
+        pending = loop.run_in_executor(body_executor, _read_chunk, items)
+        chunk, done = await pending
+        pending = None
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        while True:
+            if not done:
+                # Produce the next chunk while this one goes out
+                pending = loop.run_in_executor(body_executor, _read_chunk, items)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': not done})
+            if done or disconnected.done():
+                break
+            chunk, done = await pending
+            pending = None
+    finally:
+        disconnected.cancel()
+        if pending is not None:
+            # A generator can't be closed while it runs
+            await asyncio.wait([pending])
+        if hasattr(response, 'close'):
+            await loop.run_in_executor(body_executor, response.close)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False, cancel_futures=True)
+            body_executor.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope: Dict[str, Any], receive, send):
+    """ASGI application serving the routes of app.py"""
+    if scope['type'] == 'http':
+        await _http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("\n" + "="*60)
+    print("🚀 Algorithm Visualizer Backend (ASGI)")
+    print("="*60)
+    print(f"Registered algorithms: {len(registry.list_all())}")
+    print(f"Server: uvicorn, {config.ASGI_THREADS} handler threads")
+    print("Server running on http://localhost:5000")
+    print("="*60 + "\n")
+
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,94 @@
+"""
+Backend configuration.
+Every setting can be overridden with an environment variable of the same name.
+"""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+# Trace cache: total size of the cached response bodies, in bytes.
+# 0 disables the cache.
+TRACE_CACHE_MAX_BYTES = _env_int('TRACE_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+
+# Response bodies larger than this are not cached, so a single huge trace
+# can't flush everything else out.
+TRACE_CACHE_MAX_ENTRY_BYTES = _env_int('TRACE_CACHE_MAX_ENTRY_BYTES', 8 * 1024 * 1024)
+
+# Input limits, enforced before anything runs: request body size in bytes
+# (larger bodies get 413 before they are parsed), and records per input
+# (algorithms can set a lower "max_items" in their input_schema).
+MAX_REQUEST_BYTES = _env_int('MAX_REQUEST_BYTES', 128 * 1024 * 1024)
+MAX_INPUT_ITEMS = _env_int('MAX_INPUT_ITEMS', 1_000_000)
+
+# Worker processes a mode=parallel trace may ask for (more get 400).
+TRACE_MAX_PARALLEL_WORKERS = _env_int('TRACE_MAX_PARALLEL_WORKERS', os.cpu_count() or 1)
+
+# Trace budgets, checked against each request's estimated cost before it
+# runs (0: no limit): steps, bytes of the JSON trace, and milliseconds.
+TRACE_BUDGET_STEPS = _env_int('TRACE_BUDGET_STEPS', 2_000_000)
+TRACE_BUDGET_BYTES = _env_int('TRACE_BUDGET_BYTES', 64 * 1024 * 1024)
+TRACE_BUDGET_MS = _env_int('TRACE_BUDGET_MS', 30_000)
+
+# Over budget, run at the highest capture level that fits (1) or reject (0).
+TRACE_DOWNGRADE = _env_int('TRACE_DOWNGRADE', 1)
+
+# Runs estimated to take more than TRACE_HEAVY_MS share TRACE_HEAVY_SLOTS
+# slots; the others wait up to TRACE_QUEUE_TIMEOUT seconds, then get 503.
+TRACE_HEAVY_MS = _env_int('TRACE_HEAVY_MS', 1000)
+TRACE_HEAVY_SLOTS = _env_int('TRACE_HEAVY_SLOTS', 2)
+TRACE_QUEUE_TIMEOUT = _env_int('TRACE_QUEUE_TIMEOUT', 30)
+
+# Trace store (trace handles): traces kept at once, and seconds an unused
+# one is kept before it is dropped.
+TRACE_STORE_MAX_TRACES = _env_int('TRACE_STORE_MAX_TRACES', 32)
+TRACE_STORE_TTL = _env_int('TRACE_STORE_TTL', 600)
+
+# Steps kept per stored trace; longer runs are truncated.
+TRACE_STORE_MAX_STEPS = _env_int('TRACE_STORE_MAX_STEPS', 1_000_000)
+
+# Step pages: default and largest page size, and seconds a page request
+# waits for steps that are still being produced.
+TRACE_PAGE_SIZE = _env_int('TRACE_PAGE_SIZE', 100)
+TRACE_PAGE_MAX_SIZE = _env_int('TRACE_PAGE_MAX_SIZE', 5000)
+TRACE_PAGE_TIMEOUT = _env_int('TRACE_PAGE_TIMEOUT', 30)
+
+# Trace worker processes (0 runs traces in the server process). A trace
+# running longer than TRACE_JOB_TIMEOUT seconds is killed (504), one going
+# over TRACE_WORKER_MEMORY_MB of address space fails (503), and each worker
+# is replaced after TRACE_WORKER_MAX_JOBS traces.
+TRACE_WORKERS = _env_int('TRACE_WORKERS', min(4, os.cpu_count() or 1))
+TRACE_JOB_TIMEOUT = _env_int('TRACE_JOB_TIMEOUT', 60)
+TRACE_WORKER_MEMORY_MB = _env_int('TRACE_WORKER_MEMORY_MB', 2048)
+TRACE_WORKER_MAX_JOBS = _env_int('TRACE_WORKER_MAX_JOBS', 100)
+
+# Requests wait up to TRACE_POOL_QUEUE_TIMEOUT seconds for a free worker,
+# and at most TRACE_POOL_MAX_QUEUE of them wait at once (503 otherwise).
+TRACE_POOL_QUEUE_TIMEOUT = _env_int('TRACE_POOL_QUEUE_TIMEOUT', 10)
+TRACE_POOL_MAX_QUEUE = _env_int('TRACE_POOL_MAX_QUEUE', 32)
+
+# Asynchronous trace jobs: JOB_WORKERS run at once, shortest predicted
+# first. A queued job gains JOB_AGING_MS of priority per second waited,
+# and a client's recent usage (halved every JOB_FAIRNESS_HALF_LIFE
+# seconds) counts against its next jobs. Finished jobs are kept for
+# JOB_RESULT_TTL seconds, JOB_MAX_FINISHED of them at most.
+JOB_WORKERS = _env_int('JOB_WORKERS', 2)
+JOB_MAX_QUEUED = _env_int('JOB_MAX_QUEUED', 256)
+JOB_AGING_MS = _env_int('JOB_AGING_MS', 1000)
+JOB_FAIRNESS_HALF_LIFE = _env_int('JOB_FAIRNESS_HALF_LIFE', 60)
+JOB_RESULT_TTL = _env_int('JOB_RESULT_TTL', 600)
+JOB_MAX_FINISHED = _env_int('JOB_MAX_FINISHED', 64)
+
+# Seconds GET /api/jobs/<id>?wait= may wait for a job's progress to change
+JOB_POLL_MAX_WAIT = _env_int('JOB_POLL_MAX_WAIT', 30)
+
+# asgi.py: threads running the Flask app's handlers at once
+ASGI_THREADS = _env_int('ASGI_THREADS', 64)
+
+# Inputs accepted by one batch trace request
+BATCH_MAX_ITEMS = _env_int('BATCH_MAX_ITEMS', 1000)
@@ -0,0 +1,113 @@
+"""
+Content-addressed cache of serialized trace responses.
+Identical requests (same algorithm, version, input and options) share one
+response body, so a hit skips both execution and JSON encoding.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import threading
+
+
+def make_cache_key(algorithm_id: str, version: str, input_data: Any,
+                   options: Dict[str, Any], encoding: str = 'json') -> str:
+    """
+    Build the cache key of a trace request.
+
+    The input and options are canonicalized (sorted keys, no whitespace)
+    before hashing, so requests that differ only in key order or formatting
+    share an entry.
+
+    Args:
+        algorithm_id: Algorithm identifier
+        version: Algorithm version (from its metadata)
+        input_data: Parsed request input
+        options: Trace options passed to collect_trace
+        encoding: Response body encoding
+
+    Returns:
+        '<algorithm_id>@<version>:<sha256 of input and options>'
+    """
+    canonical = json.dumps(
+        [input_data, options, encoding],
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False
+    )
+    digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    return f"{algorithm_id}@{version}:{digest}"
+
+
+class TraceCache:
+    """LRU cache of response bodies, bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        """
+        Args:
+            max_bytes: Total size of the cached bodies (0 disables caching)
+            max_entry_bytes: Largest body worth caching (default: max_bytes)
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes if max_entry_bytes is None else max_entry_bytes
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejected = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a cached body and mark it most recently used"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return body
+
+    def put(self, key: str, body: bytes):
+        """Cache a body, evicting least recently used ones to make room"""
+        size = len(body)
+        with self._lock:
+            if size > self.max_entry_bytes or size > self.max_bytes:
+                self._rejected += 1
+                return
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            while self._size + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._evictions += 1
+
+            self._entries[key] = body
+            self._size += size
+
+    def clear(self):
+        """Drop every cached body (stats are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'max_entry_bytes': self.max_entry_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'rejected': self._rejected
+            }
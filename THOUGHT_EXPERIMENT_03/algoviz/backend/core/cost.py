@@ -0,0 +1,334 @@
+"""
+Trace cost model and admission control.
+
+An algorithm's cost model (cost_model.json, next to its metadata.json)
+predicts, from the input size n, the steps, serialized bytes and
+milliseconds of a run, per profile:
+
+    {
+        "trace:full": {
+            "steps": {"n": 6.0, "1": 6.0},
+            "bytes": {"n^2": 30.1, "n": 412.0},
+            "ms": {"n^2": 0.0004, "n": 0.02}
+        },
+        ...
+    }
+
+A profile is '<mode>:<level>', plus ':normalized' for normalized traces
+(see profile_key). Each metric is a sum of coefficient * term, with terms
+from TERMS. The coefficients come from calibration runs (calibrate(), or
+`python -m core.cost <algorithm id>` to write cost_model.json), fitted
+over 1, n, the metadata complexity terms and n^2: traces that copy state
+into their steps grow faster than the algorithm itself.
+
+AdmissionControl compares an estimate with the configured budgets and
+decides whether a request runs as asked, runs at a lower capture level,
+or is rejected. Runs predicted to be slow also wait for one of a few
+heavy-run slots.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import json
+import math
+import re
+import threading
+import time
+
+from core.tracer import CAPTURE_LEVELS
+
+
+# Growth terms, by the name used in cost models and complexity strings
+TERMS: Dict[str, Callable[[int], float]] = {
+    '1': lambda n: 1.0,
+    'log n': lambda n: math.log2(n) if n > 1 else 0.0,
+    'n': lambda n: float(n),
+    'n log n': lambda n: n * math.log2(n) if n > 1 else 0.0,
+    'n^2': lambda n: float(n) * n
+}
+
+METRICS = ('steps', 'bytes', 'ms')
+
+
+def parse_complexity(complexity: str) -> Optional[str]:
+    """
+    Get the term of a big-O string, e.g. 'O(n log n)' -> 'n log n'.
+
+    Returns:
+        A key of TERMS, or None if the string isn't one of them
+    """
+    match = re.fullmatch(r'\s*O\((.*)\)\s*', complexity or '')
+    if not match:
+        return None
+    term = re.sub(r'\s+', ' ', match.group(1).strip().replace('²', '^2'))
+    return term if term in TERMS else None
+
+
+def candidate_terms(complexity: Optional[Dict[str, str]]) -> List[str]:
+    """Terms a cost model is fitted over: 1, n, the complexity terms and n^2"""
+    terms = ['1', 'n']
+    for key in ('time', 'space'):
+        term = parse_complexity((complexity or {}).get(key, ''))
+        if term is not None:
+            terms.append(term)
+    terms.append('n^2')
+    return sorted(set(terms), key=list(TERMS).index)
+
+
+def profile_key(mode: str = 'trace', level: str = 'full', normalized: bool = False) -> str:
+    """Name of the cost model profile of a set of trace options"""
+    key = f'{mode}:{level}'
+    return f'{key}:normalized' if normalized else key
+
+
+def fit(samples: Sequence[Tuple[int, float]], terms: Sequence[str]) -> Dict[str, float]:
+    """
+    Fit non-negative coefficients of terms to (n, value) samples.
+
+    Least squares on the relative error, so small and large inputs weigh
+    the same. Terms that come out negative are dropped and the rest fitted
+    again.
+    """
+    samples = [(n, value) for n, value in samples if value > 0]
+    terms = list(terms)
+    while terms and samples:
+        rows = [[TERMS[term](n) / value for term in terms] for n, value in samples]
+        coefficients = _least_squares(rows, [1.0] * len(rows))
+        if coefficients is not None and min(coefficients) >= 0:
+            # Drop terms adding under 0.1% at the largest sample
+            n, value = max(samples)
+            return {
+                term: c for term, c in zip(terms, coefficients)
+                if c * TERMS[term](n) > 0.001 * value
+            }
+        if coefficients is None:
+            terms.pop()
+        else:
+            terms.pop(coefficients.index(min(coefficients)))
+    return {}
+
+
+def _least_squares(rows: List[List[float]], targets: List[float]) -> Optional[List[float]]:
+    """Solve the normal equations by Gaussian elimination (None if singular)"""
+    size = len(rows[0])
+    matrix = [
+        [sum(row[i] * row[j] for row in rows) for j in range(size)]
+        + [sum(row[i] * t for row, t in zip(rows, targets))]
+        for i in range(size)
+    ]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(matrix[r][col]))
+        if abs(matrix[pivot][col]) < 1e-12 * max(1.0, abs(matrix[col][col])):
+            return None
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+        for r in range(size):
+            if r != col:
+                factor = matrix[r][col] / matrix[col][col]
+                matrix[r] = [a - factor * b for a, b in zip(matrix[r], matrix[col])]
+    return [matrix[i][size] / matrix[i][i] for i in range(size)]
+
+
+class CostModel:
+    """Cost predictions of one algorithm, from its cost_model.json"""
+
+    def __init__(self, model: Dict[str, Dict[str, Dict[str, float]]]):
+        """
+        Args:
+            model: profile -> metric -> term -> coefficient
+        """
+        self.model = model or {}
+
+    def estimate(self, n: int, mode: str = 'trace', level: str = 'full',
+                 normalized: bool = False, max_steps: Optional[int] = None
+                 ) -> Optional[Dict[str, Any]]:
+        """
+        Predict the cost of a run.
+
+        Uncalibrated profiles fall back to the plain (not normalized) one,
+        then to level 'full', which overestimates. With a step budget,
+        steps are capped at it and bytes and time scaled down to match.
+
+        Returns:
+            {'steps', 'bytes', 'ms'} (ints), or None if the profile isn't
+            calibrated
+        """
+        for key in (profile_key(mode, level, normalized), profile_key(mode, level),
+                    profile_key(mode, 'full', normalized), profile_key(mode, 'full')):
+            profile = self.model.get(key)
+            if profile is not None:
+                break
+        else:
+            return None
+
+        estimate = {
+            metric: sum(c * TERMS[term](n) for term, c in profile.get(metric, {}).items())
+            for metric in METRICS
+        }
+        if max_steps is not None and estimate['steps'] > max_steps:
+            scale = max_steps / estimate['steps']
+            estimate = {
+                'steps': max_steps,
+                'bytes': estimate['bytes'] * scale,
+                'ms': estimate['ms'] * scale
+            }
+        return {metric: int(math.ceil(value)) for metric, value in estimate.items()}
+
+
+class TraceRejected(Exception):
+    """A request's estimated cost is over budget at every allowed level"""
+
+
+class QueueTimeout(Exception):
+    """No heavy-run slot came free in time"""
+
+
+class AdmissionControl:
+    """Decides, from cost estimates, whether and how a trace request runs"""
+
+    def __init__(self, max_steps: int, max_bytes: int, max_ms: int,
+                 downgrade: bool = True, heavy_ms: int = 1000,
+                 heavy_slots: int = 2, queue_timeout: float = 30):
+        """
+        Args:
+            max_steps, max_bytes, max_ms: Budgets of a single run (0: no limit)
+            downgrade: Run over-budget requests at a lower capture level if
+                one fits, instead of rejecting them
+            heavy_ms: Estimated time above which a run needs a heavy slot
+            heavy_slots: Heavy runs at once; others wait for a slot
+            queue_timeout: Seconds to wait for a heavy slot
+        """
+        self.budgets = {'steps': max_steps, 'bytes': max_bytes, 'ms': max_ms}
+        self.downgrade = downgrade
+        self.heavy_ms = heavy_ms
+        self.heavy_slots = heavy_slots
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(heavy_slots)
+
+    def fits(self, estimate: Optional[Dict[str, int]]) -> bool:
+        """Check an estimate against the budgets (unknown costs fit)"""
+        if estimate is None:
+            return True
+        return all(not limit or estimate[metric] <= limit
+                   for metric, limit in self.budgets.items())
+
+    def decide(self, estimate_at: Callable[[str], Optional[Dict[str, int]]],
+               level: str) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        Pick the capture level a request runs at.
+
+        Args:
+            estimate_at: Returns the estimate of the request at a level
+            level: The requested level
+
+        Returns:
+            (level to run at, its estimate)
+
+        Raises:
+            TraceRejected: If no allowed level fits the budgets
+        """
+        estimate = estimate_at(level)
+        if self.fits(estimate):
+            return level, estimate
+        if self.downgrade:
+            for lower in reversed(CAPTURE_LEVELS[:CAPTURE_LEVELS.index(level)]):
+                lower_estimate = estimate_at(lower)
+                if self.fits(lower_estimate):
+                    return lower, lower_estimate
+        over = [
+            f'{metric} {estimate[metric]} > {limit}'
+            for metric, limit in self.budgets.items()
+            if limit and estimate[metric] > limit
+        ]
+        raise TraceRejected(f"Estimated trace cost is over budget: {', '.join(over)}")
+
+    def is_heavy(self, estimate: Optional[Dict[str, int]]) -> bool:
+        """Check whether a run needs a heavy slot"""
+        return estimate is not None and estimate['ms'] > self.heavy_ms
+
+    @contextmanager
+    def slot(self, estimate: Optional[Dict[str, int]]) -> Iterator[None]:
+        """
+        Hold a heavy-run slot for the block, if the run is heavy.
+
+        Raises:
+            QueueTimeout: If no slot came free within queue_timeout
+        """
+        if not self.is_heavy(estimate):
+            yield
+            return
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise QueueTimeout('Too many large traces running, try again later')
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+def calibrate(algorithm, sizes: Sequence[int] = (50, 100, 200, 400, 800),
+              repeats: int = 3) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Fit a cost model from runs on generated inputs.
+
+    Runs every profile: modes 'trace' and 'decisions' at each capture
+    level, plain and normalized, mode 'result', and mode 'parallel' if the
+    algorithm has it (its trace_modes). Bytes are those of the
+    compact JSON trace; time is that of running and encoding it, the best
+    of repeats runs.
+
+    Args:
+        algorithm: Algorithm instance with generate_input()
+        sizes: Input sizes to run
+        repeats: Runs per size, for the time
+
+    Returns:
+        The cost model, for the algorithm's cost_model.json
+    """
+    profiles = [(mode, level, normalized)
+                for mode in ('trace', 'decisions')
+                for level in CAPTURE_LEVELS
+                for normalized in (False, True)]
+    profiles.append(('result', 'full', False))
+    if 'parallel' in getattr(algorithm, 'trace_modes', ()):
+        # A few steps per chunk at any level: 'full' stands for all of them
+        profiles.append(('parallel', 'full', False))
+    terms = candidate_terms(algorithm.metadata.get('complexity'))
+
+    model = {}
+    for mode, level, normalized in profiles:
+        samples = {metric: [] for metric in METRICS}
+        for n in sizes:
+            input_data = algorithm.check_input(algorithm.generate_input(n))
+            options = {'mode': mode, 'level': level, 'normalized': normalized}
+            best = None
+            for _ in range(repeats):
+                started = time.perf_counter()
+                trace, _ = algorithm.collect_trace(input_data, **options)
+                size = len(json.dumps(trace, separators=(',', ':')))
+                elapsed = (time.perf_counter() - started) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            samples['steps'].append((n, trace['total_steps']))
+            samples['bytes'].append((n, size))
+            samples['ms'].append((n, best))
+        model[profile_key(mode, level, normalized)] = {
+            metric: {term: float(f'{c:.6g}') for term, c in fit(samples[metric], terms).items()}
+            for metric in METRICS
+        }
+    return model
+
+
+if __name__ == '__main__':
+    import sys
+
+    from algorithms.registry import registry
+
+    if len(sys.argv) != 2:
+        sys.exit('Usage: python -m core.cost <algorithm id>')
+    registry.discover()
+    algorithm = registry.get(sys.argv[1])
+    cost_model = calibrate(algorithm)
+
+    path = algorithm.cost_model_path()
+    with open(path, 'w') as f:
+        json.dump(cost_model, f, indent=2)
+        f.write('\n')
+    print(f'Wrote {len(cost_model)} profiles to {path}')
@@ -0,0 +1,369 @@
+"""
+Asynchronous trace jobs, run shortest predicted first.
+
+A job is a trace request run in the background: submit() queues it and
+returns at once, and the client polls its progress and fetches its result
+later. A fixed number of scheduler threads each take the queued job with
+the lowest priority value:
+
+    predicted ms + the client's recent usage - aging * seconds waited
+
+- predicted ms comes from the algorithm's cost model, so small traces go
+  ahead of large ones
+- a client's recent usage is the predicted ms of its jobs started lately
+  (halved every fairness_half_life seconds), so a client submitting many
+  jobs doesn't hold everyone else up
+- aging (ms of priority per second waited) bounds how long a large job
+  waits: one predicted at p ms goes ahead of new small jobs after about
+  p / aging seconds
+
+A running job reports its step count and checks for cancellation through
+a JobControl, a small shared memory segment the worker process writes to.
+Finished jobs are kept for ttl seconds, and at most max_finished of them.
+"""
+
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import secrets
+import threading
+import time
+
+from core.shared_body import SharedBody, segment_name
+
+
+JOB_STATES = ('queued', 'running', 'done', 'failed', 'cancelled')
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are queued"""
+
+
+class JobControl:
+    """Step count and cancel flag of a running job, shared with its worker"""
+
+    SIZE = 16
+
+    def __init__(self, name: Optional[str] = None):
+        """
+        Args:
+            name: Segment to attach to (in the worker), or None to create one
+        """
+        if name is None:
+            self._segment = shared_memory.SharedMemory(segment_name(), create=True, size=self.SIZE)
+        else:
+            self._segment = shared_memory.SharedMemory(name)
+        self.name = self._segment.name
+        self._steps = self._segment.buf[:8].cast('q')
+        self._flags = self._segment.buf[8:self.SIZE]
+
+    @property
+    def steps(self) -> int:
+        """Steps the job has captured so far"""
+        return self._steps[0]
+
+    def report(self, steps: int):
+        """Record the step count (BaseAlgorithm.collect_trace() progress)"""
+        self._steps[0] = steps
+
+    def cancel(self):
+        """Ask the job to stop"""
+        self._flags[0] = 1
+
+    def is_set(self) -> bool:
+        """Check for cancellation (BaseAlgorithm.collect_trace() cancel)"""
+        return self._flags[0] == 1
+
+    def close(self, unlink: bool = False):
+        """Detach, and remove the segment if unlink (the creator's side)"""
+        self._steps.release()
+        self._flags.release()
+        self._segment.close()
+        if unlink:
+            self._segment.unlink()
+
+
+class Job:
+    """One trace request and its state"""
+
+    def __init__(self, client: str, algorithm_id: str, input_data: Any,
+                 options: Dict[str, Any], encoding: str = 'json',
+                 estimate: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            client: Who submitted it, for fairness
+            algorithm_id: Algorithm to run
+            input_data: Validated input
+            options: BaseAlgorithm.collect_trace() options
+            encoding: Result body encoding, 'json' or 'binary'
+            estimate: Estimated cost (core.cost), None if unknown
+        """
+        self.id = secrets.token_urlsafe(12)
+        self.client = client
+        self.algorithm_id = algorithm_id
+        self.input_data = input_data
+        self.options = options
+        self.encoding = encoding
+        self.estimate = estimate
+        self.state = 'queued'
+        self.error: Optional[str] = None
+        self.body: Optional[SharedBody] = None
+        self.control: Optional[JobControl] = None
+        self.cancel_requested = False
+        self.submitted = time.monotonic()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._steps = 0
+
+    @property
+    def steps(self) -> int:
+        """Steps captured so far"""
+        control = self.control
+        return control.steps if control is not None else self._steps
+
+    def summary(self) -> Dict[str, Any]:
+        """State and progress of the job (see JobScheduler.describe())"""
+        now = time.monotonic()
+        summary = {
+            'id': self.id,
+            'algorithm': self.algorithm_id,
+            'state': self.state,
+            'level': self.options.get('level', 'full'),
+            'steps': self.steps,
+            'estimated_steps': self.estimate['steps'] if self.estimate else None,
+            'estimated_ms': self.estimate['ms'] if self.estimate else None,
+            'waited_ms': round(1000 * ((self.started or now) - self.submitted))
+        }
+        if self.started is not None:
+            summary['run_ms'] = round(1000 * ((self.finished or now) - self.started))
+        if self.error is not None:
+            summary['error'] = self.error
+        return summary
+
+
+class JobScheduler:
+    """Runs queued jobs on a few threads, shortest predicted first"""
+
+    def __init__(self, run: Callable[[Job], SharedBody], workers: int = 2,
+                 max_queued: int = 256, aging: float = 1000,
+                 fairness_half_life: float = 60, ttl: float = 600,
+                 max_finished: int = 64, default_ms: int = 1000):
+        """
+        Args:
+            run: Runs a job (its control is set) and returns its result
+                body; called on a scheduler thread
+            workers: Jobs run at once
+            max_queued: Jobs waiting at once (JobQueueFull otherwise)
+            aging: Priority, in predicted ms, a job gains per second waited
+            fairness_half_life: Seconds for a client's usage to halve
+            ttl: Seconds a finished job is kept
+            max_finished: Finished jobs kept at once (oldest dropped first)
+            default_ms: Predicted ms of jobs without an estimate
+        """
+        self.run = run
+        self.workers = workers
+        self.max_queued = max_queued
+        self.aging = aging
+        self.fairness_half_life = fairness_half_life
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.default_ms = default_ms
+        self._jobs: Dict[str, Job] = {}
+        self._queued: List[Job] = []
+        self._finished: 'OrderedDict[str, Job]' = OrderedDict()
+        # client -> (recent usage in predicted ms, when it was last updated)
+        self._usage: Dict[str, Tuple[float, float]] = {}
+        self._changed = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stats = {'submitted': 0, 'rejected': 0, 'done': 0, 'failed': 0, 'cancelled': 0}
+
+    def submit(self, job: Job) -> Job:
+        """
+        Queue a job.
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+        """
+        with self._changed:
+            self._expire()
+            if len(self._queued) >= self.max_queued:
+                self._stats['rejected'] += 1
+                raise JobQueueFull(f'{len(self._queued)} trace jobs already queued')
+            self._jobs[job.id] = job
+            self._queued.append(job)
+            self._stats['submitted'] += 1
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name='trace-job', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._changed.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job (None if unknown or expired)"""
+        with self._changed:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job: a queued one is dropped, a running one stopped at its
+        next step. Finished jobs are left as they are.
+
+        Returns:
+            The job, or None if unknown
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.state == 'queued':
+                self._queued.remove(job)
+                self._finish(job, 'cancelled')
+            elif job.state == 'running':
+                job.cancel_requested = True
+                job.control.cancel()
+            return job
+
+    def wait(self, job: Job, seen: Tuple[str, int], timeout: float,
+             interval: float = 0.1) -> Tuple[str, int]:
+        """
+        Wait until a job's (state, steps) differs from seen, or timeout.
+
+        A state change wakes the wait at once. The step count is written by
+        the worker running the job, which can't notify, so it is re-read
+        every interval seconds.
+
+        Returns:
+            The job's (state, steps)
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                progress = (job.state, job.steps)
+                remaining = deadline - time.monotonic()
+                if progress != seen or remaining <= 0:
+                    return progress
+                self._changed.wait(min(remaining, interval))
+
+    def describe(self, job: Job) -> Dict[str, Any]:
+        """
+        Get the state and progress of a job, plus, while it is queued,
+        queue_position: the jobs that would run before it now.
+        """
+        with self._changed:
+            summary = job.summary()
+            if job.state == 'queued':
+                now = time.monotonic()
+                priority = self._priority(job, now)
+                summary['queue_position'] = sum(
+                    self._priority(other, now) < priority for other in self._queued
+                )
+            return summary
+
+    def stats(self) -> Dict[str, Any]:
+        """Get job counts by state and the scheduler settings"""
+        with self._changed:
+            self._expire()
+            states = {state: 0 for state in JOB_STATES}
+            for job in self._jobs.values():
+                states[job.state] += 1
+            return {
+                **states,
+                'workers': self.workers,
+                'max_queued': self.max_queued,
+                'aging': self.aging,
+                'totals': dict(self._stats)
+            }
+
+    def clear(self):
+        """Drop queued and finished jobs and stop running ones, e.g. at exit"""
+        with self._changed:
+            for job in list(self._queued):
+                self._queued.remove(job)
+                self._finish(job, 'cancelled')
+            for job in self._jobs.values():
+                if job.state == 'running':
+                    job.cancel_requested = True
+                    job.control.cancel()
+            for job_id in list(self._finished):
+                self._drop(job_id)
+
+    def _cost(self, job: Job) -> float:
+        return job.estimate['ms'] if job.estimate else self.default_ms
+
+    def _client_usage(self, client: str, now: float) -> float:
+        usage, at = self._usage.get(client, (0.0, now))
+        return usage * 0.5 ** ((now - at) / self.fairness_half_life)
+
+    def _priority(self, job: Job, now: float) -> float:
+        """Lower runs first (lock held)"""
+        return (self._cost(job) + self._client_usage(job.client, now)
+                - self.aging * (now - job.submitted))
+
+    def _work(self):
+        """Scheduler thread: run queued jobs, best priority first"""
+        while True:
+            with self._changed:
+                while not self._queued:
+                    self._changed.wait()
+                now = time.monotonic()
+                job = min(self._queued, key=lambda queued: self._priority(queued, now))
+                self._queued.remove(job)
+                self._usage[job.client] = (self._client_usage(job.client, now) + self._cost(job), now)
+                job.state = 'running'
+                job.started = now
+                job.control = JobControl()
+                self._changed.notify_all()
+            self._run(job)
+
+    def _run(self, job: Job):
+        body = error = None
+        try:
+            body = self.run(job)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        with self._changed:
+            if job.cancel_requested:
+                if body is not None:
+                    body.close()
+                self._finish(job, 'cancelled')
+            elif error is not None:
+                self._finish(job, 'failed', error=error)
+            else:
+                self._finish(job, 'done', body=body)
+
+    def _finish(self, job: Job, state: str, body: Optional[SharedBody] = None,
+                error: Optional[str] = None):
+        """Record the end of a job (lock held)"""
+        control, job.control = job.control, None
+        if control is not None:
+            job._steps = control.steps
+            control.close(unlink=True)
+        job.state = state
+        job.body = body
+        job.error = error
+        job.input_data = None
+        job.finished = time.monotonic()
+        self._stats[state] += 1
+        self._finished[job.id] = job
+        while len(self._finished) > self.max_finished:
+            self._drop(next(iter(self._finished)))
+        self._changed.notify_all()
+
+    def _expire(self):
+        """Drop finished jobs older than the TTL (lock held)"""
+        cutoff = time.monotonic() - self.ttl
+        while self._finished:
+            job = next(iter(self._finished.values()))
+            if job.finished >= cutoff:
+                break
+            self._drop(job.id)
+
+    def _drop(self, job_id: str):
+        """Forget a finished job and free its result (lock held)"""
+        job = self._finished.pop(job_id)
+        del self._jobs[job_id]
+        if job.body is not None:
+            job.body.close()
+            job.body = None
@@ -0,0 +1,303 @@
+"""
+Compact binary encoding of TraceGenerator output.
+
+Same content as the JSON trace, without the repeated keys: step_number is
+implied by position, timestamps are varint deltas in microseconds, and every
+string (dict keys, event types, values) is sent once and then referenced by
+index. Dicts with a key set seen before only send a reference to it.
+
+Format (all integers are unsigned LEB128 varints unless noted):
+
+    document   := "AVT\\x01" location:u8 step_count steps* value
+    location   := 0 no steps | 1 steps in value["steps"]
+                | 2 steps in value["trace"]["steps"]
+                  (the value holds null where the steps go)
+    step       := type:string timestamp_delta:zigzag data:value
+    string     := n, then if n is odd: reference to string table[n >> 1]
+                  else: (n >> 1) bytes of UTF-8, appended to the string table
+    value      := tag:u8 payload
+        0 null  1 false  2 true
+        3 int     zigzag varint (n >= 0 -> 2n, n < 0 -> -2n - 1)
+        4 float   8 bytes, little-endian IEEE 754 double
+        5 string  string
+        6 list    count value*
+        7 dict    count key:string* value*   (key set appended to shape table)
+        8 dict    shape_index value*         (keys from shape table)
+        9 list    count zigzag*              (non-empty list of ints only)
+
+Timestamps decode as microseconds / 1e6, which is exact for the
+datetime-based timestamps TraceGenerator captures.
+"""
+
+from typing import Any, Dict, List, Tuple
+import json
+import struct
+
+
+TRACE_MIMETYPE = 'application/x-algoviz-trace'
+
+MAGIC = b'AVT\x01'
+
+NO_STEPS, TOP_LEVEL_STEPS, TRACE_STEPS = range(3)
+
+NULL, FALSE, TRUE, INT, FLOAT, STRING, LIST, DICT, DICT_SHAPE, INT_LIST = range(10)
+
+_double = struct.Struct('<d')
+
+
+def encode_trace(payload: Dict[str, Any]) -> bytes:
+    """
+    Encode a trace, or a response holding one, in the binary format.
+
+    Args:
+        payload: TraceGenerator.get_trace() output, or a dict with it under
+            'trace' (e.g. the trace endpoint's response)
+
+    Returns:
+        Encoded bytes
+
+    Raises:
+        ValueError: If the steps aren't TraceGenerator steps
+        TypeError: If a value isn't JSON-like (None, bool, int, float, str,
+            list, tuple, dict with str keys)
+    """
+    encoder = _Encoder()
+    out = encoder.out
+    out += MAGIC
+
+    trace = payload.get('trace')
+    if isinstance(trace, dict) and 'steps' in trace:
+        location = TRACE_STEPS
+        steps = trace['steps']
+        payload = dict(payload)
+        payload['trace'] = dict(trace, steps=None)
+    elif 'steps' in payload:
+        location = TOP_LEVEL_STEPS
+        steps = payload['steps']
+        payload = dict(payload, steps=None)
+    else:
+        location = NO_STEPS
+        steps = []
+
+    out.append(location)
+    encoder.varint(len(steps))
+    encoder.steps(steps)
+    encoder.value(payload)
+    return bytes(out)
+
+
+def decode_trace(data: bytes) -> Dict[str, Any]:
+    """
+    Decode bytes produced by encode_trace().
+
+    Args:
+        data: Encoded trace
+
+    Returns:
+        The encoded payload, with its steps as TraceGenerator step dicts
+
+    Raises:
+        ValueError: If data isn't an encoded trace
+    """
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError('Not an encoded trace')
+    decoder = _Decoder(data, len(MAGIC))
+    location = decoder.byte()
+    steps = decoder.steps(decoder.varint())
+    payload = decoder.value()
+
+    if location == TRACE_STEPS:
+        payload['trace']['steps'] = steps
+    elif location == TOP_LEVEL_STEPS:
+        payload['steps'] = steps
+    return payload
+
+
+def encode_response(payload: Dict[str, Any], encoding: str = 'json') -> bytes:
+    """
+    Serialize a trace endpoint response.
+
+    Args:
+        payload: The response
+        encoding: 'binary' for encode_trace(), or 'json' for the JSON
+            Flask's default provider writes (sorted keys, ASCII only)
+    """
+    if encoding == 'binary':
+        return encode_trace(payload)
+    return json.dumps(payload, ensure_ascii=True, sort_keys=True).encode('utf-8')
+
+
+class _Encoder:
+    """Single-pass encoder; strings and dict shapes are interned as they appear"""
+
+    def __init__(self):
+        self.out = bytearray()
+        self.strings: Dict[str, int] = {}
+        self.shapes: Dict[Tuple[str, ...], int] = {}
+
+    def varint(self, n: int):
+        out = self.out
+        while n > 0x7f:
+            out.append((n & 0x7f) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def string(self, s: str):
+        index = self.strings.get(s)
+        if index is not None:
+            self.varint(index << 1 | 1)
+            return
+        self.strings[s] = len(self.strings)
+        encoded = s.encode('utf-8')
+        self.varint(len(encoded) << 1)
+        self.out += encoded
+
+    def steps(self, steps: List[Dict[str, Any]]):
+        previous = 0
+        for number, step in enumerate(steps):
+            if len(step) != 4 or step['step_number'] != number:
+                raise ValueError(f'Step {number} is not a TraceGenerator step')
+            self.string(step['type'])
+            timestamp = round(step['timestamp'] * 1_000_000)
+            delta = timestamp - previous
+            self.varint(delta << 1 if delta >= 0 else (-delta << 1) - 1)
+            previous = timestamp
+            self.value(step['data'])
+
+    def value(self, value: Any):
+        out = self.out
+        kind = type(value)
+        if kind is str:
+            out.append(STRING)
+            self.string(value)
+        elif kind is int:
+            out.append(INT)
+            self.varint(value << 1 if value >= 0 else (-value << 1) - 1)
+        elif kind is dict:
+            keys = tuple(value)
+            shape = self.shapes.get(keys)
+            if shape is None:
+                self.shapes[keys] = len(self.shapes)
+                out.append(DICT)
+                self.varint(len(keys))
+                for key in keys:
+                    if type(key) is not str:
+                        raise TypeError(f'Dict keys must be strings, not {type(key).__name__}')
+                    self.string(key)
+            else:
+                out.append(DICT_SHAPE)
+                self.varint(shape)
+            for item in value.values():
+                self.value(item)
+        elif kind is list or kind is tuple:
+            if value and all(type(item) is int for item in value):
+                # Id lists: no tag per item, varint loop inlined
+                out.append(INT_LIST)
+                self.varint(len(value))
+                append = out.append
+                for n in value:
+                    n = n << 1 if n >= 0 else (-n << 1) - 1
+                    while n > 0x7f:
+                        append((n & 0x7f) | 0x80)
+                        n >>= 7
+                    append(n)
+            else:
+                out.append(LIST)
+                self.varint(len(value))
+                for item in value:
+                    self.value(item)
+        elif value is None:
+            out.append(NULL)
+        elif kind is bool:
+            out.append(TRUE if value else FALSE)
+        elif kind is float:
+            out.append(FLOAT)
+            out += _double.pack(value)
+        else:
+            raise TypeError(f'Cannot encode {kind.__name__}')
+
+
+class _Decoder:
+    """Reads values back in stream order, rebuilding the string and shape tables"""
+
+    def __init__(self, data: bytes, position: int = 0):
+        self.data = bytes(data)
+        self.position = position
+        self.strings: List[str] = []
+        self.shapes: List[Tuple[str, ...]] = []
+
+    def byte(self) -> int:
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def varint(self) -> int:
+        data = self.data
+        position = self.position
+        result = 0
+        shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            result |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                self.position = position
+                return result
+            shift += 7
+
+    def zigzag(self) -> int:
+        n = self.varint()
+        return -((n + 1) >> 1) if n & 1 else n >> 1
+
+    def string(self) -> str:
+        n = self.varint()
+        if n & 1:
+            return self.strings[n >> 1]
+        end = self.position + (n >> 1)
+        s = self.data[self.position:end].decode('utf-8')
+        self.position = end
+        self.strings.append(s)
+        return s
+
+    def steps(self, count: int) -> List[Dict[str, Any]]:
+        steps = []
+        timestamp = 0
+        for number in range(count):
+            event_type = self.string()
+            timestamp += self.zigzag()
+            steps.append({
+                'step_number': number,
+                'timestamp': timestamp / 1_000_000,
+                'type': event_type,
+                'data': self.value()
+            })
+        return steps
+
+    def value(self) -> Any:
+        tag = self.byte()
+        if tag == STRING:
+            return self.string()
+        if tag == INT:
+            return self.zigzag()
+        if tag == DICT or tag == DICT_SHAPE:
+            if tag == DICT:
+                keys = tuple(self.string() for _ in range(self.varint()))
+                self.shapes.append(keys)
+            else:
+                keys = self.shapes[self.varint()]
+            return {key: self.value() for key in keys}
+        if tag == LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == INT_LIST:
+            return [self.zigzag() for _ in range(self.varint())]
+        if tag == NULL:
+            return None
+        if tag == FALSE:
+            return False
+        if tag == TRUE:
+            return True
+        if tag == FLOAT:
+            (value,) = _double.unpack_from(self.data, self.position)
+            self.position += 8
+            return value
+        raise ValueError(f'Unknown value tag {tag} at byte {self.position - 1}')
@@ -0,0 +1,153 @@
+"""
+Response bodies handed over from worker processes in shared memory.
+
+A worker writes a serialized trace into a multiprocessing.shared_memory
+segment and returns only its size. The server then sends the body straight
+from the segment as memoryview slices: the trace is neither pickled back
+nor copied into the server's heap.
+
+The server names each segment (segment_name()) before the job runs, so it
+can remove the segment whatever happens to the job: once the body is sent
+or copied, or once the job failed or its worker was killed
+(remove_segment()). Segments still open when the server exits are removed
+by its multiprocessing resource tracker, which the workers share.
+"""
+
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional
+import os
+import secrets
+import threading
+
+
+# Bytes per chunk of a streamed body
+CHUNK_SIZE = 1 << 20
+
+# Removed segments whose mapping is still referenced by sent slices (a WSGI
+# server normally drops each chunk once written); closed on later closes
+_lingering: List[shared_memory.SharedMemory] = []
+_lingering_lock = threading.Lock()
+
+
+def segment_name() -> str:
+    """Get a new segment name (short enough for macOS)"""
+    return f'avz_{os.getpid()}_{secrets.token_hex(6)}'
+
+
+def write_segment(name: str, data: bytes) -> int:
+    """
+    Create a segment holding data (in the worker).
+
+    Returns:
+        The size of data; the segment may be larger (page-rounded)
+    """
+    segment = shared_memory.SharedMemory(name, create=True, size=max(len(data), 1))
+    try:
+        segment.buf[:len(data)] = data
+    finally:
+        segment.close()
+    return len(data)
+
+
+def remove_segment(name: str):
+    """Remove a segment, if it was created"""
+    try:
+        segment = shared_memory.SharedMemory(name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+class SharedBody:
+    """A body in a shared memory segment, removed once sent"""
+
+    def __init__(self, name: str, size: int):
+        """
+        Args:
+            name: Segment name
+            size: Body size (the start of the segment)
+
+        Raises:
+            FileNotFoundError: If there is no such segment
+        """
+        self.name = name
+        self.size = size
+        self._segment: Optional[shared_memory.SharedMemory] = shared_memory.SharedMemory(name)
+        self._view = self._segment.buf[:size]
+        # Responses still sending the body, and whether close() waits for them
+        self._pins = 0
+        self._closing = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def tobytes(self) -> bytes:
+        """Copy the body out of the segment, e.g. to cache it"""
+        return self._view.tobytes()
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE, close: bool = True) -> Iterator[memoryview]:
+        """
+        Yield the body as memoryview slices of the segment.
+
+        Args:
+            chunk_size: Bytes per slice
+            close: Remove the segment afterwards; otherwise the body can be
+                sent again, and sending goes on if it is removed meanwhile
+        """
+        view = self._view[:]
+        try:
+            for start in range(0, self.size, chunk_size):
+                yield view[start:start + chunk_size]
+        finally:
+            view.release()
+            if close:
+                self.close()
+
+    def pin(self) -> bool:
+        """
+        Keep the segment until unpin(), even if close() is called meanwhile
+        (e.g. while a response sends the body).
+
+        Returns:
+            False if the body was already closed (and nothing is pinned)
+        """
+        with self._lock:
+            if self._closing:
+                return False
+            self._pins += 1
+            return True
+
+    def unpin(self):
+        """Undo a pin(); the last one finishes a close() that waited for it"""
+        with self._lock:
+            self._pins -= 1
+            if self._pins or not self._closing:
+                return
+        self._remove()
+
+    def close(self):
+        """Remove the segment, once unpinned; safe to call more than once"""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            if self._pins:
+                return
+        self._remove()
+
+    def _remove(self):
+        segment, self._segment = self._segment, None
+        if segment is None:
+            return
+        self._view.release()
+        segment.unlink()
+        with _lingering_lock:
+            _lingering.append(segment)
+            for lingering in list(_lingering):
+                try:
+                    lingering.close()
+                except BufferError:
+                    continue
+                _lingering.remove(lingering)
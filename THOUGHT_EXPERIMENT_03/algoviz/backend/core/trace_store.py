@@ -0,0 +1,235 @@
+"""
+Server-side storage of traces, read back by step range.
+
+A stored trace is filled in by a background thread that runs an algorithm's
+iter_traced() events, so the first steps can be served while later ones are
+still being produced. Readers wait for the range they ask for, or for the
+run to end. Traces are identified by an opaque handle and dropped least
+recently used first, or once unused for longer than the TTL; dropping a
+trace that is still running stops its algorithm.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import secrets
+import threading
+import time
+
+
+Events = Iterator[Tuple[str, Any]]
+
+
+class StoredTrace:
+    """Steps of one run, appended by its producer thread"""
+
+    def __init__(self, handle: str, key: Optional[str] = None):
+        self.handle = handle
+        self.key = key
+        self.metadata: Dict[str, Any] = {}
+        self.steps: List[Dict[str, Any]] = []
+        # The trace without its steps, and the result, once the run is done
+        self.trace: Optional[Dict[str, Any]] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.truncated = False
+        self.complete = False
+        self.cancelled = threading.Event()
+        self.last_access = time.monotonic()
+        self._changed = threading.Condition()
+        # Lowest step count a reader waits for; the producer only notifies
+        # once it is reached
+        self._wake_at = float('inf')
+
+    @property
+    def total_steps(self) -> int:
+        """Steps stored so far"""
+        return len(self.steps)
+
+    def wait_for(self, count: int, timeout: float) -> bool:
+        """
+        Wait until at least count steps are stored or the run has ended.
+
+        Returns:
+            False if the timeout expired first
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while len(self.steps) < count and not self.complete:
+                self._wake_at = min(self._wake_at, count)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._changed.wait(remaining):
+                    return len(self.steps) >= count or self.complete
+        return True
+
+    def get_steps(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Steps [start, stop) of the ones stored so far"""
+        self.last_access = time.monotonic()
+        return self.steps[start:stop]
+
+    def summary(self) -> Dict[str, Any]:
+        """State of the run, without its steps"""
+        summary = {
+            'handle': self.handle,
+            'metadata': self.metadata,
+            'total_steps': len(self.steps),
+            'complete': self.complete
+        }
+        if self.truncated:
+            summary['truncated'] = True
+        if self.complete and self.error is None:
+            summary['trace'] = self.trace
+            summary['result'] = self.result
+        return summary
+
+    def _append(self, step: Dict[str, Any]):
+        # Under the lock readers check the count with, so a reader can't
+        # miss the step that wakes it
+        with self._changed:
+            self.steps.append(step)
+            if len(self.steps) >= self._wake_at:
+                self._wake_at = float('inf')
+                self._changed.notify_all()
+
+    def _finish(self, error: Optional[str] = None):
+        with self._changed:
+            self.error = error
+            self.complete = True
+            self._changed.notify_all()
+
+    def _produce(self, events: Events, max_steps: Optional[int]):
+        """Consume the events of a run (runs on the producer thread)"""
+        error = None
+        try:
+            for kind, value in events:
+                if self.cancelled.is_set():
+                    error = 'Trace was dropped from the store'
+                    break
+                if kind == 'step':
+                    if max_steps is not None and len(self.steps) >= max_steps:
+                        self.truncated = True
+                        break
+                    self._append(value)
+                elif kind == 'metadata':
+                    self.metadata = value
+                elif kind == 'trace':
+                    self.trace = {**value, 'steps': []}
+                elif kind == 'result':
+                    self.result = value
+        except Exception as e:
+            error = f'Execution failed: {str(e)}'
+        finally:
+            events.close()
+            if self.truncated:
+                self.trace = {
+                    'metadata': self.metadata,
+                    'steps': [],
+                    'total_steps': len(self.steps),
+                    'duration': self.steps[-1]['timestamp'] if self.steps else 0,
+                    'truncated': True
+                }
+            self._finish(error)
+
+
+class TraceStore:
+    """Bounded set of stored traces, by handle"""
+
+    def __init__(self, max_traces: int, ttl: float, max_steps: Optional[int] = None):
+        """
+        Args:
+            max_traces: Traces kept at once (least recently used dropped first)
+            ttl: Seconds an unused trace is kept
+            max_steps: Steps kept per trace; longer runs are truncated
+        """
+        self.max_traces = max_traces
+        self.ttl = ttl
+        self.max_steps = max_steps
+        self._traces: 'OrderedDict[str, StoredTrace]' = OrderedDict()
+        self._by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def start(self, run: Callable[[], Events], key: Optional[str] = None,
+              max_steps: Optional[int] = None) -> StoredTrace:
+        """
+        Store a new run, or the one already stored for the same key.
+
+        Args:
+            run: Returns the run's iter_traced() events; called on the
+                producer thread
+            key: Identifies identical requests (e.g. make_cache_key()); a
+                stored run with the same key that didn't fail is reused
+            max_steps: Step budget of the run
+
+        Returns:
+            The stored trace; its steps fill in in the background
+        """
+        if self.max_steps is not None:
+            max_steps = self.max_steps if max_steps is None else min(max_steps, self.max_steps)
+
+        with self._lock:
+            self._expire()
+            if key is not None and key in self._by_key:
+                stored = self._traces[self._by_key[key]]
+                if stored.error is None:
+                    self._traces.move_to_end(stored.handle)
+                    stored.last_access = time.monotonic()
+                    return stored
+                self._drop(stored.handle)
+
+            stored = StoredTrace(secrets.token_urlsafe(12), key)
+            self._traces[stored.handle] = stored
+            if key is not None:
+                self._by_key[key] = stored.handle
+            while len(self._traces) > self.max_traces:
+                self._drop(next(iter(self._traces)))
+
+        def produce():
+            try:
+                events = run()
+            except Exception as e:
+                stored._finish(f'Execution failed: {str(e)}')
+                return
+            stored._produce(events, max_steps)
+
+        threading.Thread(target=produce, name=f'trace-{stored.handle}', daemon=True).start()
+        return stored
+
+    def get(self, handle: str) -> Optional[StoredTrace]:
+        """Get a stored trace and mark it most recently used (None if unknown or expired)"""
+        with self._lock:
+            self._expire()
+            stored = self._traces.get(handle)
+            if stored is not None:
+                self._traces.move_to_end(handle)
+                stored.last_access = time.monotonic()
+            return stored
+
+    def clear(self):
+        """Drop every stored trace"""
+        with self._lock:
+            for handle in list(self._traces):
+                self._drop(handle)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of stored traces and steps"""
+        with self._lock:
+            traces = list(self._traces.values())
+        return {
+            'traces': len(traces),
+            'running': sum(not stored.complete for stored in traces),
+            'steps': sum(len(stored.steps) for stored in traces),
+            'max_traces': self.max_traces,
+            'ttl': self.ttl
+        }
+
+    def _expire(self):
+        """Drop traces unused for longer than the TTL (lock held)"""
+        cutoff = time.monotonic() - self.ttl
+        for handle in [h for h, stored in self._traces.items() if stored.last_access < cutoff]:
+            self._drop(handle)
+
+    def _drop(self, handle: str):
+        """Remove a trace and stop its run (lock held)"""
+        stored = self._traces.pop(handle)
+        stored.cancelled.set()
+        if stored.key is not None and self._by_key.get(stored.key) == handle:
+            del self._by_key[stored.key]
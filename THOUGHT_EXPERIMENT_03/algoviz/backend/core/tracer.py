@@ -1,38 +1,221 @@
 """
 Core tracing infrastructure for algorithm visualization.
 Captures execution steps with timestamps and structured data.
+
+Human-readable step text comes from message templates (an algorithm's
+metadata "messages"), keyed "<EVENT_TYPE>.<field>". Templates use positional
+{0}, {1}, ... placeholders. With rendering off, a text field holds just the
+template's argument list and the client renders it from the catalog.
+
+Capture levels and filters decide which event types are recorded. Each event
+type has a level in the algorithm's metadata "event_levels" ('summary',
+'decisions' or 'full'; 'full' if not listed). A tracer records the event
+types at or below its level, plus the ones in include, minus the ones in
+exclude. Guard a capture with wants() to skip building the payload of a
+step that won't be recorded.
+
+Steps are stored one dict per step by default. With columnar=True they are
+stored as arrays instead: a typed array of timestamps and one of event codes
+(step_number is the position), and per (event type, data keys) combination a
+block holding the call_id / depth / parent_id of its steps in an int64 array
+and the other fields in a flat list. No per-step objects are kept; step dicts
+are built as flush() hands the steps over, or when get_trace() is called.
 """
 
-from typing import Any, Dict, List, Optional
+from array import array
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 import json
 
 
+# Capture levels, from the fewest steps to all of them
+CAPTURE_LEVELS = ('summary', 'decisions', 'full')
+
+# Step data fields stored in int64 arrays by the columnar backend
+CORE_FIELDS = ('call_id', 'depth', 'parent_id')
+
+# Marks a core field value that is not an int64 (None, a bool, a big int);
+# the value itself is then kept in the overflow dict
+_OVERFLOW = -2 ** 63
+
+
+class _Block:
+    """Columns of the steps with one event type and one key set"""
+    
+    def __init__(self, index: int, event_type: str, keys: Tuple[str, ...]):
+        self.index = index
+        self.event_type = event_type
+        self.keys = keys
+        self.core_fields = tuple(key for key in keys if key in CORE_FIELDS)
+        self.fields = tuple(key for key in keys if key not in CORE_FIELDS)
+        # Row r of the block is core[r * core_width:(r + 1) * core_width]
+        # and values[r * width:(r + 1) * width]
+        self.core_width = len(self.core_fields)
+        self.width = len(self.fields)
+        self.core = array('q')
+        self.values: List[Any] = []
+        self.get_core = itemgetter(*self.core_fields) if self.core_fields else None
+        self.get_fields = itemgetter(*self.fields) if self.fields else None
+        # Puts a row's core values + field values back in key order
+        stored = self.core_fields + self.fields
+        self.key_order = [stored.index(key) for key in keys]
+
+
+class _Columns:
+    """Steps captured since the last flush, stored as columns"""
+    
+    def __init__(self):
+        self.timestamps = array('d')
+        # Index of each step's (event type, keys) block
+        self.event_codes = array('I')
+        self.blocks: Dict[Tuple[str, Tuple[str, ...]], _Block] = {}
+        self.block_list: List[_Block] = []
+        # (block index, position in its core array) -> value
+        self.overflow: Dict[Tuple[int, int], Any] = {}
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def append(self, event_type: str, data: Dict[str, Any], timestamp: float):
+        """Append a step; data itself is not kept"""
+        key = (event_type, tuple(data))
+        block = self.blocks.get(key)
+        if block is None:
+            block = _Block(len(self.block_list), event_type, key[1])
+            self.blocks[key] = block
+            self.block_list.append(block)
+        
+        self.timestamps.append(timestamp)
+        self.event_codes.append(block.index)
+        
+        if block.width == 1:
+            block.values.append(block.get_fields(data))
+        elif block.width:
+            block.values += block.get_fields(data)
+        
+        if block.core_width:
+            values = block.get_core(data)
+            if block.core_width == 1:
+                values = (values,)
+            for value in values:
+                if type(value) is int and -2 ** 63 < value < 2 ** 63:
+                    block.core.append(value)
+                else:
+                    self.overflow[(block.index, len(block.core))] = value
+                    block.core.append(_OVERFLOW)
+    
+    def iter_steps(self, first_number: int) -> Iterator[Dict[str, Any]]:
+        """Build the step dicts, numbered from first_number"""
+        rows = [0] * len(self.block_list)
+        blocks = self.block_list
+        for position, (code, timestamp) in enumerate(zip(self.event_codes, self.timestamps)):
+            block = blocks[code]
+            row = rows[code]
+            rows[code] += 1
+            
+            core_start = row * block.core_width
+            stored = block.core[core_start:core_start + block.core_width].tolist()
+            if _OVERFLOW in stored:
+                for offset, value in enumerate(stored):
+                    if value == _OVERFLOW:
+                        stored[offset] = self.overflow[(block.index, core_start + offset)]
+            start = row * block.width
+            stored += block.values[start:start + block.width]
+            
+            yield {
+                'step_number': first_number + position,
+                'timestamp': timestamp,
+                'type': block.event_type,
+                'data': {key: stored[index] for key, index in zip(block.keys, block.key_order)}
+            }
+
+
 class TraceGenerator:
     """Captures algorithm execution steps for visualization"""
     
-    def __init__(self):
-        self.steps: List[Dict[str, Any]] = []
+    def __init__(self, messages: Optional[Dict[str, str]] = None,
+                 render_messages: bool = True, columnar: bool = False,
+                 level: str = 'full', event_levels: Optional[Dict[str, str]] = None,
+                 include: Iterable[str] = (), exclude: Iterable[str] = ()):
+        """
+        Args:
+            messages: Message templates by id
+            render_messages: If False, message() keeps the template
+                arguments instead of rendering the text
+            columnar: Store steps as columns instead of dicts (steps is
+                then None; read them with flush() or get_trace())
+            level: Capture level, one of CAPTURE_LEVELS
+            event_levels: Capture level of each event type
+            include: Event types to record whatever their level
+            exclude: Event types never to record
+        
+        Raises:
+            ValueError: If level is not a capture level
+        """
+        if level not in CAPTURE_LEVELS:
+            raise ValueError(f"Unknown capture level: {level}")
         self.metadata: Dict[str, Any] = {}
+        self.messages = messages or {}
+        self.render_messages = render_messages
+        self.columnar = columnar
+        self.level = level
+        self.event_levels = event_levels or {}
+        self.include = frozenset(include)
+        self.exclude = frozenset(exclude)
+        # event type -> recorded or not, filled in by wants()
+        self._wanted: Dict[str, bool] = {}
         self._call_counter = 0
         self._start_time = datetime.now()
+        self.steps: Optional[List[Dict[str, Any]]] = None if columnar else []
+        self._columns = _Columns() if columnar else None
+        # Steps already handed over by flush(), and the last one's timestamp
+        self._flushed = 0
+        self._flushed_duration = 0
     
     def set_metadata(self, metadata: Dict[str, Any]):
         """Set algorithm metadata (name, input size, etc.)"""
         self.metadata.update(metadata)
     
+    def wants(self, event_type: str) -> bool:
+        """
+        Check whether steps of an event type are recorded.
+        
+        Use it to skip building a payload capture() would drop:
+            if tracer.wants('CALL_START'):
+                tracer.capture('CALL_START', {...})
+        """
+        wanted = self._wanted.get(event_type)
+        if wanted is None:
+            level = self.event_levels.get(event_type, 'full')
+            wanted = (
+                event_type in self.include
+                or CAPTURE_LEVELS.index(level) <= CAPTURE_LEVELS.index(self.level)
+            ) and event_type not in self.exclude
+            self._wanted[event_type] = wanted
+        return wanted
+    
     def capture(self, event_type: str, data: Dict[str, Any]):
         """
         Capture a single execution step.
         
+        Steps of event types the level and filters leave out are dropped.
+        
         Args:
             event_type: Type of event (e.g., 'CALL_START', 'DECISION_MADE')
             data: Event-specific data to capture
         """
+        if not self.wants(event_type):
+            return
+        
         timestamp = (datetime.now() - self._start_time).total_seconds()
         
+        if self.columnar:
+            self._columns.append(event_type, data, timestamp)
+            return
+        
         step = {
-            'step_number': len(self.steps),
+            'step_number': self._flushed + len(self.steps),
             'timestamp': timestamp,
             'type': event_type,
             'data': data
@@ -40,6 +223,58 @@ class TraceGenerator:
         
         self.steps.append(step)
     
+    @property
+    def step_count(self) -> int:
+        """Number of captured steps"""
+        pending = self._columns if self.columnar else self.steps
+        return self._flushed + len(pending)
+    
+    def flush(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """
+        Hand over the steps captured since the last flush and stop keeping them.
+        
+        For BaseAlgorithm.iter_traced() implementations:
+            yield from tracer.flush()
+        
+        With the columnar backend the step dicts are built as the events
+        are consumed.
+        
+        Returns:
+            ('step', step) events
+        """
+        if self.columnar:
+            columns = self._columns
+            if not len(columns):
+                return []
+            self._columns = _Columns()
+            first_number = self._flushed
+            self._flushed += len(columns)
+            self._flushed_duration = columns.timestamps[-1]
+            return (('step', step) for step in columns.iter_steps(first_number))
+        
+        pending = self.steps
+        if not pending:
+            return []
+        self.steps = []
+        self._flushed += len(pending)
+        self._flushed_duration = pending[-1]['timestamp']
+        return [('step', step) for step in pending]
+    
+    def message(self, template_id: str, *args) -> Any:
+        """
+        Build a step text field from a message template.
+        
+        Args:
+            template_id: Template id, '<EVENT_TYPE>.<field>'
+            *args: Positional template arguments
+        
+        Returns:
+            The rendered text, or the argument list if rendering is off
+        """
+        if self.render_messages:
+            return self.messages[template_id].format(*args)
+        return list(args)
+    
     def next_call_id(self) -> int:
         """Generate unique call ID for recursion tracking"""
         call_id = self._call_counter
@@ -50,16 +285,23 @@ class TraceGenerator:
         """
         Get complete trace data.
         
+        With the columnar backend the step dicts are built here. Steps
+        handed over by flush() are counted but not included.
+        
         Returns:
             Dictionary with metadata and steps
         """
+        if self.columnar:
+            steps = list(self._columns.iter_steps(self._flushed))
+        else:
+            steps = self.steps
         return {
             'metadata': self.metadata,
-            'steps': self.steps,
-            'total_steps': len(self.steps),
-            'duration': self.steps[-1]['timestamp'] if self.steps else 0
+            'steps': steps,
+            'total_steps': self.step_count,
+            'duration': steps[-1]['timestamp'] if steps else self._flushed_duration
         }
     
     def to_json(self) -> str:
         """Export trace as JSON string"""
-        return json.dumps(self.get_trace(), indent=2)
\ No newline at end of file
+        return json.dumps(self.get_trace(), indent=2)
@@ -0,0 +1,218 @@
+"""
+Input validation compiled from an algorithm's metadata "input_schema".
+
+A schema describes a list of records under one key of the input, e.g.
+
+    "input_schema": {
+        "type": "intervals",
+        "fields": ["id", "start", "end", "color"],
+        "required": ["start", "end"],
+        "numeric": ["start", "end"],
+        "ordered": ["start", "end"],
+        "max_items": 1000000
+    }
+
+    key       Input key holding the records (default: the type)
+    fields    Fields a record may have (others are rejected; if not
+              given, any field is accepted)
+    required  Fields every record must have
+    numeric   Fields that must be int or float (not bool)
+    ordered   Fields whose values must be strictly increasing within a record
+    max_items Most records accepted (the tighter of this and the limit
+              passed to compile_schema)
+
+The type supplies defaults for the other keys; "intervals" requires
+numeric start < end. Records come as a list of dicts, or as columns: a
+dict of equal-length lists, one per field. The validator returns the
+records as a list of dicts either way.
+
+Checks run a field at a time with map() over C-level predicates, so the
+per-record work stays out of the interpreter. Records are checked in chunks
+of CHUNK_SIZE, so a bad record is reported without checking the records
+after its chunk, and the size limit is checked before anything else.
+"""
+
+from operator import itemgetter, lt
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Defaults per schema type
+SCHEMA_TYPES: Dict[str, Dict[str, Any]] = {
+    'intervals': {
+        'required': ['start', 'end'],
+        'numeric': ['start', 'end'],
+        'ordered': ['start', 'end']
+    }
+}
+
+_NUMERIC_TYPES = frozenset((int, float))
+
+# Records checked at once
+CHUNK_SIZE = 65536
+
+
+class ValidationError(ValueError):
+    """Input doesn't match an algorithm's input_schema"""
+
+
+class Validator:
+    """Checks inputs against one compiled schema"""
+
+    def __init__(self, schema: Dict[str, Any], max_items: Optional[int] = None):
+        """
+        Args:
+            schema: The metadata input_schema
+            max_items: Most records accepted, whatever the schema says
+
+        Raises:
+            ValueError: If the schema type is unknown and gives no key
+        """
+        defaults = SCHEMA_TYPES.get(schema.get('type'), {})
+        self.key = schema.get('key', defaults.get('key', schema.get('type')))
+        if not self.key:
+            raise ValueError(f"Input schema needs a known type or a key: {schema}")
+
+        self.fields = list(schema.get('fields', defaults.get('fields', [])))
+        self.required = list(schema.get('required', defaults.get('required', [])))
+        self.numeric = list(schema.get('numeric', defaults.get('numeric', [])))
+        self.ordered = list(schema.get('ordered', defaults.get('ordered', [])))
+        limits = [n for n in (schema.get('max_items'), max_items) if n is not None]
+        self.max_items = min(limits) if limits else None
+        # Fields whose values are checked, fetched once per validation
+        self._checked = list(dict.fromkeys(self.required + self.numeric + self.ordered))
+        self._known = frozenset(self.fields)
+
+    def __call__(self, input_data: Any) -> Any:
+        """
+        Validate an input.
+
+        Returns:
+            The input, with columnar records turned into a list of dicts
+
+        Raises:
+            ValidationError: Describing the first problem found
+        """
+        if not isinstance(input_data, dict):
+            raise ValidationError('Input must be a JSON object')
+        if self.key not in input_data:
+            raise ValidationError(f"Input needs '{self.key}'")
+
+        records = input_data[self.key]
+        if isinstance(records, list):
+            self._check_size(len(records))
+            for start in range(0, len(records), CHUNK_SIZE):
+                chunk = records[start:start + CHUNK_SIZE]
+                self._check_values(self._row_columns(chunk, start), start)
+            return input_data
+
+        if isinstance(records, dict):
+            columns = self._column_columns(records)
+            count = len(next(iter(columns.values()), ()))
+            for start in range(0, count, CHUNK_SIZE):
+                self._check_values({
+                    field: values[start:start + CHUNK_SIZE]
+                    for field, values in columns.items()
+                }, start)
+            return {**input_data, self.key: self._to_rows(records)}
+
+        raise ValidationError(f"'{self.key}' must be a list of records or a dict of columns")
+
+    def _check_size(self, count: int):
+        if self.max_items is not None and count > self.max_items:
+            raise ValidationError(
+                f"'{self.key}' has {count} items, more than the limit of {self.max_items}"
+            )
+
+    def _row_columns(self, records: List[Any], offset: int) -> Dict[str, List[Any]]:
+        """Check a chunk of records and pull out the checked fields as columns"""
+        if set(map(type, records)) - {dict}:
+            index = next(i for i, record in enumerate(records) if type(record) is not dict)
+            raise ValidationError(f'{self.key}[{offset + index}] must be an object')
+        if self._known:
+            unknown = set().union(*records) - self._known
+            if unknown:
+                index = next(i for i, record in enumerate(records) if not record.keys() <= self._known)
+                unknown = sorted(set(records[index]) - self._known)
+                raise ValidationError(
+                    f"{self.key}[{offset + index}] has unknown fields: {', '.join(unknown)}"
+                )
+
+        columns = {}
+        for field in self._checked:
+            try:
+                columns[field] = list(map(itemgetter(field), records))
+            except KeyError:
+                if field not in self.required:
+                    continue  # optional and missing somewhere: not checked
+                index = next(i for i, record in enumerate(records) if field not in record)
+                raise ValidationError(f"{self.key}[{offset + index}] is missing '{field}'") from None
+        return columns
+
+    def _column_columns(self, columns: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """Check columnar records"""
+        for field in self.required:
+            if field not in columns:
+                raise ValidationError(f"'{self.key}' is missing the '{field}' column")
+        if self._known:
+            unknown = sorted(set(columns) - self._known)
+            if unknown:
+                raise ValidationError(f"'{self.key}' has unknown columns: {', '.join(unknown)}")
+
+        count = None
+        for field, values in columns.items():
+            if not isinstance(values, list):
+                raise ValidationError(f"Column '{self.key}.{field}' must be a list")
+            if count is None:
+                count = len(values)
+                self._check_size(count)
+            elif len(values) != count:
+                raise ValidationError(f"Columns of '{self.key}' must all have the same length")
+        return {field: columns[field] for field in self._checked if field in columns}
+
+    def _check_values(self, columns: Dict[str, List[Any]], offset: int):
+        """Check the field values of a chunk of records starting at offset"""
+        for field in self.numeric:
+            values = columns.get(field)
+            if values is not None and not set(map(type, values)) <= _NUMERIC_TYPES:
+                index = next(i for i, value in enumerate(values) if type(value) not in _NUMERIC_TYPES)
+                raise ValidationError(f"{self.key}[{offset + index}].{field} must be a number")
+
+        present = [field for field in self.ordered if field in columns]
+        for lower, upper in zip(present, present[1:]):
+            lows, highs = columns[lower], columns[upper]
+            try:
+                ordered = all(map(lt, lows, highs))
+            except TypeError:
+                ordered = False
+            if not ordered:
+                index = next(i for i, pair in enumerate(zip(lows, highs)) if not _less(*pair))
+                raise ValidationError(f"{self.key}[{offset + index}].{lower} must be less than {upper}")
+
+    @staticmethod
+    def _to_rows(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        fields = tuple(columns)
+        return [dict(zip(fields, row)) for row in zip(*columns.values())]
+
+
+def _less(low: Any, high: Any) -> bool:
+    try:
+        return low < high
+    except TypeError:
+        return False
+
+
+def compile_schema(schema: Optional[Dict[str, Any]],
+                   max_items: Optional[int] = None) -> Optional[Callable[[Any], Any]]:
+    """
+    Compile a metadata input_schema into a validator.
+
+    Args:
+        schema: The input_schema, or None
+        max_items: Most records accepted, whatever the schema says
+
+    Returns:
+        A validator (see Validator.__call__), or None without a schema
+    """
+    if not schema:
+        return None
+    return Validator(schema, max_items)
@@ -0,0 +1,66 @@
+"""
+Jobs run in trace worker processes (see core.worker_pool).
+
+Each job is a module-level function, so the pool can send it to a worker
+by name, and takes only picklable arguments: the algorithm id, the checked
+input and the trace options. The worker looks the algorithm up in its own
+registry, loaded once by initialize_worker().
+"""
+
+from typing import Dict, Iterator, Optional, Tuple
+
+from algorithms.registry import registry
+from core.jobs import JobControl
+from core.serialization import encode_response
+from core.shared_body import write_segment
+
+
+def initialize_worker():
+    """Discover and import every algorithm (worker process initializer)"""
+    registry.load_all()
+
+
+def collect_trace_job(algorithm_id: str, input_data, options: Dict) -> Tuple[Dict, object]:
+    """Collect a trace on a pooled instance"""
+    with registry.acquire(algorithm_id) as algorithm:
+        return algorithm.collect_trace(input_data, **options)
+
+
+def iter_traced_job(algorithm_id: str, input_data, options: Dict) -> Iterator[Tuple[str, object]]:
+    """Yield the iter_traced() events of a run on a pooled instance (see WorkerPool.iterate)"""
+    with registry.acquire(algorithm_id) as algorithm:
+        yield from algorithm.iter_traced(input_data, **options)
+
+
+def trace_body_job(algorithm_id: str, input_data, options: Dict, encoding: str,
+                   segment: str, control: Optional[str] = None) -> int:
+    """
+    Collect a trace and write the serialized trace response into a new
+    shared memory segment.
+
+    Args:
+        control: JobControl segment the run reports its steps to and
+            checks for cancellation
+
+    Returns:
+        The body size
+    """
+    if control is not None:
+        control = JobControl(control)
+        options = {**options, 'cancel': control, 'progress': control.report}
+    try:
+        trace, result = collect_trace_job(algorithm_id, input_data, options)
+        cancelled = control is not None and control.is_set()
+    finally:
+        if control is not None:
+            control.close()
+    if cancelled:
+        # The body is discarded: skip serializing the steps
+        trace, result = {**trace, 'steps': [], 'cancelled': True}, None
+    body = encode_response({
+        'success': True,
+        'trace': trace,
+        'result': result
+    }, encoding)
+    del trace, result
+    return write_segment(segment, body)
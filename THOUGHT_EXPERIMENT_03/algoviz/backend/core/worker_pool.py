@@ -0,0 +1,392 @@
+"""
+Bounded pool of worker processes with per-job limits.
+
+Each job runs in a worker process, so a pathological input can only pin
+that worker, and is stopped by:
+
+- a wall-clock timeout: the worker is killed and replaced (JobTimeout)
+- an address-space limit (RLIMIT_AS) set in every worker: allocations
+  over it fail with MemoryError in the worker, which is then replaced
+  (WorkerFailed)
+
+Workers are also replaced after max_jobs jobs, so memory a run leaves
+fragmented isn't kept forever. Callers wait up to queue_timeout for a free
+worker, and at most max_queue of them wait at once (PoolBusy otherwise).
+
+Jobs are (function, args) with a function importable by module and name;
+results and exceptions come back pickled. A generator function can also be
+run with iterate(): its items come back in batches as they are produced,
+under the same limits, and closing the iterator early stops the job.
+Workers are started lazily, with the 'spawn' start method, so they don't
+inherit the server's threads.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import multiprocessing
+import multiprocessing.util
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not on Windows
+    resource = None
+
+
+# Items an iterate() job sends at once, and seconds a batch is held back
+# for more items
+BATCH_ITEMS = 256
+BATCH_SECONDS = 0.05
+
+# Sent to a worker to stop its iterate() job early
+_STOP = 'stop'
+
+# Seconds a stopped iterate() job gets to end before its worker is killed
+STOP_TIMEOUT = 5
+
+
+class PoolBusy(Exception):
+    """No worker came free in time, or too many jobs are waiting"""
+
+
+class JobTimeout(Exception):
+    """A job ran past its wall-clock timeout and its worker was killed"""
+
+
+class WorkerFailed(Exception):
+    """A worker ran out of memory or died during a job"""
+
+
+def _worker_main(conn, memory_limit: Optional[int], initializer: Optional[Callable]):
+    """Worker process loop: run jobs until the pipe closes"""
+    if initializer is not None:
+        initializer()
+    # Set after the imports, so only the jobs count against it
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message == _STOP:
+            continue  # the job it was meant for had already ended
+        function, args, stream = message
+        try:
+            if stream:
+                reply = ('ok', _send_items(conn, function(*args)))
+            else:
+                reply = ('ok', function(*args))
+        except MemoryError:
+            reply = ('memory', None)
+        except Exception as e:
+            reply = ('error', e)
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            return  # the parent went away
+        except MemoryError:
+            conn.send(('memory', None))
+        except Exception as e:
+            # e.g. an unpicklable exception
+            conn.send(('error', RuntimeError(f'{type(e).__name__}: {e}')))
+
+
+def _send_items(conn, items: Iterable) -> None:
+    """
+    Send the items of an iterate() job in batches, until they run out or
+    the parent asks to stop (in the worker).
+    """
+    items = iter(items)
+    batch = []
+    deadline = None
+    try:
+        for item in items:
+            batch.append(item)
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + BATCH_SECONDS
+            if len(batch) < BATCH_ITEMS and now < deadline:
+                continue
+            conn.send(('items', batch))
+            batch = []
+            deadline = None
+            if conn.poll() and conn.recv() == _STOP:
+                return
+        if batch:
+            conn.send(('items', batch))
+    finally:
+        if hasattr(items, 'close'):
+            items.close()
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe"""
+
+    def __init__(self, context, memory_limit: Optional[int], initializer: Optional[Callable]):
+        self.conn, child_conn = context.Pipe()
+        # Not daemonic: jobs may start processes of their own
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit, initializer),
+            name='trace-worker'
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        self.conn.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class WorkerPool:
+    """Runs jobs in a bounded set of worker processes"""
+
+    def __init__(self, size: int, job_timeout: float = 30, memory_limit: Optional[int] = None,
+                 max_jobs: int = 100, queue_timeout: float = 10, max_queue: int = 32,
+                 initializer: Optional[Callable] = None, start_method: str = 'spawn'):
+        """
+        Args:
+            size: Worker processes
+            job_timeout: Seconds a job may run before its worker is killed
+            memory_limit: RLIMIT_AS of each worker, in bytes (None: no limit)
+            max_jobs: Jobs a worker runs before it is replaced
+            queue_timeout: Seconds to wait for a free worker
+            max_queue: Jobs waiting for a worker at once
+            initializer: Importable function each worker runs first,
+                e.g. to import what its jobs need
+            start_method: multiprocessing start method
+        """
+        self.size = size
+        self.job_timeout = job_timeout
+        self.memory_limit = memory_limit
+        self.max_jobs = max_jobs
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self._context = multiprocessing.get_context(start_method)
+        self._free = threading.BoundedSemaphore(size)
+        self._idle: List[_Worker] = []
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._busy = 0
+        self._stats = {
+            'jobs': 0, 'rejected': 0, 'timeouts': 0, 'memory_errors': 0,
+            'crashes': 0, 'recycled': 0, 'stopped': 0, 'started': 0
+        }
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        # Stop the workers at exit before multiprocessing joins them (they
+        # aren't daemonic, so they would be waited for forever)
+        self._finalizer = multiprocessing.util.Finalize(self, self.shutdown, exitpriority=10)
+
+    def run(self, function: Callable, *args) -> Any:
+        """
+        Run function(*args) in a worker and return its result.
+
+        Exceptions raised by the function are raised here.
+
+        Raises:
+            PoolBusy: If no worker came free in time
+            JobTimeout: If the job ran past job_timeout
+            WorkerFailed: If the worker ran out of memory or died
+        """
+        self._acquire()
+        try:
+            return self._run_on_worker(function, args)
+        finally:
+            self._free.release()
+
+    def iterate(self, function: Callable[..., Iterable], *args) -> Iterator:
+        """
+        Run generator function(*args) in a worker and yield its items as
+        they come.
+
+        The job holds its worker until the items run out or the iterator
+        is closed, which stops the job. job_timeout bounds the whole run,
+        including the time the caller takes between items. A worker is
+        waited for on the first next().
+
+        Raises:
+            PoolBusy, JobTimeout, WorkerFailed: As run()
+        """
+        self._acquire()
+        try:
+            yield from self._iterate_on_worker(function, args)
+        finally:
+            self._free.release()
+
+    def _acquire(self):
+        """Wait for a free worker slot (PoolBusy if none in time)"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._stats['rejected'] += 1
+                raise PoolBusy(f'{self._queued} trace jobs already waiting')
+            self._queued += 1
+        started = time.monotonic()
+        try:
+            acquired = self._free.acquire(timeout=self.queue_timeout)
+        finally:
+            waited = time.monotonic() - started
+            with self._lock:
+                self._queued -= 1
+                self._waits += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+        if not acquired:
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise PoolBusy(f'No trace worker free after {self.queue_timeout}s')
+
+    def _run_on_worker(self, function: Callable, args: tuple) -> Any:
+        worker = self._take_worker()
+        try:
+            reply = self._request(worker, (function, args, False), time.monotonic() + self.job_timeout)
+            return self._finish(worker, reply)
+        finally:
+            with self._lock:
+                self._busy -= 1
+
+    def _iterate_on_worker(self, function: Callable, args: tuple) -> Iterator:
+        worker = self._take_worker()
+        deadline = time.monotonic() + self.job_timeout
+        running = True
+        try:
+            message = (function, args, True)
+            while True:
+                try:
+                    reply = self._request(worker, message, deadline)
+                except (JobTimeout, WorkerFailed):
+                    running = False  # the worker is gone
+                    raise
+                message = None
+                if reply[0] != 'items':
+                    running = False
+                    break
+                yield from reply[1]
+            self._finish(worker, reply)
+        finally:
+            if running:
+                # Closed early: stop the job
+                self._stop(worker)
+            with self._lock:
+                self._busy -= 1
+
+    def _take_worker(self) -> _Worker:
+        """Get an idle worker, or start one (counted busy)"""
+        with self._lock:
+            self._busy += 1
+            self._stats['jobs'] += 1
+            worker = self._idle.pop() if self._idle else None
+        if worker is None:
+            try:
+                worker = self._start_worker()
+            except BaseException:
+                with self._lock:
+                    self._busy -= 1
+                raise
+        return worker
+
+    def _request(self, worker: _Worker, message: Optional[tuple], deadline: float) -> tuple:
+        """
+        Send message to a worker (if any) and wait for its next reply.
+
+        Raises:
+            JobTimeout: If no reply came before the deadline
+            WorkerFailed: If the worker died
+        """
+        try:
+            if message is not None:
+                worker.conn.send(message)
+            ready = worker.conn.poll(max(deadline - time.monotonic(), 0))
+            reply = worker.conn.recv() if ready else None
+        except (EOFError, OSError):
+            self._discard(worker, 'crashes')
+            raise WorkerFailed('Trace worker died') from None
+        if reply is None:
+            self._discard(worker, 'timeouts', kill=True)
+            raise JobTimeout(f'Trace took longer than {self.job_timeout}s')
+        return reply
+
+    def _finish(self, worker: _Worker, reply: tuple) -> Any:
+        """Return a worker after its job's final reply, and the job's result"""
+        status, value = reply
+        worker.jobs += 1
+        if status == 'memory':
+            self._discard(worker, 'memory_errors')
+            raise WorkerFailed('Trace exceeded the worker memory limit')
+        if worker.jobs >= self.max_jobs:
+            self._discard(worker, 'recycled')
+        else:
+            with self._lock:
+                self._idle.append(worker)
+        if status == 'error':
+            raise value
+        return value
+
+    def _stop(self, worker: _Worker):
+        """Stop an iterate() job that is still running, and keep its worker if it ends"""
+        deadline = time.monotonic() + STOP_TIMEOUT
+        try:
+            worker.conn.send(_STOP)
+            while True:
+                if not worker.conn.poll(max(deadline - time.monotonic(), 0)):
+                    self._discard(worker, 'stopped', kill=True)
+                    return
+                reply = worker.conn.recv()
+                if reply[0] != 'items':
+                    break
+        except (EOFError, OSError):
+            self._discard(worker, 'crashes')
+            return
+        try:
+            self._finish(worker, reply)
+        except Exception:
+            pass  # the job's outcome no longer matters
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker(self._context, self.memory_limit, self.initializer)
+        with self._lock:
+            self._workers.append(worker)
+            self._stats['started'] += 1
+        return worker
+
+    def _discard(self, worker: _Worker, reason: str, kill: bool = False):
+        with self._lock:
+            self._stats[reason] += 1
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.stop(kill=kill)
+
+    def shutdown(self):
+        """Stop every worker"""
+        with self._lock:
+            workers, self._workers, self._idle = self._workers, [], []
+        for worker in workers:
+            worker.stop(kill=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool depth, queue wait and kill counts"""
+        with self._lock:
+            waits = self._waits
+            return {
+                'size': self.size,
+                'workers': len(self._workers),
+                'busy': self._busy,
+                'idle': len(self._idle),
+                'queued': self._queued,
+                'max_queue': self.max_queue,
+                'avg_queue_wait_ms': round(1000 * self._wait_total / waits, 3) if waits else 0.0,
+                'max_queue_wait_ms': round(1000 * self._wait_max, 3),
+                'killed': self._stats['timeouts'],
+                **self._stats
+            }
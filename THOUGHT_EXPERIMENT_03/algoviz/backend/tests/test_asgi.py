@@ -0,0 +1,157 @@
+"""
+Tests for the ASGI entry point: a request through asgi.app must get the
+response the Flask app gives, whether the body is sent whole or streamed.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('TRACE_WORKERS', '0')
+
+import app as server
+import asgi
+import config
+
+
+def _call(method, path, body=b'', headers=(), query=b'', chunk_size=None):
+    """
+    Run one request through asgi.app.
+
+    Returns:
+        (status, headers dict, body, number of body messages)
+    """
+    headers = [(b'content-type', b'application/json'), *headers]
+    if chunk_size is None:
+        headers.append((b'content-length', str(len(body)).encode()))
+        parts = [body]
+    else:
+        parts = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b'']
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': query, 'root_path': '', 'headers': headers,
+        'client': ('127.0.0.1', 1), 'server': ('127.0.0.1', 5000)
+    }
+    incoming = [
+        {'type': 'http.request', 'body': part, 'more_body': i < len(parts) - 1}
+        for i, part in enumerate(parts)
+    ]
+    sent = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        await asyncio.sleep(3600)  # no disconnect
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    start, bodies = sent[0], sent[1:]
+    assert start['type'] == 'http.response.start'
+    assert not bodies[-1].get('more_body')
+    response_headers = {name.decode(): value.decode() for name, value in start['headers']}
+    return start['status'], response_headers, b''.join(m['body'] for m in bodies), len(bodies)
+
+
+def _wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def _input(n=30):
+    return json.dumps(server.registry.get('interval-coverage').generate_input(n)).encode()
+
+
+def test_get_matches_flask():
+    """A GET gets Flask's status and body"""
+    status, headers, body, _ = _call('GET', '/api/algorithms')
+    expected = server.app.test_client().get('/api/algorithms')
+    assert status == expected.status_code == 200
+    assert headers['content-type'] == 'application/json'
+    assert json.loads(body) == expected.get_json()
+
+
+def test_trace_matches_flask_with_a_body_in_parts():
+    """A POST body received in several messages reaches Flask whole"""
+    data = _input()
+    status, headers, body, _ = _call(
+        'POST', '/api/algorithm/interval-coverage/trace', data,
+        query=b'format=normalized', chunk_size=100
+    )
+    expected = server.app.test_client().post(
+        '/api/algorithm/interval-coverage/trace?format=normalized',
+        data=data, content_type='application/json'
+    )
+    assert status == 200
+    assert headers['x-trace-level'] == expected.headers['X-Trace-Level']
+    got, want = json.loads(body), expected.get_json()
+    for payload in (got, want):
+        payload['trace']['duration'] = 0
+        for step in payload['trace']['steps']:
+            step['timestamp'] = 0
+    assert got == want
+
+
+def test_chunked_request_body_reaches_flask():
+    """A body the server received chunked is passed on with its length"""
+    status, _, body, _ = _call(
+        'POST', '/api/algorithm/interval-coverage/trace', _input(),
+        headers=[(b'transfer-encoding', b'chunked')], chunk_size=64
+    )
+    assert status == 200
+    assert json.loads(body)['success']
+
+
+def test_ndjson_is_streamed_in_chunks(monkeypatch):
+    """A streamed response goes out as several body messages"""
+    monkeypatch.setattr(asgi, 'CHUNK_BYTES', 1024)
+    status, _, body, messages = _call(
+        'POST', '/api/algorithm/interval-coverage/trace', _input(200),
+        headers=[(b'accept', b'application/x-ndjson')]
+    )
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert status == 200
+    assert lines[0]['event'] == 'metadata'
+    assert lines[-1]['event'] == 'result'
+    assert messages > 2
+
+
+def test_declared_oversized_body_is_413_unread():
+    """A Content-Length over MAX_REQUEST_BYTES is answered without reading the body"""
+    length = str(config.MAX_REQUEST_BYTES + 1).encode()
+    scope_headers = [(b'content-length', length)]
+    status, _, _, _ = _call('POST', '/api/algorithm/interval-coverage/trace',
+                            headers=scope_headers, chunk_size=1)
+    assert status == 413
+
+
+def test_job_long_poll_returns_on_change(monkeypatch):
+    """GET /api/jobs/<id>?wait= returns once the job moves on, not at the deadline"""
+    gate = threading.Event()
+    monkeypatch.setattr(server, '_run_job', lambda job: gate.wait(10) and None)
+    status, _, body, _ = _call('POST', '/api/algorithm/interval-coverage/jobs', _input(50))
+    assert status == 202
+    job_id = json.loads(body)['job']['id']
+    _wait_until(lambda: server.job_scheduler.get(job_id).state == 'running')
+    threading.Timer(0.3, gate.set).start()
+    started = time.monotonic()
+    status, _, body, _ = _call('GET', f'/api/jobs/{job_id}', query=b'wait=10')
+    assert status == 200
+    assert time.monotonic() - started < 5
+    assert json.loads(body)['job']['state'] == 'done'
+
+
+def test_unknown_job_with_wait_is_404():
+    """Nothing to wait for: the 404 comes at once"""
+    status, _, _, _ = _call('GET', '/api/jobs/missing', query=b'wait=10')
+    assert status == 404
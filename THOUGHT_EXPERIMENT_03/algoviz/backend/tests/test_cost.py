@@ -0,0 +1,146 @@
+"""
+Tests for the trace cost model and admission control: fits must recover
+the growth of known costs, estimates must follow the documented profile
+fallbacks and step caps, and over-budget requests must be downgraded or
+rejected.
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('TRACE_WORKERS', '0')
+
+from algorithms.registry import registry
+from core.cost import (TERMS, AdmissionControl, CostModel, QueueTimeout, TraceRejected,
+                       candidate_terms, fit, parse_complexity)
+
+
+SIZES = (50, 100, 200, 400, 800)
+
+
+def test_parse_complexity():
+    """Big-O strings map to TERMS keys, anything else to None"""
+    assert parse_complexity('O(n log n)') == 'n log n'
+    assert parse_complexity(' O( n  log  n ) ') == 'n log n'
+    assert parse_complexity('O(n²)') == 'n^2'
+    assert parse_complexity('O(2^n)') is None
+    assert parse_complexity('') is None
+    assert candidate_terms({'time': 'O(n log n)', 'space': 'O(n)'}) == ['1', 'n', 'n log n', 'n^2']
+
+
+def test_fit_recovers_exact_coefficients():
+    """Noise-free samples give back the coefficients they were made from"""
+    samples = [(n, 4000 + 3 * n + 0.5 * n * n) for n in SIZES]
+    fitted = fit(samples, ['1', 'n', 'n^2'])
+    assert fitted.keys() == {'1', 'n', 'n^2'}
+    assert fitted['1'] == pytest.approx(4000, rel=1e-6)
+    assert fitted['n'] == pytest.approx(3, rel=1e-6)
+    assert fitted['n^2'] == pytest.approx(0.5, rel=1e-6)
+
+
+def test_fit_drops_terms_that_do_not_help():
+    """Negligible terms are dropped and what is left still predicts the cost"""
+    fitted = fit([(n, 10 + 2 * n) for n in SIZES], ['1', 'n', 'n log n', 'n^2'])
+    assert 'n^2' not in fitted
+    assert all(c >= 0 for c in fitted.values())
+    prediction = sum(c * TERMS[term](1600) for term, c in fitted.items())
+    assert prediction == pytest.approx(3210, rel=1e-3)
+
+
+MODEL = CostModel({
+    'trace:full': {'steps': {'n': 4.0}, 'bytes': {'n^2': 2.0}, 'ms': {'n': 0.5}},
+    'trace:decisions': {'steps': {'n': 1.0}, 'bytes': {'n': 10.0}, 'ms': {'1': 1.0}},
+    'trace:full:normalized': {'steps': {'n': 4.0}, 'bytes': {'n': 50.0}, 'ms': {'n': 0.25}},
+})
+
+
+def test_estimate_and_profile_fallbacks():
+    """Missing profiles fall back to plain, then to full; unknown modes give None"""
+    assert MODEL.estimate(100) == {'steps': 400, 'bytes': 20000, 'ms': 50}
+    assert MODEL.estimate(100, level='decisions', normalized=True) == MODEL.estimate(100, level='decisions')
+    assert MODEL.estimate(100, level='summary', normalized=True) == MODEL.estimate(100, normalized=True)
+    assert MODEL.estimate(100, level='summary') == MODEL.estimate(100)
+    assert MODEL.estimate(100, mode='result') is None
+    assert CostModel({}).estimate(100) is None
+
+
+def test_estimate_is_capped_by_max_steps():
+    """A step budget caps steps and scales bytes and time with them"""
+    assert MODEL.estimate(100, max_steps=100) == {'steps': 100, 'bytes': 5000, 'ms': 13}
+    assert MODEL.estimate(100, max_steps=1000) == MODEL.estimate(100)
+
+
+def test_admission_downgrades_then_rejects():
+    """Over budget at the asked level: run lower if allowed, else reject"""
+    def estimate_at(level):
+        return MODEL.estimate(100, level=level)
+
+    admission = AdmissionControl(max_steps=200, max_bytes=0, max_ms=0)
+    assert admission.decide(estimate_at, 'decisions') == ('decisions', estimate_at('decisions'))
+    assert admission.decide(estimate_at, 'full')[0] == 'decisions'
+
+    admission.downgrade = False
+    with pytest.raises(TraceRejected, match='steps 400 > 200'):
+        admission.decide(estimate_at, 'full')
+
+    assert AdmissionControl(1, 1, 1).decide(lambda level: None, 'full') == ('full', None)
+
+
+def test_heavy_runs_wait_for_a_slot():
+    """Heavy runs beyond heavy_slots time out; light runs never wait"""
+    admission = AdmissionControl(0, 0, 0, heavy_ms=10, heavy_slots=1, queue_timeout=0.05)
+    heavy, light = {'steps': 1, 'bytes': 1, 'ms': 11}, {'steps': 1, 'bytes': 1, 'ms': 10}
+    held, release = threading.Event(), threading.Event()
+
+    def hold():
+        with admission.slot(heavy):
+            held.set()
+            release.wait(10)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    try:
+        assert held.wait(10)
+        with pytest.raises(QueueTimeout):
+            with admission.slot(heavy):
+                pass
+        with admission.slot(light):
+            pass
+    finally:
+        release.set()
+        holder.join()
+    with admission.slot(heavy):
+        pass
+
+
+@pytest.mark.parametrize('mode, level', [
+    ('trace', 'full'), ('trace', 'decisions'), ('decisions', 'full')
+])
+def test_shipped_model_predicts_steps(mode, level):
+    """interval-coverage's cost_model.json predicts step counts within 10%"""
+    registry.discover()
+    algorithm = registry.get('interval-coverage')
+    for n in (100, 2000):
+        input_data = algorithm.check_input(algorithm.generate_input(n))
+        trace, _ = algorithm.collect_trace(input_data, mode=mode, level=level)
+        estimate = algorithm.estimate_cost(input_data, mode=mode, level=level)
+        assert estimate['steps'] == pytest.approx(trace['total_steps'], rel=0.1)
+
+
+def test_shipped_model_covers_every_profile():
+    """Every single-process mode and level has a calibrated profile"""
+    registry.discover()
+    algorithm = registry.get('interval-coverage')
+    with open(algorithm.cost_model_path()) as f:
+        profiles = json.load(f)
+    for mode in ('trace', 'decisions', 'result'):
+        for level in ('summary', 'decisions', 'full'):
+            assert algorithm.get_cost_model().estimate(100, mode, level) is not None, (mode, level)
+    assert all(set(profile) == {'steps', 'bytes', 'ms'} for profile in profiles.values())
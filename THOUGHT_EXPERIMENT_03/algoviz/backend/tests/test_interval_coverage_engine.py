@@ -0,0 +1,79 @@
+"""
+Tests for the vectorized interval coverage engine: the NumPy and pure-Python
+paths must give the same order and decisions, and the bulk trace modes must
+agree with the recursive trace.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('TRACE_WORKERS', '0')
+
+from algorithms.interval_coverage import engine
+from algorithms.interval_coverage.algorithm import IntervalCoverageAlgorithm
+
+
+def _random_intervals(count, seed, start_range, max_length):
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, start_range, count)
+    return starts, starts + rng.integers(1, max_length, count)
+
+
+def _intervals_with_ties(count, seed):
+    """Intervals sharing starts, ends and whole (start, end) pairs"""
+    starts, ends = _random_intervals(count, seed, 20, 10)
+    return {'intervals': [
+        {'id': row, 'start': int(start), 'end': int(end), 'color': 'blue'}
+        for row, (start, end) in enumerate(zip(starts, ends))
+    ]}
+
+
+@pytest.mark.parametrize('start_range, max_length', [
+    (30, 10),            # many ties, packed sort key
+    (10 ** 12, 10 ** 5),  # too wide to pack: argsort of the composite key
+    (10 ** 15, 10 ** 5),  # too wide for one int64: lexsort
+])
+def test_numpy_matches_python(start_range, max_length):
+    """Same order and decisions on every sort path, ties included"""
+    starts, ends = _random_intervals(2000, 7, start_range, max_length)
+    order, keep = engine.solve(starts, ends)
+    python_order, python_keep = engine._solve_python(starts.tolist(), ends.tolist())
+    assert order.tolist() == python_order
+    assert keep.tolist() == python_keep
+
+
+def test_numpy_matches_python_for_floats():
+    """Float bounds take the lexsort path and still agree"""
+    starts, ends = _random_intervals(500, 8, 40, 10)
+    starts, ends = starts / 4, ends / 4
+    order, keep = engine.solve(starts, ends)
+    assert (order.tolist(), keep.tolist()) == engine._solve_python(list(starts), list(ends))
+
+
+def test_empty_input():
+    """No intervals: nothing sorted, nothing kept"""
+    order, keep = engine.solve([], [])
+    assert len(order) == len(keep) == 0
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_decisions_mode_matches_the_recursive_trace(monkeypatch, use_numpy):
+    """mode=decisions gives the recursive trace's DECISION_MADE steps and result"""
+    if not use_numpy:
+        monkeypatch.setattr(engine, 'np', None)
+    algorithm = IntervalCoverageAlgorithm()
+    input_data = _intervals_with_ties(300, 9)
+
+    trace, result = algorithm.execute_traced(input_data)
+    decisions, decisions_result = algorithm.execute_traced(input_data, mode='decisions')
+    _, result_only = algorithm.execute_traced(input_data, mode='result')
+
+    expected = [step['data'] for step in trace['steps'] if step['type'] == 'DECISION_MADE']
+    assert [step['data'] for step in decisions['steps']] == expected
+    assert decisions_result == result_only == result
@@ -0,0 +1,73 @@
+"""
+Tests for the multi-core interval coverage engine: it must decide every
+interval exactly as the serial engine does, and workers must be bounded.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('TRACE_WORKERS', '0')
+
+from algorithms.interval_coverage.engine import solve
+from algorithms.interval_coverage.parallel import _partition, solve_parallel
+
+
+def _random_intervals(count, seed, start_range=1000, max_length=50):
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, start_range, count)
+    return starts, starts + rng.integers(1, max_length, count)
+
+
+def test_parallel_matches_serial():
+    """Same order and decisions as the serial engine, ties included"""
+    for seed, workers in [(1, 2), (2, 3), (3, 4), (4, 8)]:
+        starts, ends = _random_intervals(5000, seed, start_range=300)
+        order, keep = solve(starts, ends)
+        parallel_order, parallel_keep, chunks = solve_parallel(starts, ends, workers)
+        assert np.array_equal(order, parallel_order)
+        assert np.array_equal(keep, parallel_keep)
+        assert sum(chunk['size'] for chunk in chunks) == len(starts)
+        assert sum(chunk['kept_count'] for chunk in chunks) == int(keep.sum())
+
+
+def test_partition_keeps_every_row_with_many_workers():
+    """More workers than fit in an int16 still partition every row once"""
+    starts, _ = _random_intervals(200_000, 5, start_range=10 ** 9)
+    chunk_rows = _partition(starts, 40_000)
+    rows = np.concatenate(chunk_rows)
+    assert len(rows) == len(starts)
+    assert np.array_equal(np.sort(rows), np.arange(len(starts)))
+    # Chunks cover increasing start ranges
+    bounds = [(starts[r].min(), starts[r].max()) for r in chunk_rows]
+    assert all(high < low for (_, high), (low, _) in zip(bounds, bounds[1:]))
+
+
+def test_workers_over_the_limit_are_rejected():
+    """The trace endpoint refuses more workers than the server allows"""
+    import app as server
+    import config
+
+    client = server.app.test_client()
+    example = {'intervals': [{'start': 1, 'end': 5}, {'start': 2, 'end': 3}]}
+    url = '/api/algorithm/interval-coverage/trace?mode=parallel&workers='
+    too_many = client.post(url + str(config.TRACE_MAX_PARALLEL_WORKERS + 1), json=example)
+    assert too_many.status_code == 400
+    allowed = client.post(url + '1', json=example)
+    assert allowed.status_code == 200
+    assert allowed.get_json()['result'] == [{'start': 1, 'end': 5}]
+
+
+def test_parallel_runs_have_a_cost_estimate():
+    """mode=parallel goes through admission control like the other modes"""
+    from algorithms.registry import registry
+
+    registry.discover()
+    algorithm = registry.get('interval-coverage')
+    input_data = algorithm.check_input(algorithm.generate_input(1000))
+    for level in ('summary', 'decisions', 'full'):
+        assert algorithm.estimate_cost(input_data, mode='parallel', level=level) is not None
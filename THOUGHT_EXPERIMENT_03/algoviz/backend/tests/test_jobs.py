@@ -0,0 +1,163 @@
+"""
+Tests for background trace jobs: the scheduler must run the shortest
+predicted job first, cancel queued and running jobs, and keep a result
+body alive while it is being sent.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('TRACE_WORKERS', '0')
+
+import app as server
+from core.jobs import Job, JobScheduler
+from core.shared_body import SharedBody, segment_name, write_segment
+
+
+def _job(client, ms):
+    return Job(client, 'test', None, {}, estimate={'steps': 1, 'bytes': 1, 'ms': ms})
+
+
+def _wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def _segment_exists(name):
+    return os.path.exists(os.path.join('/dev/shm', name))
+
+
+class _Runner:
+    """Job runner recording the run order; the first job waits for release()"""
+
+    def __init__(self):
+        self.order = []
+        self.gate = threading.Event()
+
+    def __call__(self, job):
+        self.order.append(job)
+        if len(self.order) == 1:
+            self.gate.wait(10)
+        return None
+
+    def release(self):
+        self.gate.set()
+
+
+def test_shortest_predicted_runs_first():
+    """Queued jobs run by predicted ms, whatever their submission order"""
+    runner = _Runner()
+    scheduler = JobScheduler(runner, workers=1, aging=0)
+    blocker = scheduler.submit(_job('a', 1))
+    _wait_until(lambda: blocker.state == 'running')
+    jobs = [scheduler.submit(_job(client, ms)) for client, ms in
+            [('b', 500), ('c', 100), ('d', 300)]]
+    assert scheduler.describe(jobs[0])['queue_position'] == 2
+    runner.release()
+    _wait_until(lambda: all(job.state == 'done' for job in jobs))
+    assert [job.estimate['ms'] for job in runner.order] == [1, 100, 300, 500]
+
+
+def test_client_usage_lets_others_go_ahead():
+    """A client's earlier jobs count against its next ones"""
+    runner = _Runner()
+    scheduler = JobScheduler(runner, workers=1, aging=0, fairness_half_life=3600)
+    blocker = scheduler.submit(_job('a', 100))
+    _wait_until(lambda: blocker.state == 'running')
+    heavy_user = [scheduler.submit(_job('a', 100)) for _ in range(2)]
+    other = scheduler.submit(_job('b', 150))
+    runner.release()
+    _wait_until(lambda: other.state == 'done' and all(job.state == 'done' for job in heavy_user))
+    assert runner.order.index(other) < runner.order.index(heavy_user[1])
+
+
+def test_cancel_queued_and_running_jobs():
+    """A queued job is dropped unrun; a running one sees its cancel flag"""
+    def run(job):
+        _wait_until(job.control.is_set)
+        return None
+
+    scheduler = JobScheduler(run, workers=1)
+    running = scheduler.submit(_job('a', 1))
+    queued = scheduler.submit(_job('a', 1))
+    _wait_until(lambda: running.state == 'running')
+    scheduler.cancel(queued.id)
+    assert queued.state == 'cancelled'
+    scheduler.cancel(running.id)
+    _wait_until(lambda: running.state == 'cancelled')
+    assert scheduler.stats()['totals']['cancelled'] == 2
+
+
+def test_pinned_body_outlives_its_job():
+    """A body pinned by a response is only removed once unpinned"""
+    name = segment_name()
+    data = b'0123456789' * 1000
+    write_segment(name, data)
+    scheduler = JobScheduler(lambda job: SharedBody(name, len(data)), workers=1)
+    job = scheduler.submit(_job('a', 1))
+    _wait_until(lambda: job.state == 'done')
+    body = job.body
+    assert body.pin()
+    chunks = body.chunks(1000, close=False)
+    scheduler.clear()  # drops the job and closes its body
+    assert job.body is None
+    assert b''.join(chunk.tobytes() for chunk in chunks) == data
+    assert not body.pin()
+    body.unpin()
+    if os.path.isdir('/dev/shm'):
+        assert not _segment_exists(name)
+
+
+def test_result_streams_after_the_job_expires():
+    """GET .../result keeps sending a body whose job is dropped mid-response"""
+    client = server.app.test_client()
+    input_data = server.registry.get('interval-coverage').generate_input(200)
+    response = client.post('/api/algorithm/interval-coverage/jobs', json=input_data)
+    job_id = response.get_json()['job']['id']
+    _wait_until(lambda: server.job_scheduler.get(job_id).state == 'done')
+    with client.get(f'/api/jobs/{job_id}/result') as response:
+        expected = response.get_data()
+
+    response = client.get(f'/api/jobs/{job_id}/result', buffered=False)
+    name = server.job_scheduler.get(job_id).body.name
+    server.job_scheduler.clear()
+    assert response.get_data() == expected
+    response.close()
+    if os.path.isdir('/dev/shm'):
+        assert not _segment_exists(name)
+    assert client.get(f'/api/jobs/{job_id}/result').status_code == 404
+
+
+def test_progress_wait_wakes_on_state_change(monkeypatch):
+    """GET /api/jobs/<id>?wait= on the Flask app returns as soon as the job finishes"""
+    gate = threading.Event()
+    monkeypatch.setattr(server, '_run_job', lambda job: gate.wait(10) and None)
+    client = server.app.test_client()
+    input_data = server.registry.get('interval-coverage').generate_input(20)
+    job_id = client.post('/api/algorithm/interval-coverage/jobs', json=input_data).get_json()['job']['id']
+    _wait_until(lambda: server.job_scheduler.get(job_id).state == 'running')
+    threading.Timer(0.2, gate.set).start()
+    started = time.monotonic()
+    job = client.get(f'/api/jobs/{job_id}?wait=10').get_json()['job']
+    assert job['state'] == 'done'
+    assert time.monotonic() - started < 5
+
+
+def test_scheduler_wait_times_out_without_change():
+    """JobScheduler.wait returns the unchanged progress at its timeout"""
+    runner = _Runner()
+    scheduler = JobScheduler(runner, workers=1)
+    job = scheduler.submit(_job('a', 1))
+    _wait_until(lambda: job.state == 'running')
+    started = time.monotonic()
+    assert scheduler.wait(job, ('running', 0), 0.2, interval=0.05) == ('running', 0)
+    assert time.monotonic() - started >= 0.2
+    runner.release()
+    assert scheduler.wait(job, ('running', 0), 10)[0] == 'done'
@@ -0,0 +1,131 @@
+"""
+Tests for the algorithm catalog: metadata is read once per metadata.json
+change, and catalog listings and responses are rebuilt exactly when the
+metadata changes.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('TRACE_WORKERS', '0')
+
+import app as server
+from algorithms.base_algorithm import BaseAlgorithm
+from algorithms.registry import AlgorithmRegistry
+
+
+class _Demo(BaseAlgorithm):
+    """Algorithm stub; subclasses point _metadata_path at a test file"""
+
+    def execute_traced(self, input_data, **options):
+        return {}, None
+
+    def validate_input(self, input_data):
+        return True
+
+    def get_default_example(self):
+        return {}
+
+
+def _write_metadata(path, **fields):
+    """Write a metadata.json and move its mtime on, so the change is always seen"""
+    path.write_text(json.dumps({'name': 'Demo', 'category': 'Demo', **fields}))
+    mtime = path.stat().st_mtime + 1
+    os.utime(path, (mtime, mtime))
+
+
+def _algorithm(path, **fields):
+    """An algorithm class whose metadata.json is path"""
+    _write_metadata(path, **fields)
+    return type('Demo', (_Demo,), {'_metadata_path': str(path)})
+
+
+def _catalog(tmp_path):
+    """A registry with two algorithms, and their metadata.json paths"""
+    registry = AlgorithmRegistry()
+    paths = {}
+    for algorithm_id, category in (('alpha', 'Sorting'), ('beta', 'Intervals')):
+        paths[algorithm_id] = tmp_path / f'{algorithm_id}.json'
+        registry.register(_algorithm(paths[algorithm_id], id=algorithm_id, category=category))
+    return registry, paths
+
+
+def test_metadata_is_reread_only_when_it_changes(tmp_path):
+    """Same parsed dict until the file's mtime moves, then the new contents"""
+    path = tmp_path / 'metadata.json'
+    algorithm = _algorithm(path, id='demo')
+    first = algorithm.get_metadata()
+    assert algorithm.get_metadata() is first
+    assert algorithm().metadata is first
+
+    _write_metadata(path, id='demo', name='Renamed')
+    assert algorithm.get_metadata()['name'] == 'Renamed'
+
+
+def test_catalog_matches_the_metadata_and_follows_changes(tmp_path):
+    """Listings equal the metadata files, before and after one of them changes"""
+    registry, paths = _catalog(tmp_path)
+    version = registry.catalog_version()
+    assert sorted(meta['id'] for meta in registry.list_all()) == ['alpha', 'beta']
+    assert registry.get_categories() == ['Intervals', 'Sorting']
+    assert [meta['id'] for meta in registry.list_by_category('sorting')] == ['alpha']
+    assert registry.catalog_version() == version
+
+    _write_metadata(paths['beta'], id='beta', category='Sorting')
+    assert registry.catalog_version() != version
+    assert registry.get_categories() == ['Sorting']
+    assert sorted(meta['id'] for meta in registry.list_by_category('Sorting')) == ['alpha', 'beta']
+    assert registry.get_metadata('beta')['category'] == 'Sorting'
+
+
+def test_discovered_algorithms_are_listed_without_importing(tmp_path):
+    """metadata.json files found by discover() are in the catalog, modules untouched"""
+    root = tmp_path / 'algorithms'
+    for algorithm_id, category in (('alpha', 'Sorting'), ('beta', 'Intervals')):
+        (root / algorithm_id).mkdir(parents=True)
+        _write_metadata(root / algorithm_id / 'metadata.json', id=algorithm_id, category=category)
+    registry = AlgorithmRegistry()
+    assert registry.discover(str(root)) == ['alpha', 'beta']
+    assert [meta['id'] for meta in registry.list_all()] == ['alpha', 'beta']
+
+    _write_metadata(root / 'beta' / 'metadata.json', id='beta', category='Sorting')
+    assert registry.get_categories() == ['Sorting']
+    assert not registry.is_loaded('alpha') and not registry.is_loaded('beta')
+
+
+def test_listings_are_copies(tmp_path):
+    """Changing a returned list doesn't change the cached catalog"""
+    registry, _ = _catalog(tmp_path)
+    registry.list_all().clear()
+    registry.get_categories().clear()
+    assert len(registry.list_all()) == 2
+    assert len(registry.get_categories()) == 2
+
+
+def test_catalog_responses_match_a_fresh_listing():
+    """The stored /api/algorithms and /categories bodies equal the live catalog"""
+    client = server.app.test_client()
+    for _ in range(2):
+        algorithms = client.get('/api/algorithms').get_json()
+        categories = client.get('/api/algorithms/categories').get_json()
+        assert algorithms['algorithms'] == server.registry.list_all()
+        assert algorithms['count'] == len(server.registry.list_all())
+        assert categories['categories'] == server.registry.get_categories()
+    stored = server._catalog_responses['algorithms']
+    client.get('/api/algorithms')
+    assert server._catalog_responses['algorithms'] is stored
+
+
+def test_acquire_reuses_instances():
+    """acquire() lends pooled instances; get() always makes a new one"""
+    registry = server.registry
+    with registry.acquire('interval-coverage') as first:
+        with registry.acquire('interval-coverage') as second:
+            assert first is not second
+    with registry.acquire('interval-coverage') as again:
+        assert again in (first, second)
+    assert registry.get('interval-coverage') not in (first, second)
@@ -0,0 +1,107 @@
+"""
+Tests for the binary trace encoding: decoding must give back exactly the
+payload that was encoded, and the trace endpoint must send the same
+response in either encoding.
+"""
+
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('TRACE_WORKERS', '0')
+
+import app as server
+from core.serialization import TRACE_MIMETYPE, decode_trace, encode_trace
+
+
+def _step(number, event_type, timestamp, data):
+    return {'step_number': number, 'timestamp': timestamp, 'type': event_type, 'data': data}
+
+
+VALUES = {
+    'ints': [0, 1, -1, 63, -64, 2 ** 40, -(2 ** 63), 2 ** 70],
+    'mixed': [1, 'one', 1.5, None, True, False, [], {}],
+    'floats': [0.1, -2.5e-300, float('inf')],
+    'text': ['', 'ascii', 'ünïcödé ∞', 'ascii'],
+    'nested': {'a': {'b': [{'c': 1}, {'c': 2}]}, 'empty': ''},
+    'flags': [True, False],  # bools are not an int list
+}
+
+
+def test_round_trip_of_edge_values():
+    """Ints of any size, floats, unicode, repeated strings and shapes come back unchanged"""
+    steps = [
+        _step(0, 'A', 0.000001, VALUES),
+        _step(1, 'B', 0.5, {'a': {'b': []}, 'empty': 'x'}),
+        _step(2, 'A', 0.25, {'c': 3}),  # timestamps may go backwards
+    ]
+    payload = {'trace': {'steps': steps, 'total_steps': 3}, 'result': VALUES}
+    assert decode_trace(encode_trace(payload)) == payload
+
+
+def test_round_trip_of_each_step_location():
+    """Steps at the top level, under 'trace', or absent"""
+    steps = [_step(0, 'X', 1.0, {'n': 1})]
+    for payload in ({'steps': steps, 'total_steps': 1},
+                    {'trace': {'steps': steps}, 'result': None},
+                    {'result': [1, 2]}):
+        assert decode_trace(encode_trace(payload)) == payload
+
+
+def test_tuples_decode_as_lists():
+    """Tuples are encoded like lists, as JSON would"""
+    payload = {'result': (1, (2, 'b'))}
+    assert decode_trace(encode_trace(payload)) == {'result': [1, [2, 'b']]}
+
+
+@pytest.mark.parametrize('payload, error', [
+    ({'steps': [_step(1, 'X', 0.0, {})]}, ValueError),
+    ({'steps': [{'type': 'X', 'data': {}}]}, ValueError),
+    ({'result': {1: 'x'}}, TypeError),
+    ({'result': {1, 2}}, TypeError),
+])
+def test_unencodable_payloads_are_refused(payload, error):
+    """Misnumbered steps and non-JSON values raise"""
+    with pytest.raises(error):
+        encode_trace(payload)
+
+
+def test_bad_magic_is_refused():
+    """decode_trace only accepts its own format"""
+    with pytest.raises(ValueError):
+        decode_trace(b'{"trace": {}}')
+
+
+def _intervals(count, seed):
+    rng = random.Random(seed)
+    intervals = []
+    for number in range(count):
+        start = rng.randrange(100)
+        intervals.append({'id': number, 'start': start,
+                          'end': start + rng.randrange(1, 30), 'color': 'blue'})
+    return {'intervals': intervals}
+
+
+@pytest.mark.parametrize('query', ['', '?format=normalized', '?messages=templates'])
+def test_endpoint_binary_matches_json(query):
+    """The binary response decodes to the JSON response"""
+    server.trace_cache.clear()
+    client = server.app.test_client()
+    input_data = _intervals(40, 1)
+    url = '/api/algorithm/interval-coverage/trace' + query
+    binary = client.post(url, json=input_data, headers={'Accept': TRACE_MIMETYPE})
+    assert binary.mimetype == TRACE_MIMETYPE
+    server.trace_cache.clear()
+    response = client.post(url, json=input_data)
+    decoded, expected = decode_trace(binary.data), json.loads(response.data)
+    for payload in (decoded, expected):
+        payload['trace']['duration'] = 0
+        for step in payload['trace']['steps']:
+            step['timestamp'] = 0
+    assert decoded == expected
@@ -0,0 +1,83 @@
+"""
+Tests for handing trace bodies over in shared memory: a worker's body
+must read back byte for byte, and its segment must be gone once closed.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from algorithms.registry import registry
+from core.serialization import decode_trace, encode_response
+from core.shared_body import SharedBody, remove_segment, segment_name, write_segment
+from core.worker_jobs import collect_trace_job, trace_body_job
+
+
+def _segment_exists(name):
+    return os.path.exists(os.path.join('/dev/shm', name))
+
+
+def test_body_round_trip():
+    """tobytes() and the chunks give back what was written"""
+    data = bytes(range(256)) * 5000
+    name = segment_name()
+    assert write_segment(name, data) == len(data)
+    body = SharedBody(name, len(data))
+    try:
+        assert len(body) == len(data)
+        assert body.tobytes() == data
+        assert b''.join(chunk.tobytes() for chunk in body.chunks(4096, close=False)) == data
+    finally:
+        body.close()
+        body.close()  # idempotent
+    if os.path.isdir('/dev/shm'):
+        assert not _segment_exists(name)
+
+
+def test_close_while_a_chunk_is_referenced():
+    """Closing a body whose chunk is still held doesn't fail or leak"""
+    name = segment_name()
+    write_segment(name, b'x' * 10000)
+    body = SharedBody(name, 10000)
+    chunks = body.chunks(1000, close=False)
+    first = next(chunks)
+    body.close()
+    assert first.tobytes() == b'x' * 1000
+    chunks.close()
+    del first
+    if os.path.isdir('/dev/shm'):
+        assert not _segment_exists(name)
+
+
+def test_remove_missing_segment():
+    """Removing a segment a failed job never created is a no-op"""
+    remove_segment(segment_name())
+
+
+def test_trace_body_job_matches_in_process_encoding():
+    """The body a worker job writes is the response the server would encode"""
+    registry.load_all()
+    algorithm = registry.get('interval-coverage')
+    input_data = algorithm.check_input(algorithm.generate_input(50))
+    options = {'normalized': True}
+    for encoding in ('json', 'binary'):
+        name = segment_name()
+        size = trace_body_job('interval-coverage', input_data, options, encoding, name)
+        body = SharedBody(name, size)
+        try:
+            shared = body.tobytes()
+        finally:
+            body.close()
+        trace, result = collect_trace_job('interval-coverage', input_data, options)
+        expected = encode_response({'success': True, 'trace': trace, 'result': result}, encoding)
+        decode = json.loads if encoding == 'json' else decode_trace
+        shared, expected = decode(shared), decode(expected)
+        for payload in (shared, expected):
+            payload['trace']['duration'] = 0
+            for step in payload['trace']['steps']:
+                step['timestamp'] = 0
+        assert shared == expected
@@ -0,0 +1,124 @@
+"""
+Tests for the trace response cache: the LRU must stay within its byte
+bound, and a cached response must carry the same headers as a fresh one.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault('TRACE_WORKERS', '0')
+
+import app as server
+from core.cache import TraceCache, make_cache_key
+
+
+def test_lru_stays_within_its_byte_bound():
+    """Least recently used bodies are evicted to keep the total under max_bytes"""
+    cache = TraceCache(100, max_entry_bytes=60)
+    cache.put('a', b'x' * 40)
+    cache.put('b', b'x' * 40)
+    assert cache.get('a') is not None  # b is now least recently used
+    cache.put('c', b'x' * 40)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    stats = cache.stats()
+    assert stats['bytes'] == 80 <= stats['max_bytes']
+    assert stats['evictions'] == 1
+
+    cache.put('d', b'x' * 61)  # over max_entry_bytes: not cached
+    assert cache.get('d') is None
+    assert cache.stats()['rejected'] == 1
+
+    cache.put('a', b'x' * 10)  # replacing an entry frees its old size
+    assert cache.stats()['bytes'] == 50
+
+
+def test_disabled_cache_keeps_nothing():
+    """max_bytes 0 turns caching off"""
+    cache = TraceCache(0)
+    cache.put('a', b'x')
+    assert cache.get('a') is None
+
+
+def test_cache_key_ignores_key_order():
+    """Requests differing only in key order share an entry"""
+    first = make_cache_key('a', '1', {'x': 1, 'y': 2}, {'level': 'full'})
+    second = make_cache_key('a', '1', {'y': 2, 'x': 1}, {'level': 'full'})
+    assert first == second
+    assert first != make_cache_key('a', '2', {'x': 1, 'y': 2}, {'level': 'full'})
+    assert first != make_cache_key('a', '1', {'x': 1, 'y': 2}, {'level': 'full'}, 'binary')
+
+
+def test_hit_has_the_trace_level_header():
+    """A cache hit says the level it was captured at, like the miss did"""
+    server.trace_cache.clear()
+    client = server.app.test_client()
+    input_data = server.registry.get('interval-coverage').generate_input(20)
+    url = '/api/algorithm/interval-coverage/trace?level=decisions'
+    miss = client.post(url, json=input_data)
+    hit = client.post(url, json=input_data)
+    assert miss.headers['X-Trace-Cache'] == 'miss'
+    assert hit.headers['X-Trace-Cache'] == 'hit'
+    assert hit.headers['X-Trace-Level'] == miss.headers['X-Trace-Level'] == 'decisions'
+    assert hit.data == miss.data
+
+
+def test_invalid_input_is_rejected_before_the_cache():
+    """An input that fails validation is never looked up or cached"""
+    server.trace_cache.clear()
+    client = server.app.test_client()
+    before = server.trace_cache.stats()
+    url = '/api/algorithm/interval-coverage/trace'
+    for _ in range(2):
+        response = client.post(url, json={'intervals': [{'start': 2, 'end': 1}]})
+        assert response.status_code == 400
+    after = server.trace_cache.stats()
+    assert after['hits'] == before['hits']
+    assert after['misses'] == before['misses']
+    assert after['entries'] == 0
+
+
+def test_over_budget_request_is_rejected_before_the_cache():
+    """A request admission control turns away is not served from the cache"""
+    server.trace_cache.clear()
+    client = server.app.test_client()
+    input_data = server.registry.get('interval-coverage').generate_input(20)
+    url = '/api/algorithm/interval-coverage/trace'
+    assert client.post(url, json=input_data).status_code == 200
+    budgets = dict(server.admission.budgets)
+    downgrade = server.admission.downgrade
+    server.admission.budgets['steps'] = 1
+    server.admission.downgrade = False
+    try:
+        assert client.post(url, json=input_data).status_code == 413
+    finally:
+        server.admission.budgets.update(budgets)
+        server.admission.downgrade = downgrade
+
+
+def test_downgraded_batch_item_shares_the_trace_cache_entry():
+    """A batch input run at a lower level is cached under that level, like /trace"""
+    server.trace_cache.clear()
+    client = server.app.test_client()
+    algorithm = server.registry.get('interval-coverage')
+    input_data = algorithm.generate_input(20)
+    budgets = dict(server.admission.budgets)
+    downgrade = server.admission.downgrade
+    checked_input = algorithm.check_input(input_data)
+    server.admission.budgets['steps'] = algorithm.estimate_cost(
+        checked_input, normalized=True, level='decisions')['steps']
+    server.admission.downgrade = True
+    try:
+        batch = client.post('/api/algorithm/interval-coverage/batch', json={'inputs': [input_data]})
+        assert b'"level": "decisions"' in batch.data
+        for query in ('?format=normalized', '?format=normalized&level=decisions'):
+            hit = client.post('/api/algorithm/interval-coverage/trace' + query, json=input_data)
+            assert hit.headers['X-Trace-Cache'] == 'hit'
+            assert hit.headers['X-Trace-Level'] == 'decisions'
+    finally:
+        server.admission.budgets.update(budgets)
+        server.admission.downgrade = downgrade
@@ -0,0 +1,80 @@
+"""
+Tests for stored traces: readers waiting for steps must be woken as soon as
+the steps are in, and runs must stop at their step budget.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.trace_store import TraceStore
+
+
+def _events(count, interval=0.0, gate=None):
+    yield 'metadata', {'name': 'test'}
+    for number in range(count):
+        if gate is not None:
+            gate.wait()
+        yield 'step', {'step_number': number, 'timestamp': number / 1000}
+        if interval:
+            time.sleep(interval)
+    yield 'trace', {'steps': [], 'total_steps': count}
+    yield 'result', count
+
+
+def test_readers_wake_when_their_steps_are_in():
+    """Every waiting reader returns once its step count is reached, well before its timeout"""
+    store = TraceStore(10, 60)
+    gate = threading.Event()
+    stored = store.start(lambda: _events(200, gate=gate))
+    results = {}
+
+    def read(count):
+        started = time.monotonic()
+        results[count] = (stored.wait_for(count, 10), time.monotonic() - started)
+
+    readers = [threading.Thread(target=read, args=(count,)) for count in (1, 5, 50, 199)]
+    for reader in readers:
+        reader.start()
+    time.sleep(0.05)
+    gate.set()
+    for reader in readers:
+        reader.join()
+    assert all(ok for ok, _ in results.values())
+    assert max(waited for _, waited in results.values()) < 5
+
+
+def test_wait_ends_with_the_run():
+    """Waiting for more steps than the run has returns once it completes"""
+    store = TraceStore(10, 60)
+    stored = store.start(lambda: _events(3, interval=0.01))
+    assert stored.wait_for(100, 10)
+    assert stored.complete
+    assert stored.total_steps == 3
+    assert stored.summary()['result'] == 3
+
+
+def test_wait_times_out():
+    """wait_for returns False when the steps don't come in time"""
+    store = TraceStore(10, 60)
+    gate = threading.Event()
+    stored = store.start(lambda: _events(10, gate=gate))
+    try:
+        assert not stored.wait_for(1, 0.05)
+    finally:
+        gate.set()
+    assert stored.wait_for(10, 10)
+
+
+def test_step_budget_truncates():
+    """A run stops at the tighter of its max_steps and the store's"""
+    store = TraceStore(10, 60, max_steps=20)
+    stored = store.start(lambda: _events(100), max_steps=50)
+    assert stored.wait_for(1000, 10)
+    assert stored.truncated
+    assert stored.total_steps == 20
+    assert stored.summary()['trace']['truncated']
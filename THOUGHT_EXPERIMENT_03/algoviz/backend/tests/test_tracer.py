@@ -0,0 +1,98 @@
+"""
+Tests for TraceGenerator's step stores: the columnar backend must hand over
+the same steps as the dict store, flushed or not, in less memory per step.
+"""
+
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core.tracer as tracer_module
+from core.tracer import TraceGenerator
+
+
+EVENTS = [
+    ('CALL_START', {'call_id': 0, 'depth': 0, 'parent_id': None, 'intervals': [1, 2]}),
+    ('DECISION_MADE', {'call_id': 0, 'decision': 'keep', 'will_keep': True}),
+    ('CALL_START', {'call_id': 1, 'depth': 1, 'parent_id': 0, 'intervals': [2]}),
+    ('CALL_START', {'depth': 2, 'call_id': 2 ** 70, 'parent_id': True}),  # other key order
+    ('DECISION_MADE', {'call_id': -2 ** 63, 'decision': 'covered', 'will_keep': False}),
+    ('CALL_RETURN', {'call_id': 1.5, 'result': {'nested': [None]}}),
+    ('SORT', {}),
+]
+
+
+class _Clock:
+    """Stands in for datetime: now() moves on 1.5ms per call"""
+
+    def __init__(self):
+        self.current = datetime(2024, 1, 1)
+
+    def now(self):
+        self.current += timedelta(microseconds=1500)
+        return self.current
+
+
+def _capture(columnar, events=EVENTS, flush_every=None):
+    """Capture events, flushing every flush_every steps; returns (flushed steps, trace)"""
+    tracer = TraceGenerator(columnar=columnar)
+    flushed = []
+    for number, (event_type, data) in enumerate(events, 1):
+        tracer.capture(event_type, dict(data))
+        if flush_every and number % flush_every == 0:
+            flushed += [step for _, step in tracer.flush()]
+    return flushed, tracer.get_trace()
+
+
+@pytest.mark.parametrize('flush_every', [None, 1, 3])
+def test_columnar_matches_dict_store(monkeypatch, flush_every):
+    """Same steps, timestamps included, whether flushed or read from get_trace()"""
+    results = []
+    for columnar in (False, True):
+        monkeypatch.setattr(tracer_module, 'datetime', _Clock())
+        results.append(_capture(columnar, flush_every=flush_every))
+    assert results[0] == results[1]
+    flushed, trace = results[1]
+    steps = flushed + trace['steps']
+    assert [step['step_number'] for step in steps] == list(range(len(EVENTS)))
+    assert [(step['type'], step['data']) for step in steps] == EVENTS
+    assert trace['total_steps'] == len(EVENTS)
+    assert trace['duration'] == steps[-1]['timestamp']
+
+
+def test_columnar_flush_is_lazy_and_resets():
+    """flush() builds steps as they are read, and later captures start new columns"""
+    tracer = TraceGenerator(columnar=True)
+    tracer.capture('A', {'call_id': 1})
+    events = tracer.flush()
+    tracer.capture('A', {'call_id': 2})
+    assert [step['data'] for _, step in events] == [{'call_id': 1}]
+    assert tracer.get_trace()['steps'][0]['step_number'] == 1
+    assert tracer.step_count == 2
+    assert list(tracer.flush()) and not list(tracer.flush())
+
+
+def test_columnar_store_uses_less_memory_per_step():
+    """A decision-sized step costs under half as much memory as in the dict store"""
+    count = 20000
+    events = [
+        ('DECISION_MADE', {'call_id': number, 'interval': number % 100,
+                           'decision': 'keep', 'reason': None, 'will_keep': True})
+        for number in range(count)
+    ]
+    used = {}
+    for columnar in (False, True):
+        tracemalloc.start()
+        tracer = TraceGenerator(columnar=columnar)
+        for event_type, data in events:
+            tracer.capture(event_type, dict(data))
+        used[columnar] = tracemalloc.get_traced_memory()[0] / count
+        tracemalloc.stop()
+        del tracer
+    assert used[True] < used[False] / 2
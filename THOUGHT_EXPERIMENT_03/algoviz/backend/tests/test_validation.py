@@ -0,0 +1,113 @@
+"""
+Tests for input_schema validation: records given as a list of dicts and
+as columns must be accepted, rejected and returned alike.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.validation import ValidationError, compile_schema
+
+
+SCHEMA = {
+    'type': 'intervals',
+    'fields': ['id', 'start', 'end', 'color'],
+    'required': ['start', 'end'],
+    'numeric': ['start', 'end'],
+    'ordered': ['start', 'end'],
+    'max_items': 100
+}
+
+
+def _columns(records):
+    fields = list(dict.fromkeys(field for record in records for field in record))
+    return {field: [record[field] for record in records] for field in fields}
+
+
+def _check_both(records):
+    """Validate records in both forms, returning (rows result, columns result)"""
+    validate = compile_schema(SCHEMA)
+    outcomes = []
+    for intervals in (records, _columns(records)):
+        try:
+            outcomes.append(validate({'intervals': intervals})['intervals'])
+        except ValidationError as e:
+            outcomes.append(e)
+    return outcomes
+
+
+def test_valid_records_come_back_as_rows_in_both_forms():
+    """Columns are turned into the same list of dicts as the records"""
+    records = [
+        {'id': i, 'start': i, 'end': i + 0.5 + i % 3, 'color': 'blue'}
+        for i in range(100)
+    ]
+    rows, columns = _check_both(records)
+    assert rows == records
+    assert columns == records
+
+
+@pytest.mark.parametrize('record', [
+    {'start': 1, 'end': 2, 'label': 'x'},
+    {'start': 1},
+    {'start': '1', 'end': 2},
+    {'start': True, 'end': 2},
+    {'start': 2, 'end': 2},
+    {'start': 3, 'end': 2},
+])
+def test_invalid_records_are_rejected_in_both_forms(record):
+    """A record the schema rejects is rejected as a list item and as columns"""
+    valid = {field: i for i, field in enumerate(record)}
+    rows, columns = _check_both([valid, record])
+    assert isinstance(rows, ValidationError)
+    assert isinstance(columns, ValidationError)
+
+
+def test_errors_name_the_record():
+    """List errors point at the bad record and field"""
+    validate = compile_schema(SCHEMA)
+    cases = [
+        ([{'start': 0, 'end': 1}, {'start': 1, 'end': 2, 'label': 'x'}], "intervals[1] has unknown fields: label"),
+        ([{'start': 0, 'end': 1}, {'start': 5}], "intervals[1] is missing 'end'"),
+        ([{'start': 0, 'end': 'x'}], 'intervals[0].end must be a number'),
+        ([{'start': 3, 'end': 2}], 'intervals[0].start must be less than end'),
+        ([{'start': 0, 'end': 1}, 7], 'intervals[1] must be an object'),
+    ]
+    for records, message in cases:
+        with pytest.raises(ValidationError, match=re.escape(message)):
+            validate({'intervals': records})
+
+
+def test_size_limit():
+    """More records than max_items are rejected in both forms"""
+    records = [{'start': i, 'end': i + 1} for i in range(101)]
+    rows, columns = _check_both(records)
+    assert isinstance(rows, ValidationError)
+    assert isinstance(columns, ValidationError)
+    validate = compile_schema(SCHEMA, max_items=10)
+    with pytest.raises(ValidationError, match='more than the limit of 10'):
+        validate({'intervals': records[:11]})
+
+
+def test_schema_without_fields_accepts_any_field():
+    """Without fields in the schema, extra fields pass in both forms"""
+    validate = compile_schema({'type': 'intervals'})
+    records = [{'start': 0, 'end': 1, 'label': 'a'}, {'start': 2, 'end': 3, 'label': 'b'}]
+    assert validate({'intervals': records})['intervals'] == records
+    assert validate({'intervals': _columns(records)})['intervals'] == records
+
+
+def test_bad_shapes():
+    """Non-object input, a missing key and unequal columns are rejected"""
+    validate = compile_schema(SCHEMA)
+    for input_data in ([], {}, {'intervals': 'x'},
+                       {'intervals': {'start': [1, 2], 'end': [3]}},
+                       {'intervals': {'start': [1], 'end': 3}}):
+        with pytest.raises(ValidationError):
+            validate(input_data)
@@ -0,0 +1,147 @@
+"""
+Tests for the trace worker pool: results and errors come back from the
+worker, and a job over its time or memory limit loses its worker while
+the pool keeps serving.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.worker_pool import JobTimeout, PoolBusy, WorkerFailed, WorkerPool
+
+
+# Jobs: module-level so the spawned workers can import them
+
+def add(a, b):
+    return a + b
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+def allocate(size):
+    return len(bytearray(size))
+
+
+def count(n):
+    yield from range(n)
+
+
+def count_slowly(interval):
+    i = 0
+    while True:
+        yield i
+        i += 1
+        time.sleep(interval)
+
+
+def count_forever():
+    i = 0
+    while True:
+        yield i
+        i += 1
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**options):
+        pool = WorkerPool(1, **options)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_run_returns_result_and_raises_job_errors(make_pool):
+    """A job's result and exceptions come back from the worker"""
+    pool = make_pool()
+    assert pool.run(add, 2, 3) == 5
+    with pytest.raises(ValueError, match='bad input'):
+        pool.run(fail, 'bad input')
+    assert pool.run(add, 1, 1) == 2
+    assert pool.stats()['started'] == 1
+
+
+def test_timeout_kills_and_replaces_the_worker(make_pool):
+    """A job past job_timeout gets JobTimeout and the next job a new worker"""
+    pool = make_pool(job_timeout=1)
+    started = time.monotonic()
+    with pytest.raises(JobTimeout):
+        pool.run(sleep, 30)
+    assert time.monotonic() - started < 10
+    assert pool.run(add, 1, 2) == 3
+    stats = pool.stats()
+    assert stats['timeouts'] == 1
+    assert stats['started'] == 2
+
+
+@pytest.mark.skipif(sys.platform not in ('linux', 'darwin'), reason='needs RLIMIT_AS')
+def test_memory_limit_fails_the_job(make_pool):
+    """An allocation over memory_limit gets WorkerFailed and a new worker"""
+    pool = make_pool(memory_limit=512 * 2 ** 20)
+    with pytest.raises(WorkerFailed):
+        pool.run(allocate, 1024 * 2 ** 20)
+    assert pool.run(allocate, 2 ** 20) == 2 ** 20
+    stats = pool.stats()
+    assert stats['memory_errors'] == 1
+    assert stats['started'] == 2
+
+
+def test_iterate_yields_items_in_order(make_pool):
+    """iterate() gives every item of a generator job, in order"""
+    pool = make_pool()
+    assert list(pool.iterate(count, 5000)) == list(range(5000))
+    assert list(pool.iterate(count, 0)) == []
+    assert pool.stats()['started'] == 1
+
+
+def test_closing_iterate_stops_the_job_and_keeps_the_worker(make_pool):
+    """Closing an iterate() early stops an endless job without killing its worker"""
+    pool = make_pool()
+    items = pool.iterate(count_forever)
+    assert [next(items) for _ in range(10)] == list(range(10))
+    items.close()
+    assert pool.run(add, 2, 2) == 4
+    stats = pool.stats()
+    assert stats['started'] == 1
+    assert stats['stopped'] == 0
+    assert stats['busy'] == 0
+
+
+def test_iterate_timeout(make_pool):
+    """An iterate() job past job_timeout gets JobTimeout after the items sent so far"""
+    pool = make_pool(job_timeout=2)
+    received = []
+    with pytest.raises(JobTimeout):
+        for item in pool.iterate(count_slowly, 0.1):
+            received.append(item)
+    assert received
+    assert received == list(range(len(received)))
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_busy_pool_rejects_after_queue_timeout(make_pool):
+    """With its worker held, a pool turns jobs away after queue_timeout"""
+    pool = make_pool(queue_timeout=0.1)
+    items = pool.iterate(count_forever)
+    next(items)
+    with pytest.raises(PoolBusy):
+        pool.run(add, 1, 1)
+    items.close()
+    assert pool.run(add, 1, 1) == 2
+    assert pool.stats()['rejected'] == 1
@@ -0,0 +1,187 @@
+/**
+ * Step-by-step player over a stored trace.
+ *
+ * Only the pages around the current step are downloaded: the trace is
+ * started as a handle (see api.createTraceHandle) and further steps are
+ * fetched by range as the player moves, so the first frame shows as soon
+ * as the first page is ready, whatever the trace length.
+ */
+
+import { useCallback, useEffect, useRef, useState } from 'react';
+import api from '../services/api';
+
+const DEFAULT_PAGE_SIZE = 100;
+
+// Pages kept in memory; the least recently used ones are dropped
+const MAX_CACHED_PAGES = 20;
+
+export function useTracePlayer(algorithmId, inputData, options = {}) {
+  const { pageSize = DEFAULT_PAGE_SIZE, ...traceOptions } = options;
+  const optionsKey = JSON.stringify(traceOptions);
+
+  const [handle, setHandle] = useState(null);
+  const [metadata, setMetadata] = useState(null);
+  const [totalSteps, setTotalSteps] = useState(0);
+  const [complete, setComplete] = useState(false);
+  const [result, setResult] = useState(null);
+  const [currentIndex, setCurrentIndex] = useState(0);
+  const [currentStep, setCurrentStep] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState(null);
+
+  // page number -> steps; a Map keeps insertion order for LRU eviction
+  const pages = useRef(new Map());
+  const pending = useRef(new Map());
+
+  const updateState = useCallback((data) => {
+    setTotalSteps(data.total_steps);
+    setComplete(data.complete);
+    if (data.complete) {
+      setResult(data.result ?? null);
+    }
+  }, []);
+
+  const storePage = useCallback((page, steps) => {
+    pages.current.delete(page);
+    pages.current.set(page, steps);
+    if (pages.current.size > MAX_CACHED_PAGES) {
+      pages.current.delete(pages.current.keys().next().value);
+    }
+  }, []);
+
+  const loadPage = useCallback(
+    (page) => {
+      if (pages.current.has(page)) {
+        const steps = pages.current.get(page);
+        storePage(page, steps);
+        return Promise.resolve(steps);
+      }
+      if (!pending.current.has(page)) {
+        const from = page * pageSize;
+        const request = api
+          .fetchTraceSteps(handle, from, from + pageSize)
+          .then((data) => {
+            updateState(data);
+            // A page cut short by a running trace is fetched again later
+            if (data.steps.length === pageSize || data.complete) {
+              storePage(page, data.steps);
+            }
+            return data.steps;
+          })
+          .finally(() => pending.current.delete(page));
+        pending.current.set(page, request);
+      }
+      return pending.current.get(page);
+    },
+    [handle, pageSize, storePage, updateState]
+  );
+
+  // Start the trace: handle + first page
+  useEffect(() => {
+    if (!algorithmId || !inputData) {
+      return undefined;
+    }
+    let cancelled = false;
+    pages.current = new Map();
+    pending.current = new Map();
+    setLoading(true);
+    setError(null);
+    setResult(null);
+    setCurrentIndex(0);
+
+    api
+      .createTraceHandle(algorithmId, inputData, { pageSize, ...traceOptions })
+      .then((data) => {
+        if (cancelled) return;
+        storePage(0, data.steps);
+        setHandle(data.handle);
+        setMetadata(data.metadata);
+        updateState(data);
+        setCurrentStep(data.steps[0] ?? null);
+      })
+      .catch((err) => {
+        if (!cancelled) setError(err);
+      })
+      .finally(() => {
+        if (!cancelled) setLoading(false);
+      });
+
+    return () => {
+      cancelled = true;
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [algorithmId, inputData, pageSize, optionsKey]);
+
+  // Show the current step, fetching its page (and prefetching the next)
+  useEffect(() => {
+    if (!handle) {
+      return undefined;
+    }
+    let cancelled = false;
+    const page = Math.floor(currentIndex / pageSize);
+    const offset = currentIndex % pageSize;
+
+    const cached = pages.current.get(page);
+    if (cached && offset < cached.length) {
+      setCurrentStep(cached[offset]);
+    } else {
+      setLoading(true);
+      loadPage(page)
+        .then((steps) => {
+          if (!cancelled) setCurrentStep(steps[offset] ?? null);
+        })
+        .catch((err) => {
+          if (!cancelled) setError(err);
+        })
+        .finally(() => {
+          if (!cancelled) setLoading(false);
+        });
+    }
+
+    if (offset >= pageSize / 2 && (!complete || (page + 1) * pageSize < totalSteps)) {
+      loadPage(page + 1).catch(() => {});
+    }
+
+    return () => {
+      cancelled = true;
+    };
+  }, [handle, currentIndex, pageSize, complete, totalSteps, loadPage]);
+
+  // While the trace is still running, total_steps only grows
+  const lastIndex = complete ? totalSteps - 1 : Number.POSITIVE_INFINITY;
+
+  const seek = useCallback(
+    (index) => setCurrentIndex(Math.max(0, Math.min(index, lastIndex))),
+    [lastIndex]
+  );
+  const next = useCallback(() => seek(currentIndex + 1), [seek, currentIndex]);
+  const previous = useCallback(() => seek(currentIndex - 1), [seek, currentIndex]);
+
+  const refresh = useCallback(async () => {
+    if (!handle) return;
+    try {
+      const data = await api.fetchTraceInfo(handle);
+      updateState(data);
+    } catch (err) {
+      setError(err);
+    }
+  }, [handle, updateState]);
+
+  return {
+    handle,
+    metadata,
+    totalSteps,
+    complete,
+    result,
+    currentIndex,
+    currentStep,
+    loading,
+    error,
+    seek,
+    next,
+    previous,
+    refresh,
+  };
+}
+
+export default useTracePlayer;
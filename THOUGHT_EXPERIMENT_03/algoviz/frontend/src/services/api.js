@@ -3,6 +3,8 @@
  * Centralized HTTP client with error handling.
  */
 
+import { decodeTrace, TRACE_MIMETYPE } from '../utils/traceDecoder';
+
 const API_BASE = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
 
 class APIError extends Error {
@@ -43,6 +45,36 @@ async function fetchJSON(url, options = {}) {
   }
 }
 
+async function fetchTrace(url, options) {
+  let response;
+  try {
+    response = await fetch(url, {
+      ...options,
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: `${TRACE_MIMETYPE}, application/json;q=0.5`,
+      },
+    });
+  } catch (error) {
+    throw new APIError('Network error: ' + error.message, 0);
+  }
+
+  if (response.headers.get('Content-Type') === TRACE_MIMETYPE) {
+    return decodeTrace(await response.arrayBuffer());
+  }
+
+  // Errors are always JSON
+  const data = await response.json();
+  if (!response.ok) {
+    throw new APIError(
+      data.error || 'Request failed',
+      response.status,
+      data.details
+    );
+  }
+  return data;
+}
+
 export const api = {
   /**
    * Fetch all available algorithms
@@ -85,19 +117,136 @@ export const api = {
   },
 
   /**
-   * Generate trace for algorithm with input data
+   * Get the message templates for an algorithm's step texts.
+   * Fetch once and render traces requested with { messages: 'templates' }.
    */
-  async generateTrace(algorithmId, inputData) {
-    const data = await fetchJSON(`${API_BASE}/algorithm/${algorithmId}/trace`, {
+  async fetchMessages(algorithmId) {
+    const data = await fetchJSON(`${API_BASE}/algorithm/${algorithmId}/messages`);
+    return data.messages;
+  },
+
+  /**
+   * Generate trace for algorithm with input data.
+   * Pass { format: 'normalized' } to get the compact normalized trace,
+   * { messages: 'templates' } to get step texts as template arguments,
+   * { level: 'summary' | 'decisions' } to capture fewer event types
+   * (fine-tune with comma-separated include / exclude event types),
+   * { max_steps: n } to stop the run after n steps (the trace then has
+   * truncated: true and there is no result),
+   * { binary: true } to transfer the trace in the binary encoding
+   * (decoded here, same result as JSON).
+   * Over the server's budgets the trace may come at a lower level (see
+   * trace.metadata.level) or the request fail with status 413. When the
+   * server is busy it fails with 503, and runs past the server's time
+   * limit with 504.
+   */
+  async generateTrace(algorithmId, inputData, options = {}) {
+    const { binary, ...params } = options;
+    const query = new URLSearchParams(params).toString();
+    const url = `${API_BASE}/algorithm/${algorithmId}/trace${query ? `?${query}` : ''}`;
+    const request = {
+      method: 'POST',
+      body: JSON.stringify(inputData),
+    };
+    const data = binary
+      ? await fetchTrace(url, request)
+      : await fetchJSON(url, request);
+    return {
+      trace: data.trace,
+      result: data.result,
+    };
+  },
+
+  /**
+   * Estimate the cost of generateTrace(algorithmId, inputData, options)
+   * without running it: steps, bytes and ms per capture level, and
+   * whether the server would run, downgrade or reject the request.
+   */
+  async estimateTrace(algorithmId, inputData, options = {}) {
+    const { binary, ...params } = options;
+    const query = new URLSearchParams(params).toString();
+    return fetchJSON(`${API_BASE}/algorithm/${algorithmId}/estimate${query ? `?${query}` : ''}`, {
       method: 'POST',
       body: JSON.stringify(inputData),
     });
+  },
+
+  /**
+   * Start a stored trace and get its handle with the first page of steps.
+   * Accepts the generateTrace options except binary. The response has
+   * handle, metadata, steps, total_steps (steps stored so far) and
+   * complete; once complete also trace (without steps) and result.
+   */
+  async createTraceHandle(algorithmId, inputData, { pageSize = 100, ...options } = {}) {
+    const query = new URLSearchParams({ ...options, page_size: pageSize }).toString();
+    return fetchJSON(`${API_BASE}/algorithm/${algorithmId}/trace?${query}`, {
+      method: 'POST',
+      body: JSON.stringify(inputData),
+    });
+  },
+
+  /**
+   * Get steps [from, to) of a stored trace. The range is cut short at the
+   * end of the trace; the response's to says where it stops.
+   */
+  async fetchTraceSteps(handle, from, to) {
+    return fetchJSON(`${API_BASE}/trace/${handle}/steps?from=${from}&to=${to}`);
+  },
+
+  /**
+   * Get the state of a stored trace (total_steps, complete, trace, result)
+   */
+  async fetchTraceInfo(handle) {
+    return fetchJSON(`${API_BASE}/trace/${handle}`);
+  },
+
+  /**
+   * Queue a trace as a background job. Accepts the generateTrace options;
+   * binary picks the encoding of the result. Returns the job: id, state,
+   * steps, estimated_steps and, while queued, queue_position.
+   */
+  async submitTraceJob(algorithmId, inputData, options = {}) {
+    const { binary, ...params } = options;
+    const query = new URLSearchParams(params).toString();
+    const data = await fetchJSON(`${API_BASE}/algorithm/${algorithmId}/jobs${query ? `?${query}` : ''}`, {
+      method: 'POST',
+      body: JSON.stringify(inputData),
+      headers: binary ? { Accept: TRACE_MIMETYPE } : {},
+    });
+    return data.job;
+  },
+
+  /**
+   * Get the progress of a job (state, steps so far, estimated_steps).
+   * With wait (seconds) the server holds the request until the state or
+   * step count changes, for long polling.
+   */
+  async fetchJob(jobId, wait = 0) {
+    const query = wait ? `?wait=${wait}` : '';
+    const data = await fetchJSON(`${API_BASE}/jobs/${jobId}${query}`);
+    return data.job;
+  },
+
+  /**
+   * Get the trace and result of a finished job. Fails with status 409
+   * while the job is queued or running.
+   */
+  async fetchJobResult(jobId) {
+    const data = await fetchTrace(`${API_BASE}/jobs/${jobId}/result`, {});
     return {
       trace: data.trace,
       result: data.result,
     };
   },
 
+  /**
+   * Cancel a queued or running job
+   */
+  async cancelJob(jobId) {
+    const data = await fetchJSON(`${API_BASE}/jobs/${jobId}`, { method: 'DELETE' });
+    return data.job;
+  },
+
   /**
    * Health check
    */
@@ -0,0 +1,148 @@
+/**
+ * Decoder for the binary trace encoding (application/x-algoviz-trace).
+ *
+ * Reference implementation of the format documented in
+ * backend/core/serialization.py; decodes to the same object as the JSON
+ * response. Integers are decoded as Numbers, exact up to 2^53.
+ */
+
+export const TRACE_MIMETYPE = 'application/x-algoviz-trace';
+
+const MAGIC = [0x41, 0x56, 0x54, 0x01]; // "AVT\x01"
+
+const TOP_LEVEL_STEPS = 1;
+const TRACE_STEPS = 2;
+
+const NULL = 0;
+const FALSE = 1;
+const TRUE = 2;
+const INT = 3;
+const FLOAT = 4;
+const STRING = 5;
+const LIST = 6;
+const DICT = 7;
+const DICT_SHAPE = 8;
+const INT_LIST = 9;
+
+const utf8 = new TextDecoder();
+
+/**
+ * Decode an encoded trace response.
+ *
+ * @param {ArrayBuffer} buffer - Response body
+ * @returns {Object} The decoded payload, e.g. { success, trace, result }
+ */
+export function decodeTrace(buffer) {
+  const bytes = new Uint8Array(buffer);
+  if (MAGIC.some((byte, i) => bytes[i] !== byte)) {
+    throw new Error('Not an encoded trace');
+  }
+
+  const view = new DataView(buffer);
+  const strings = [];
+  const shapes = [];
+  let position = MAGIC.length;
+
+  const varint = () => {
+    let result = 0;
+    let scale = 1;
+    let byte;
+    do {
+      byte = bytes[position++];
+      result += (byte & 0x7f) * scale;
+      scale *= 128;
+    } while (byte & 0x80);
+    return result;
+  };
+
+  const zigzag = () => {
+    const n = varint();
+    return n % 2 ? -(n + 1) / 2 : n / 2;
+  };
+
+  const string = () => {
+    const n = varint();
+    if (n % 2) {
+      return strings[(n - 1) / 2];
+    }
+    const end = position + n / 2;
+    const s = utf8.decode(bytes.subarray(position, end));
+    position = end;
+    strings.push(s);
+    return s;
+  };
+
+  const value = () => {
+    const tag = bytes[position++];
+    switch (tag) {
+      case NULL:
+        return null;
+      case FALSE:
+        return false;
+      case TRUE:
+        return true;
+      case INT:
+        return zigzag();
+      case FLOAT: {
+        const float = view.getFloat64(position, true);
+        position += 8;
+        return float;
+      }
+      case STRING:
+        return string();
+      case LIST:
+      case INT_LIST: {
+        const count = varint();
+        const list = new Array(count);
+        for (let i = 0; i < count; i++) {
+          list[i] = tag === LIST ? value() : zigzag();
+        }
+        return list;
+      }
+      case DICT:
+      case DICT_SHAPE: {
+        let keys;
+        if (tag === DICT) {
+          const count = varint();
+          keys = [];
+          for (let i = 0; i < count; i++) {
+            keys.push(string());
+          }
+          shapes.push(keys);
+        } else {
+          keys = shapes[varint()];
+        }
+        const dict = {};
+        for (const key of keys) {
+          dict[key] = value();
+        }
+        return dict;
+      }
+      default:
+        throw new Error(`Unknown value tag ${tag} at byte ${position - 1}`);
+    }
+  };
+
+  const location = bytes[position++];
+  const stepCount = varint();
+  const steps = new Array(stepCount);
+  let timestamp = 0;
+  for (let i = 0; i < stepCount; i++) {
+    const type = string();
+    timestamp += zigzag();
+    steps[i] = {
+      step_number: i,
+      timestamp: timestamp / 1e6,
+      type,
+      data: value(),
+    };
+  }
+
+  const payload = value();
+  if (location === TRACE_STEPS) {
+    payload.trace.steps = steps;
+  } else if (location === TOP_LEVEL_STEPS) {
+    payload.steps = steps;
+  }
+  return payload;
+}
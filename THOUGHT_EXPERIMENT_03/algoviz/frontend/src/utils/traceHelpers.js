@@ -0,0 +1,23 @@
+/**
+ * Helpers for reading traces returned by the backend.
+ */
+
+/**
+ * Render a step text field.
+ *
+ * Traces requested with { messages: 'templates' } carry step texts as the
+ * argument lists of message templates (see api.fetchMessages). Templates
+ * are keyed '<EVENT_TYPE>.<field>' and use positional {0}, {1}, ...
+ * placeholders. Already rendered text is returned unchanged.
+ */
+export function renderMessage(messages, step, field) {
+  const value = step.data[field];
+  if (!Array.isArray(value)) {
+    return value;
+  }
+  const template = messages[`${step.type}.${field}`];
+  return template.replace(/\{(\d+)\}/g, (match, index) => {
+    const arg = value[Number(index)];
+    return arg === null ? 'None' : String(arg);
+  });
+}
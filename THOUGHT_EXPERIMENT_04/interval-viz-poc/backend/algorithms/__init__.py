@@ -7,9 +7,15 @@ Each algorithm module exports:
 - A Tracer class that generates complete execution traces
 """
 
-from .interval_coverage import Interval, IntervalCoverageTracer
+from .interval_coverage import Interval, IntervalCoverageTracer, reconstruct_step
+from .interval_store import IntervalStore
+from .messages import MESSAGES, render_message
 
 __all__ = [
     'Interval',
     'IntervalCoverageTracer',
+    'IntervalStore',
+    'MESSAGES',
+    'render_message',
+    'reconstruct_step',
 ]
\ No newline at end of file
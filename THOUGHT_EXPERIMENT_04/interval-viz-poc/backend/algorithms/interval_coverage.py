@@ -5,12 +5,60 @@ Remove Covered Intervals Algorithm with Complete Trace Generation.
 This module generates a complete execution trace of the interval coverage
 algorithm, allowing the frontend to visualize every step without any
 algorithmic logic on its side.
+
+Traces can optionally be keyframe + delta encoded: every K-th step carries
+the full visual state, the steps in between only carry what changed.
+Use `reconstruct_step` to rebuild the full state of any step.
+
+Steps can also be consumed as they are produced with `iter_steps`, so a
+trace can be streamed without ever holding all of it in memory.
+
+Traces can also be normalized: the intervals are listed once in an
+interval table at the top of the trace and steps refer to them by id,
+with sub-lists of the sorted intervals given as [start, stop) ranges
+into `sorted_order`. Call return values are [start, stop) ranges into the
+kept intervals, in the order they were kept (the final `result`); every
+kept interval is known by then, from its MAX_END_UPDATE step.
+
+Steps share structure: a call stack frame that hasn't changed is the same
+dict in every step that shows it, and so are serialized intervals and
+visual_state dicts. Treat emitted steps as read-only.
+
+Step text (descriptions, comparisons, reasons) comes from the templates in
+`messages`. With render_messages=False the text is left unrendered: each
+text field carries just its template arguments, for clients that render
+it themselves or never show it.
 """
 
-from typing import List
-from dataclasses import dataclass, asdict
+from typing import Iterator, List, Optional, Union
+from dataclasses import dataclass, fields
+from array import array
 import time
 
+from .interval_store import IntervalStore
+from .messages import MESSAGES
+
+
+# Visual state flags, packed one byte per interval
+IS_EXAMINING = 1
+IS_COVERED = 2
+IS_KEPT = 4
+IN_CURRENT_SUBSET = 8
+DEFAULT_FLAGS = IN_CURRENT_SUBSET
+
+VISUAL_STATE_FLAGS = {
+    'is_examining': IS_EXAMINING,
+    'is_covered': IS_COVERED,
+    'is_kept': IS_KEPT,
+    'in_current_subset': IN_CURRENT_SUBSET,
+}
+
+# visual_state dict for every flag combination, shared by all steps
+VISUAL_STATES = [
+    {name: bool(flags & flag) for name, flag in VISUAL_STATE_FLAGS.items()}
+    for flags in range(16)
+]
+
 
 @dataclass
 class Interval:
@@ -28,7 +76,10 @@ class TraceStep:
     type: str
     timestamp: float
     data: dict
-    description: str
+    description: Union[str, list]  # Text, or its unrendered template arguments
+
+
+STEP_FIELDS = fields(TraceStep)
 
 
 class IntervalCoverageTracer:
@@ -39,23 +90,82 @@ class IntervalCoverageTracer:
     Every decision, comparison, and state change is recorded.
     """
     
-    def __init__(self):
-        self.trace = []
+    def __init__(self, keyframe_interval: Optional[int] = None,
+                 normalized: bool = False, render_messages: bool = True):
+        """
+        Args:
+            keyframe_interval: If set, emit a full keyframe every K steps and
+                only changed interval states / stack frames in between.
+                None (default) embeds the full state in every step.
+            normalized: If True, emit the intervals once in an interval table
+                and reference them by id in every step.
+            render_messages: If False, leave step text unrendered as
+                template argument lists (see messages.MESSAGES).
+        """
+        if keyframe_interval is not None and keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be a positive integer")
+        self.keyframe_interval = keyframe_interval
+        self.normalized = normalized
+        self.render_messages = render_messages
+        self.trace = []  # Steps recorded but not yet handed out
+        self.trace_info = {}  # Trace-level fields, known before the first step
+        self.summary = None  # Result, trace totals and metadata once complete
         self.step_count = 0
         self.start_time = time.time()
         self.call_stack = []
         self.next_call_id = 0
-        self.original_intervals = []  # Keep reference to ALL intervals
-        self.interval_states = {}  # Track visual state of each interval
+        self.kept = []  # Rows kept so far, in order
+        self.store = IntervalStore.from_columns([], [], [])  # ALL intervals, by row
+        self._interval_dicts = []  # row -> serialized interval, built on first use
+        self._call_stack_state = None  # Last call_stack_state, until the stack changes
+        
+        # Visual state of each interval, one flag byte per slot. A slot's
+        # flags are only valid while its epoch matches the current epoch;
+        # otherwise the interval is in the default state. Bumping the epoch
+        # resets every interval in O(1). Rows sharing an id share a slot.
+        self._row_slots = array('l')  # row -> slot
+        self._slot_rows = array('l')  # slot -> first row with that id
+        self._flags = bytearray()
+        self._flag_epochs = array('L')
+        self._epoch = 1
+        
+        # Delta mode bookkeeping
+        self._emitted_flags = bytearray()  # Flags as of the last emitted step
+        self._touched_slots = set()  # Slots updated since the last step
+        self._nondefault_slots = set()  # Slots emitted in a non-default state
+        self._reset_pending = False  # Epoch bumped since the last step
+        self._stack_changed_from = 0  # Lowest stack index changed since the last step
         
     def _add_step(self, step_type: str, data: dict, description: str):
         """Record a step in the algorithm execution with complete visual state."""
-        # Enrich data with full visual state for ALL intervals
-        enriched_data = {
-            **data,
-            'all_intervals': self._get_all_intervals_with_state(),
-            'call_stack_state': self._get_call_stack_state()
-        }
+        if self.keyframe_interval is None:
+            # Enrich data with full visual state for ALL intervals
+            enriched_data = {
+                **data,
+                'all_intervals': self._get_all_intervals_with_state(),
+                'call_stack_state': self._get_call_stack_state()
+            }
+        elif self.step_count % self.keyframe_interval == 0:
+            enriched_data = {
+                **data,
+                'keyframe': True,
+                'all_intervals': self._get_all_intervals_with_state(),
+                'call_stack_state': self._get_call_stack_state()
+            }
+            self._mark_all_emitted()
+        else:
+            # Only the frames from the lowest changed one upwards
+            call_stack_base = self._stack_changed_from
+            enriched_data = {
+                **data,
+                'keyframe': False,
+                'interval_changes': self._get_interval_changes(),
+                'call_stack_base': call_stack_base,
+                'call_stack_frames': [
+                    self._get_frame(call) for call in self.call_stack[call_stack_base:]
+                ]
+            }
+        self._stack_changed_from = len(self.call_stack)
         
         self.trace.append(TraceStep(
             step=self.step_count,
@@ -66,6 +176,12 @@ class IntervalCoverageTracer:
         ))
         self.step_count += 1
     
+    def _message(self, template_id, *args):
+        """Render a message template, or keep its arguments if rendering is off."""
+        if self.render_messages:
+            return MESSAGES[template_id].format(*args)
+        return list(args)
+    
     def _serialize_value(self, value):
         """Convert Python values to JSON-safe values."""
         if value == float('-inf'):
@@ -74,64 +190,174 @@ class IntervalCoverageTracer:
             return None
         return value
     
+    def _interval_ref(self, row):
+        """Serialize an interval, or reference it by id when normalized."""
+        if self.normalized:
+            return self.store.ids[row]
+        interval = self._interval_dicts[row]
+        if interval is None:
+            interval = self._interval_dicts[row] = self.store.to_dict(row)
+        return interval
+    
+    def _interval_refs(self, rows):
+        """Serialize a list of intervals, or reference them by id when normalized."""
+        if self.normalized:
+            ids = self.store.ids
+            return [ids[row] for row in rows]
+        return [self._interval_ref(row) for row in rows]
+    
+    def _get_flags(self, slot):
+        """Get the visual state flags of a slot, honouring resets."""
+        if self._flag_epochs[slot] == self._epoch:
+            return self._flags[slot]
+        return DEFAULT_FLAGS
+    
     def _get_all_intervals_with_state(self):
         """Get all original intervals with their current visual state."""
+        row_slots = self._row_slots
+        if self.normalized:
+            ids = self.store.ids
+            return [
+                {
+                    'id': ids[row],
+                    'visual_state': VISUAL_STATES[self._get_flags(row_slots[row])]
+                }
+                for row in range(len(self.store))
+            ]
+        to_dict = self.store.to_dict
         return [
             {
-                **asdict(interval),
-                'visual_state': self.interval_states.get(interval.id, {
-                    'is_examining': False,
-                    'is_covered': False,
-                    'is_kept': False,
-                    'in_current_subset': True
-                })
+                **to_dict(row),
+                'visual_state': VISUAL_STATES[self._get_flags(row_slots[row])]
             }
-            for interval in self.original_intervals
+            for row in range(len(self.store))
         ]
     
+    def _mark_all_emitted(self):
+        """Record the current state of every slot as emitted (keyframe)."""
+        self._emitted_flags = bytearray(
+            self._get_flags(slot) for slot in range(len(self._flags))
+        )
+        self._nondefault_slots = {
+            slot for slot, flags in enumerate(self._emitted_flags)
+            if flags != DEFAULT_FLAGS
+        }
+        self._touched_slots = set()
+        self._reset_pending = False
+    
+    def _get_interval_changes(self):
+        """Get visual states that changed since the previously emitted step."""
+        candidates = self._touched_slots
+        if self._reset_pending:
+            candidates = candidates | self._nondefault_slots
+        
+        changes = []
+        for slot in sorted(candidates):
+            flags = self._get_flags(slot)
+            if flags == self._emitted_flags[slot]:
+                continue
+            self._emitted_flags[slot] = flags
+            if flags == DEFAULT_FLAGS:
+                self._nondefault_slots.discard(slot)
+            else:
+                self._nondefault_slots.add(slot)
+            changes.append({
+                'id': self.store.ids[self._slot_rows[slot]],
+                'visual_state': VISUAL_STATES[flags]
+            })
+        
+        self._touched_slots = set()
+        self._reset_pending = False
+        return changes
+    
     def _get_call_stack_state(self):
-        """Get complete call stack state for visualization."""
-        return [
-            {
+        """
+        Get complete call stack state for visualization.
+        
+        Frames are serialized once and reused until their call changes, and
+        the whole list is reused until the stack changes.
+        """
+        if self._call_stack_state is None:
+            self._call_stack_state = [
+                self._get_frame(call) for call in self.call_stack
+            ]
+        return self._call_stack_state
+    
+    def _get_frame(self, call):
+        """Get the serialized frame of a call, building it on first use."""
+        frame = call['frame']
+        if frame is None:
+            frame = call['frame'] = {
                 'call_id': call['id'],
                 'depth': call['depth'],
-                'current_interval': asdict(call['current']) if call.get('current') else None,
+                'current_interval': self._interval_ref(call['current']),
                 'max_end': self._serialize_value(call['max_end']),
-                'remaining_count': len(call['remaining']),
+                'remaining_count': call['remaining_count'],
                 'status': call['status'],
-                'decision': call.get('decision'),
-                'return_value': [asdict(i) for i in call.get('return_value', [])]
+                'decision': call['decision'],
+                'return_value': self._get_return_value(call)
             }
-            for call in self.call_stack
-        ]
+        return frame
+    
+    def _get_return_value(self, call):
+        """Serialize a call's return value, or give its range of self.kept when normalized."""
+        start, stop = call['return_value']
+        if self.normalized:
+            return [start, stop]
+        return self._interval_refs(self.kept[start:stop])
+    
+    def _push_call(self, call):
+        """Push a call onto the simulated call stack."""
+        self._stack_changed_from = min(self._stack_changed_from, len(self.call_stack))
+        self.call_stack.append(call)
+        self._call_stack_state = None
+    
+    def _pop_call(self):
+        """Pop the innermost call off the simulated call stack."""
+        call = self.call_stack.pop()
+        self._stack_changed_from = min(self._stack_changed_from, len(self.call_stack))
+        self._call_stack_state = None
+        return call
+    
+    def _update_call(self, call, **changes):
+        """Update a call on the stack, dropping its serialized frame."""
+        call.update(changes)
+        call['frame'] = None
+        self._stack_changed_from = min(self._stack_changed_from, call['depth'])
+        self._call_stack_state = None
     
     def _reset_all_visual_states(self):
-        """Reset all interval visual states."""
-        for interval_id in self.interval_states:
-            self.interval_states[interval_id] = {
-                'is_examining': False,
-                'is_covered': False,
-                'is_kept': False,
-                'in_current_subset': True
-            }
+        """Reset all interval visual states (O(1): starts a new epoch)."""
+        self._epoch += 1
+        self._reset_pending = True
     
-    def _set_visual_state(self, interval_id, **kwargs):
+    def _set_visual_state(self, row, **kwargs):
         """Update visual state for a specific interval."""
-        if interval_id not in self.interval_states:
-            self.interval_states[interval_id] = {
-                'is_examining': False,
-                'is_covered': False,
-                'is_kept': False,
-                'in_current_subset': True
-            }
-        self.interval_states[interval_id].update(kwargs)
+        slot = self._row_slots[row]
+        flags = self._get_flags(slot)
+        for name, value in kwargs.items():
+            if value:
+                flags |= VISUAL_STATE_FLAGS[name]
+            else:
+                flags &= ~VISUAL_STATE_FLAGS[name]
+        self._flags[slot] = flags
+        self._flag_epochs[slot] = self._epoch
+        self._touched_slots.add(slot)
+    
+    def _drain_steps(self) -> Iterator[dict]:
+        """Hand out the steps recorded since the last drain."""
+        steps = self.trace
+        self.trace = []
+        for step in steps:
+            # Shallow on purpose: asdict would deep-copy every shared frame
+            yield {field.name: getattr(step, field.name) for field in STEP_FIELDS}
     
-    def remove_covered_intervals(self, intervals: List[Interval]) -> dict:
+    def remove_covered_intervals(self, intervals: Union[List[Interval], IntervalStore]) -> dict:
         """
         Main algorithm with complete trace generation.
         
         Args:
-            intervals: List of Interval objects to process
+            intervals: List of Interval objects, or an IntervalStore, to process
             
         Returns:
             dict containing:
@@ -139,219 +365,366 @@ class IntervalCoverageTracer:
                 - trace: Complete execution trace with all steps
                 - metadata: Algorithm metadata
         """
+        steps = list(self.iter_steps(intervals))
+        return {
+            "result": self.summary["result"],
+            "trace": {
+                **self.trace_info,
+                "steps": steps,
+                **self.summary["trace"]
+            },
+            "metadata": self.summary["metadata"]
+        }
+    
+    def iter_steps(self, intervals: Union[List[Interval], IntervalStore]) -> Iterator[dict]:
+        """
+        Run the algorithm, yielding each trace step as soon as it is recorded.
+        
+        Steps are not kept once yielded, so memory stays flat however long
+        the trace is. self.trace_info is filled in before the first step is
+        yielded; self.summary holds the result, trace totals and metadata
+        once the generator is exhausted.
+        
+        Args:
+            intervals: List of Interval objects, or an IntervalStore, to process
+            
+        Yields:
+            Trace steps, in the same shape as trace["steps"] entries
+        """
         # Store original intervals
-        self.original_intervals = intervals
+        if not isinstance(intervals, IntervalStore):
+            intervals = IntervalStore.from_intervals(intervals)
+        self.store = store = intervals
+        count = len(store)
+        self._interval_dicts = [None] * count
         
-        # Initialize visual states
-        for interval in intervals:
-            self.interval_states[interval.id] = {
-                'is_examining': False,
-                'is_covered': False,
-                'is_kept': False,
-                'in_current_subset': True
-            }
+        # Initialize visual states: one slot per distinct interval id
+        slots = {}
+        self._row_slots = array('l', [
+            slots.setdefault(interval_id, len(slots)) for interval_id in store.ids
+        ])
+        self._slot_rows = array('l', bytes(self._slot_rows.itemsize * len(slots)))
+        for row in range(count - 1, -1, -1):
+            self._slot_rows[self._row_slots[row]] = row
+        self._flags = bytearray(len(slots))
+        self._flag_epochs = array('L', bytes(self._flag_epochs.itemsize * len(slots)))
+        self._emitted_flags = bytearray([DEFAULT_FLAGS]) * len(slots)
+        
+        # Sort up front so the whole trace header is known before streaming
+        starts, ends = store.starts, store.ends
+        sorted_rows = sorted(range(count), key=lambda row: (starts[row], -ends[row]))
+        
+        self.trace_info = {}
+        if self.normalized:
+            self.trace_info.update(self._get_interval_table(store))
+            self.trace_info["sorted_order"] = [store.ids[row] for row in sorted_rows]
+        self.trace_info.update({
+            "format": "normalized" if self.normalized else "full",
+            "encoding": "full" if self.keyframe_interval is None else "delta",
+            "keyframe_interval": self.keyframe_interval,
+            "messages": "rendered" if self.render_messages else "templates"
+        })
         
         # Step 0: Initial state
         self._add_step(
             "INITIAL_STATE",
             {
-                "intervals": [asdict(i) for i in intervals],
-                "count": len(intervals)
+                "intervals": self._interval_refs(range(count)),
+                "count": count
             },
-            "Original unsorted intervals"
+            self._message("INITIAL_STATE")
         )
         
         # Step 1: Sort
         self._add_step(
             "SORT_BEGIN",
             {"description": "Sorting by (start ↑, end ↓)"},
-            "Preparing to sort intervals"
+            self._message("SORT_BEGIN")
         )
         
-        sorted_intervals = sorted(intervals, key=lambda x: (x.start, -x.end))
-        
         self._add_step(
             "SORT_COMPLETE",
-            {"intervals": [asdict(i) for i in sorted_intervals]},
-            "Intervals sorted - ready for recursion"
+            {
+                "intervals": (
+                    [0, count] if self.normalized
+                    else self._interval_refs(sorted_rows)
+                )
+            },
+            self._message("SORT_COMPLETE")
         )
         
+        yield from self._drain_steps()
+        
         # Step 2: Recursive filtering
-        result = self._filter_recursive(sorted_intervals, float('-inf'))
+        result = yield from self._filter_covered(sorted_rows, float('-inf'))
         
         # Mark all kept intervals
-        for interval in result:
-            self._set_visual_state(interval.id, is_kept=True)
+        for row in result:
+            self._set_visual_state(row, is_kept=True)
         
         # Final step
         self._add_step(
             "ALGORITHM_COMPLETE",
             {
-                "result": [asdict(i) for i in result],
+                "result": self._interval_refs(result),
                 "kept_count": len(result),
-                "removed_count": len(intervals) - len(result)
+                "removed_count": count - len(result)
             },
-            f"Algorithm complete: kept {len(result)}/{len(intervals)} intervals"
+            self._message("ALGORITHM_COMPLETE", len(result), count)
         )
         
-        return {
-            "result": [asdict(i) for i in result],
+        yield from self._drain_steps()
+        
+        self.summary = {
+            "result": [store.to_dict(row) for row in result],
             "trace": {
-                "steps": [asdict(s) for s in self.trace],
-                "total_steps": len(self.trace),
+                "total_steps": self.step_count,
                 "duration": time.time() - self.start_time
             },
             "metadata": {
                 "algorithm": "remove-covered-intervals",
-                "input_size": len(intervals),
+                "input_size": count,
                 "output_size": len(result)
             }
         }
     
-    def _filter_recursive(self, intervals: List[Interval], max_end: float) -> List[Interval]:
+    @staticmethod
+    def _get_interval_table(store: IntervalStore) -> dict:
+        """Build the interval table and color palette of a normalized trace."""
+        table = [
+            {
+                "id": interval_id,
+                "start": start,
+                "end": end,
+                "color_index": color_index
+            }
+            for interval_id, start, end, color_index
+            in zip(store.ids, store.starts, store.ends, store.color_indexes)
+        ]
+        return {"interval_table": table, "palette": list(store.palette)}
+    
+    def _filter_covered(self, rows: List[int], max_end: float) -> Iterator[dict]:
         """
         Recursive filtering with complete trace generation.
         
-        Every recursive call, comparison, and decision is traced.
+        Every recursive call, comparison, and decision is traced. The
+        recursion runs on an explicit stack (self.call_stack) instead of
+        Python frames, so input size is not bounded by the interpreter's
+        recursion limit. Steps come out in the same order as the recursive
+        formulation: the calls descend one interval at a time, hit the base
+        case, then return innermost first.
+        
+        Intervals are handled as rows of self.store, in sorted order. Yields
+        the steps as they are recorded and returns the kept rows.
         """
-        # Base case
-        if not intervals:
+        starts, ends = self.store.starts, self.store.ends
+        self.kept = kept = []
+        
+        # Descend: one simulated call per interval
+        for position, current in enumerate(rows):
+            current_start, current_end = starts[current], ends[current]
             call_id = self.next_call_id
             self.next_call_id += 1
+            depth = len(self.call_stack)
+            
+            # Add to call stack
+            call_info = {
+                'id': call_id,
+                'depth': depth,
+                'current': current,
+                'remaining_count': len(rows) - position - 1,
+                'max_end': max_end,
+                'status': 'examining',
+                'decision': None,
+                'return_value': (len(kept), len(kept)),  # [start, stop) of kept
+                'frame': None  # Serialized frame, see _get_frame
+            }
+            self._push_call(call_info)
+            
+            # Mark current interval as examining. The reset leaves every
+            # interval, and so all remaining ones, in the current subset.
+            self._reset_all_visual_states()
+            self._set_visual_state(current, is_examining=True, in_current_subset=True)
             
+            # Trace: Call start
             self._add_step(
-                "BASE_CASE",
+                "CALL_START",
                 {
                     "call_id": call_id,
+                    "depth": depth,
+                    "examining": self._interval_ref(current),
                     "max_end": self._serialize_value(max_end),
-                    "description": "No intervals remaining - return empty list"
+                    "remaining_count": call_info['remaining_count'],
+                    "intervals": (
+                        [position, len(rows)] if self.normalized
+                        else self._interval_refs(rows[position:])
+                    )
                 },
-                "Base case reached"
+                self._message("CALL_START", call_id, current_start, current_end)
             )
-            return []
+            
+            # Trace: Examining interval
+            self._add_step(
+                "EXAMINING_INTERVAL",
+                {
+                    "call_id": call_id,
+                    "interval": self._interval_ref(current),
+                    "max_end": self._serialize_value(max_end),
+                    "comparison": self._message(
+                        "EXAMINING_INTERVAL.comparison",
+                        current_end, self._serialize_value(max_end)
+                    )
+                },
+                self._message("EXAMINING_INTERVAL", current_end)
+            )
+            
+            # Make decision: Keep or covered?
+            is_covered = current_end <= max_end
+            decision = "covered" if is_covered else "keep"
+            
+            # Update call info
+            self._update_call(call_info, status='decided', decision=decision)
+            
+            # Update visual state based on decision
+            if is_covered:
+                self._set_visual_state(current, is_covered=True, is_examining=False)
+            else:
+                self._set_visual_state(current, is_examining=False)
+            
+            # Trace: Decision made
+            self._add_step(
+                "DECISION_MADE",
+                {
+                    "call_id": call_id,
+                    "interval": self._interval_ref(current),
+                    "decision": decision,
+                    "reason": self._message(
+                        "DECISION_MADE.reason",
+                        current_end, '<=' if is_covered else '>',
+                        self._serialize_value(max_end)
+                    ),
+                    "will_keep": not is_covered
+                },
+                self._message("DECISION_MADE", decision.upper())
+            )
+            
+            if not is_covered:
+                # Keep this interval - update max_end for the next call
+                new_max_end = max(max_end, current_end)
+                
+                self._add_step(
+                    "MAX_END_UPDATE",
+                    {
+                        "call_id": call_id,
+                        "interval": self._interval_ref(current),
+                        "old_max_end": self._serialize_value(max_end),
+                        "new_max_end": new_max_end
+                    },
+                    self._message(
+                        "MAX_END_UPDATE",
+                        max_end if max_end != float('-inf') else '-∞',
+                        new_max_end
+                    )
+                )
+                
+                kept.append(current)
+                max_end = new_max_end
+            
+            yield from self._drain_steps()
         
-        # Start new recursive call
+        # Base case
         call_id = self.next_call_id
         self.next_call_id += 1
-        depth = len(self.call_stack)
-        
-        current = intervals[0]
-        remaining = intervals[1:]
-        
-        # Add to call stack
-        call_info = {
-            'id': call_id,
-            'depth': depth,
-            'current': current,
-            'remaining': remaining,
-            'max_end': max_end,
-            'status': 'examining',
-            'decision': None,
-            'return_value': []
-        }
-        self.call_stack.append(call_info)
-        
-        # Mark current interval as examining
-        self._reset_all_visual_states()
-        self._set_visual_state(current.id, is_examining=True, in_current_subset=True)
-        
-        # Mark remaining intervals as in current subset
-        for interval in remaining:
-            self._set_visual_state(interval.id, in_current_subset=True)
-        
-        # Trace: Call start
-        self._add_step(
-            "CALL_START",
-            {
-                "call_id": call_id,
-                "depth": depth,
-                "examining": asdict(current),
-                "max_end": self._serialize_value(max_end),
-                "remaining_count": len(remaining),
-                "intervals": [asdict(i) for i in intervals]
-            },
-            f"Call #{call_id}: examining interval ({current.start}, {current.end})"
-        )
         
-        # Trace: Examining interval
         self._add_step(
-            "EXAMINING_INTERVAL",
+            "BASE_CASE",
             {
                 "call_id": call_id,
-                "interval": asdict(current),
                 "max_end": self._serialize_value(max_end),
-                "comparison": f"{current.end} vs {max_end if max_end != float('-inf') else 'None'}"
-            },
-            f"Comparing interval end ({current.end}) with max_end"
-        )
-        
-        # Make decision: Keep or covered?
-        is_covered = current.end <= max_end
-        decision = "covered" if is_covered else "keep"
-        
-        # Update call info
-        call_info['status'] = 'decided'
-        call_info['decision'] = decision
-        
-        # Update visual state based on decision
-        if is_covered:
-            self._set_visual_state(current.id, is_covered=True, is_examining=False)
-        else:
-            self._set_visual_state(current.id, is_examining=False)
-        
-        # Trace: Decision made
-        self._add_step(
-            "DECISION_MADE",
-            {
-                "call_id": call_id,
-                "interval": asdict(current),
-                "decision": decision,
-                "reason": f"end={current.end} {'<=' if is_covered else '>'} max_end={max_end if max_end != float('-inf') else 'None'}",
-                "will_keep": not is_covered
+                "description": "No intervals remaining - return empty list"
             },
-            f"Decision: {decision.upper()}"
+            self._message("BASE_CASE")
         )
         
-        if not is_covered:
-            # Keep this interval - update max_end
-            new_max_end = max(max_end, current.end)
+        # Unwind: return from calls innermost first
+        while self.call_stack:
+            call_info = self.call_stack[-1]
+            start = call_info['return_value'][0]
+            
+            # Update return value in call info: everything kept from here on
+            self._update_call(call_info, status='returning',
+                              return_value=(start, len(kept)))
             
+            # Trace: Return from call (shares the frame's serialized list)
             self._add_step(
-                "MAX_END_UPDATE",
+                "CALL_RETURN",
                 {
-                    "call_id": call_id,
-                    "interval": asdict(current),
-                    "old_max_end": self._serialize_value(max_end),
-                    "new_max_end": new_max_end
+                    "call_id": call_info['id'],
+                    "depth": call_info['depth'],
+                    "return_value": self._get_frame(call_info)['return_value'],
+                    "kept_count": len(kept) - start
                 },
-                f"Updating max_end: {max_end if max_end != float('-inf') else '-∞'} → {new_max_end}"
+                self._message("CALL_RETURN", call_info['id'], len(kept) - start)
             )
             
-            # Recurse with updated max_end
-            rest = self._filter_recursive(remaining, new_max_end)
-            result = [current] + rest
-        else:
-            # Skip this interval (it's covered)
-            result = self._filter_recursive(remaining, max_end)
+            self._pop_call()
+            yield from self._drain_steps()
         
-        # Update return value in call info
-        call_info['status'] = 'returning'
-        call_info['return_value'] = result
+        return kept
+
+
+def reconstruct_step(trace: dict, step_index: int) -> dict:
+    """
+    Rebuild the full state of a step from a (possibly delta-encoded) trace.
+    
+    Walks back to the nearest keyframe and replays the interval state
+    changes and call stack frames recorded since then.
+    
+    Args:
+        trace: The "trace" dict returned by remove_covered_intervals
+        step_index: Index of the step to rebuild
         
-        # Trace: Return from call
-        self._add_step(
-            "CALL_RETURN",
-            {
-                "call_id": call_id,
-                "depth": depth,
-                "return_value": [asdict(i) for i in result],
-                "kept_count": len(result)
-            },
-            f"Call #{call_id} returning {len(result)} interval(s)"
+    Returns:
+        The step with 'all_intervals' and 'call_stack_state' in its data,
+        exactly as it would appear in a full (non-delta) trace
+    """
+    steps = trace['steps']
+    step = steps[step_index]
+    if 'keyframe' not in step['data']:
+        return step
+    
+    keyframe_index = step_index
+    while not steps[keyframe_index]['data']['keyframe']:
+        keyframe_index -= 1
+    
+    keyframe_data = steps[keyframe_index]['data']
+    all_intervals = [
+        {**interval, 'visual_state': dict(interval['visual_state'])}
+        for interval in keyframe_data['all_intervals']
+    ]
+    call_stack_state = list(keyframe_data['call_stack_state'])
+    
+    positions = {}
+    for position, interval in enumerate(all_intervals):
+        positions.setdefault(interval['id'], []).append(position)
+    
+    for index in range(keyframe_index + 1, step_index + 1):
+        delta = steps[index]['data']
+        for change in delta['interval_changes']:
+            for position in positions[change['id']]:
+                all_intervals[position]['visual_state'] = dict(change['visual_state'])
+        call_stack_state = (
+            call_stack_state[:delta['call_stack_base']] + delta['call_stack_frames']
         )
-        
-        self.call_stack.pop()
-        return result
+    
+    data = {
+        key: value for key, value in step['data'].items()
+        if key not in ('keyframe', 'interval_changes',
+                       'call_stack_base', 'call_stack_frames')
+    }
+    data['all_intervals'] = all_intervals
+    data['call_stack_state'] = call_stack_state
+    return {**step, 'data': data}
 
 
 # Standalone test/demo
@@ -0,0 +1,148 @@
+# backend/algorithms/interval_store.py
+"""
+Array-backed interval storage.
+
+Large inputs are kept as one typed array per field instead of one Interval
+object per interval. The store can be filled in bulk from a list of
+Interval objects, from columnar JSON ({"ids": [...], "starts": [...], ...})
+or from a raw little-endian binary body, and tracers read it by row index.
+Columns that don't fit in int64 (string ids, float or huge bounds) are kept
+as plain lists instead; they index the same way.
+"""
+
+from typing import List, Optional, Sequence, Tuple, Union
+from array import array
+import sys
+
+
+# Binary bodies carry three contiguous columns: ids, starts, ends
+BINARY_DTYPES = {
+    'int32': 'i',
+    'int64': 'q',
+}
+
+DEFAULT_COLOR = 'blue'
+
+
+def _column(values: Sequence, name: str, types: Tuple[type, ...]) -> Union[array, list]:
+    """
+    Pack a column into array('q'), or a list when it doesn't fit.
+
+    Raises:
+        TypeError: If a value that doesn't fit is not one of types
+    """
+    try:
+        return array('q', values)
+    except (TypeError, OverflowError):
+        values = list(values)
+        for value in values:
+            if not isinstance(value, types):
+                allowed = ' or '.join(kind.__name__ for kind in types)
+                raise TypeError(f"{name} must hold {allowed} values, got {value!r}")
+        return values
+
+
+class IntervalStore:
+    """
+    Column-oriented interval storage: one typed array per field.
+
+    Row i is the interval (ids[i], starts[i], ends[i]) with color
+    palette[color_indexes[i]].
+    """
+
+    def __init__(self, ids: Sequence, starts: Sequence, ends: Sequence,
+                 color_indexes: array, palette: List[str]):
+        if not (len(ids) == len(starts) == len(ends) == len(color_indexes)):
+            raise ValueError("All interval columns must have the same length")
+        self.ids = ids
+        self.starts = starts
+        self.ends = ends
+        self.color_indexes = color_indexes
+        self.palette = palette
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def to_dict(self, row: int) -> dict:
+        """Serialize one row, in the same shape as asdict(Interval)."""
+        return {
+            'id': self.ids[row],
+            'start': self.starts[row],
+            'end': self.ends[row],
+            'color': self.palette[self.color_indexes[row]]
+        }
+
+    @classmethod
+    def from_intervals(cls, intervals: Sequence) -> 'IntervalStore':
+        """Build a store from Interval objects."""
+        return cls.from_columns(
+            [interval.id for interval in intervals],
+            [interval.start for interval in intervals],
+            [interval.end for interval in intervals],
+            [interval.color for interval in intervals]
+        )
+
+    @classmethod
+    def from_columns(cls, ids: Sequence[int], starts: Sequence[int],
+                     ends: Sequence[int],
+                     colors: Optional[Sequence[str]] = None) -> 'IntervalStore':
+        """
+        Build a store from parallel columns.
+
+        Raises:
+            ValueError: If the columns differ in length
+            TypeError: If ids are not numbers or strings, or starts and
+                ends are not numbers
+        """
+        if colors is None:
+            palette = [DEFAULT_COLOR]
+            color_indexes = array('l', bytes(array('l').itemsize * len(ids)))
+        else:
+            palette_indexes = {}
+            color_indexes = array('l', [
+                palette_indexes.setdefault(color, len(palette_indexes))
+                for color in colors
+            ])
+            palette = list(palette_indexes)
+
+        return cls(
+            _column(ids, 'ids', (int, float, str)),
+            _column(starts, 'starts', (int, float)),
+            _column(ends, 'ends', (int, float)),
+            color_indexes,
+            palette
+        )
+
+    @classmethod
+    def from_binary(cls, data: bytes, dtype: str = 'int32') -> 'IntervalStore':
+        """
+        Build a store from a raw little-endian body.
+
+        The body is three contiguous columns of n values each: ids, starts,
+        ends. Every interval gets the default color.
+
+        Raises:
+            ValueError: If dtype is unknown or the body size doesn't fit
+        """
+        if dtype not in BINARY_DTYPES:
+            raise ValueError(f"dtype must be one of {sorted(BINARY_DTYPES)}")
+
+        values = array(BINARY_DTYPES[dtype])
+        if len(data) % (3 * values.itemsize):
+            raise ValueError(
+                f"Binary body must hold 3 columns of {dtype} values"
+            )
+        values.frombytes(data)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        if values.typecode != 'q':
+            values = array('q', values)
+
+        count = len(values) // 3
+        return cls(
+            values[:count],
+            values[count:2 * count],
+            values[2 * count:],
+            array('l', bytes(array('l').itemsize * count)),
+            [DEFAULT_COLOR]
+        )
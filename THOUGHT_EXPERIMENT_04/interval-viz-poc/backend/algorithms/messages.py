@@ -0,0 +1,52 @@
+# backend/algorithms/messages.py
+"""
+Message templates for trace text.
+
+Step descriptions, and the comparison / reason texts inside step data, are
+built from these templates. A tracer either renders them right away or,
+for clients that render text themselves or never show it, leaves them
+unrendered: the text field then holds just the template's argument list,
+
+    {"type": "CALL_START", ..., "description": [0, 540, 660]}
+
+and the template is implied by where the field sits: the step type for
+descriptions, "<step type>.<field>" for texts inside step data.
+
+Templates only use positional {0}, {1}, ... placeholders, so a client can
+render them with a simple substitution once it has fetched the catalog.
+A null argument renders as "None".
+"""
+
+from typing import List
+
+MESSAGES = {
+    # Step descriptions, by step type
+    'INITIAL_STATE': "Original unsorted intervals",
+    'SORT_BEGIN': "Preparing to sort intervals",
+    'SORT_COMPLETE': "Intervals sorted - ready for recursion",
+    'CALL_START': "Call #{0}: examining interval ({1}, {2})",  # call_id, start, end
+    'EXAMINING_INTERVAL': "Comparing interval end ({0}) with max_end",  # end
+    'DECISION_MADE': "Decision: {0}",  # KEEP / COVERED
+    'MAX_END_UPDATE': "Updating max_end: {0} → {1}",  # old, new max_end
+    'BASE_CASE': "Base case reached",
+    'CALL_RETURN': "Call #{0} returning {1} interval(s)",  # call_id, count
+    'ALGORITHM_COMPLETE': "Algorithm complete: kept {0}/{1} intervals",  # kept, total
+
+    # Texts inside step data, by step type and field
+    'EXAMINING_INTERVAL.comparison': "{0} vs {1}",  # end, max_end
+    'DECISION_MADE.reason': "end={0} {1} max_end={2}",  # end, <= or >, max_end
+}
+
+
+def render_message(template_id: str, args: List) -> str:
+    """
+    Render a message template.
+
+    Args:
+        template_id: Key into MESSAGES
+        args: The template's positional arguments
+
+    Returns:
+        The rendered text
+    """
+    return MESSAGES[template_id].format(*args)
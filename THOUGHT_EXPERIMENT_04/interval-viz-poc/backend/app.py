@@ -1,7 +1,11 @@
 # backend/app.py
-from flask import Flask, jsonify, request
+import json
+
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from algorithms.interval_coverage import Interval, IntervalCoverageTracer
+from algorithms.interval_store import IntervalStore
+from algorithms.messages import MESSAGES
 
 app = Flask(__name__)
 CORS(app)  # Allow frontend to call backend
@@ -11,28 +15,79 @@ CORS(app)  # Allow frontend to call backend
 def generate_trace():
     """
     Accept intervals, return complete trace.
-    Frontend sends: {"intervals": [...]}
+    Frontend sends: {"intervals": [...], "keyframe_interval": K (optional),
+                     "format": "full" | "normalized" (optional),
+                     "messages": "rendered" | "templates" (optional)}
     Backend returns: {"result": [...], "trace": {...}, "metadata": {...}}
+    
+    Large inputs can be sent in bulk instead of as a list of objects:
+    - Columnar JSON: {"ids": [...], "starts": [...], "ends": [...],
+      "colors": [...] (optional)} in place of "intervals"
+    - Raw binary: "Content-Type: application/octet-stream" with three
+      contiguous little-endian columns (ids, starts, ends). The value type
+      is given by ?dtype=int32|int64 (default int32); keyframe_interval,
+      format and messages are query parameters.
+    
+    With keyframe_interval set, only every K-th step carries the full
+    visual state; the steps in between carry deltas. With format set to
+    "normalized", intervals are listed once in trace.interval_table and
+    steps reference them by id. With messages set to "templates", step
+    text is sent unrendered, as the argument lists of the templates served
+    by /api/messages.
+    
+    With "Accept: application/x-ndjson" the trace is streamed as it is
+    generated, one JSON object per line:
+        {"trace": {...trace-level fields}}
+        {"step": 0, "type": ..., ...}      (one line per step)
+        {"result": [...], "trace": {"total_steps", "duration"}, "metadata": {...}}
     """
     try:
-        data = request.json
+        if request.mimetype == 'application/octet-stream':
+            data = request.args.to_dict()
+            if 'keyframe_interval' in data:
+                try:
+                    data['keyframe_interval'] = int(data['keyframe_interval'])
+                except ValueError:
+                    pass
+        else:
+            data = request.json
+            if not data or ('intervals' not in data and 'ids' not in data):
+                return jsonify({"error": "Missing 'intervals' in request body"}), 400
         
-        if not data or 'intervals' not in data:
-            return jsonify({"error": "Missing 'intervals' in request body"}), 400
+        keyframe_interval = data.get('keyframe_interval')
+        if keyframe_interval is not None and (
+            not isinstance(keyframe_interval, int) or keyframe_interval < 1
+        ):
+            return jsonify({"error": "'keyframe_interval' must be a positive integer"}), 400
         
-        # Convert input to Interval objects
-        intervals = [
-            Interval(
-                id=i['id'],
-                start=i['start'],
-                end=i['end'],
-                color=i.get('color', 'blue')
-            )
-            for i in data['intervals']
-        ]
+        trace_format = data.get('format', 'full')
+        if trace_format not in ('full', 'normalized'):
+            return jsonify({"error": "'format' must be 'full' or 'normalized'"}), 400
+        
+        messages = data.get('messages', 'rendered')
+        if messages not in ('rendered', 'templates'):
+            return jsonify({"error": "'messages' must be 'rendered' or 'templates'"}), 400
+        
+        try:
+            intervals = parse_intervals(data)
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            return jsonify({"error": f"Invalid intervals: {e}"}), 400
         
         # Generate trace
-        tracer = IntervalCoverageTracer()
+        tracer = IntervalCoverageTracer(
+            keyframe_interval=keyframe_interval,
+            normalized=trace_format == 'normalized',
+            render_messages=messages == 'rendered'
+        )
+        
+        if request.accept_mimetypes.best_match(
+            ['application/json', 'application/x-ndjson']
+        ) == 'application/x-ndjson':
+            return Response(
+                stream_trace(tracer, intervals),
+                mimetype='application/x-ndjson'
+            )
+        
         result = tracer.remove_covered_intervals(intervals)
         
         return jsonify(result)
@@ -41,6 +96,57 @@ def generate_trace():
         return jsonify({"error": str(e)}), 500
 
 
+def parse_intervals(data):
+    """
+    Build the tracer input from the request: an IntervalStore for every
+    input form, so malformed intervals are refused before tracing starts.
+    
+    Raises:
+        KeyError: If an interval or column is missing
+        TypeError: If ids, starts or ends have unsupported values
+        ValueError: If columns differ in length or a binary body is malformed
+    """
+    if request.mimetype == 'application/octet-stream':
+        return IntervalStore.from_binary(
+            request.get_data(),
+            dtype=request.args.get('dtype', 'int32')
+        )
+    
+    if 'intervals' not in data:
+        return IntervalStore.from_columns(
+            data['ids'],
+            data['starts'],
+            data['ends'],
+            data.get('colors')
+        )
+    
+    # Convert input to Interval objects
+    return IntervalStore.from_intervals([
+        Interval(
+            id=i['id'],
+            start=i['start'],
+            end=i['end'],
+            color=i.get('color', 'blue')
+        )
+        for i in data['intervals']
+    ])
+
+
+def stream_trace(tracer, intervals):
+    """Yield NDJSON lines: trace header, one line per step, then the result."""
+    try:
+        steps = tracer.iter_steps(intervals)
+        first_step = next(steps)
+        yield json.dumps({"trace": tracer.trace_info}) + "\n"
+        yield json.dumps(first_step) + "\n"
+        for step in steps:
+            yield json.dumps(step) + "\n"
+        yield json.dumps(tracer.summary) + "\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        yield json.dumps({"error": str(e)}) + "\n"
+
+
 @app.route('/api/examples', methods=['GET'])
 def get_examples():
     """Provide pre-defined example inputs (NOT traces - just inputs!)"""
@@ -74,6 +180,12 @@ def get_examples():
     return jsonify(examples)
 
 
+@app.route('/api/messages', methods=['GET'])
+def get_messages():
+    """Message templates for traces requested with "messages": "templates"."""
+    return jsonify(MESSAGES)
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Simple health check endpoint"""
@@ -92,6 +204,7 @@ if __name__ == '__main__':
     print("📊 Available endpoints:")
     print("   POST /api/trace      - Generate algorithm trace")
     print("   GET  /api/examples   - Get example inputs")
+    print("   GET  /api/messages   - Get trace message templates")
     print("   GET  /api/health     - Health check")
     print("=" * 60)
     print()
@@ -0,0 +1,106 @@
+"""
+Tests for /api/trace input parsing: object lists, columnar JSON and binary
+bodies must give the same trace, and malformed input of any form must be
+refused with 400 before anything is streamed.
+"""
+
+import json
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import app
+
+INTERVALS = [(0, 0, 10), (1, 2, 5), (2, 4, 12), (3, 11, 15), (4, 11, 15)]
+NDJSON = {'Accept': 'application/x-ndjson'}
+
+
+def _post(body, headers=None, query=''):
+    """POST a JSON dict, or raw bytes as an octet-stream body"""
+    client = app.test_client()
+    if isinstance(body, bytes):
+        return client.post('/api/trace' + query, data=body, headers=headers,
+                           content_type='application/octet-stream')
+    return client.post('/api/trace' + query, json=body, headers=headers)
+
+
+def _object_list(intervals):
+    return {'intervals': [{'id': interval_id, 'start': start, 'end': end}
+                          for interval_id, start, end in intervals]}
+
+
+def _columns(intervals):
+    ids, starts, ends = zip(*intervals)
+    return {'ids': list(ids), 'starts': list(starts), 'ends': list(ends)}
+
+
+def _binary(intervals, typecode='i'):
+    ids, starts, ends = zip(*intervals)
+    values = array(typecode, ids + starts + ends)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _without_timestamps(payload):
+    if isinstance(payload, dict):
+        return {key: _without_timestamps(value) for key, value in payload.items()
+                if key not in ('timestamp', 'duration')}
+    if isinstance(payload, list):
+        return [_without_timestamps(value) for value in payload]
+    return payload
+
+
+def _streamed(response):
+    """The NDJSON lines of a streamed response"""
+    return [json.loads(line) for line in response.data.splitlines()]
+
+
+def test_every_input_form_gives_the_same_trace():
+    """Object list, columns and int32/int64 binary bodies trace identically"""
+    responses = [
+        _post(_object_list(INTERVALS)),
+        _post(_columns(INTERVALS)),
+        _post(_binary(INTERVALS)),
+        _post(_binary(INTERVALS, 'q'), query='?dtype=int64'),
+    ]
+    assert [response.status_code for response in responses] == [200] * 4
+    first = _without_timestamps(responses[0].get_json())
+    for response in responses[1:]:
+        assert _without_timestamps(response.get_json()) == first
+
+
+@pytest.mark.parametrize('make_body', [_object_list, _columns])
+def test_non_int64_values_are_accepted(make_body):
+    """String ids, float bounds and bounds past int64 trace as they did for object lists"""
+    intervals = [('a', 0.5, 3), ('b', 1, 2.5), (7, 2 ** 70, 2 ** 71)]
+    response = _post(make_body(intervals))
+    assert response.status_code == 200
+    assert [(row['id'], row['start'], row['end']) for row in response.get_json()['result']] == [
+        ('a', 0.5, 3), (7, 2 ** 70, 2 ** 71)
+    ]
+    streamed = _streamed(_post(make_body(intervals), NDJSON))
+    assert streamed[-1]['result'] == response.get_json()['result']
+
+
+@pytest.mark.parametrize('body, query', [
+    ({'intervals': [{'id': 0, 'start': 0}]}, ''),
+    ({'intervals': [{'id': 0, 'start': 'x', 'end': 1}]}, ''),
+    ({'intervals': [{'id': [0], 'start': 0, 'end': 1}]}, ''),
+    ({'ids': [0, 1], 'starts': [0], 'ends': [1, 2]}, ''),
+    ({'ids': [0], 'starts': [None], 'ends': [1]}, ''),
+    ({'ids': [0], 'starts': [0]}, ''),
+    (b'\x00' * 10, ''),
+    (_binary(INTERVALS), '?dtype=float32'),
+])
+def test_malformed_input_is_refused(body, query):
+    """400 for every form, with or without streaming"""
+    for headers in (None, NDJSON):
+        response = _post(body, headers, query)
+        assert response.status_code == 400
+        assert response.get_json()['error'].startswith('Invalid intervals')
@@ -0,0 +1,61 @@
+"""
+Tests for keyframe + delta encoded interval coverage traces: every step
+rebuilt with reconstruct_step must equal the same step of a full trace.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Run from the backend directory (go up one level from tests/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from algorithms.interval_coverage import Interval, IntervalCoverageTracer, reconstruct_step
+
+
+def _intervals(count, seed, duplicate_ids=False):
+    """Random intervals, with ties; optionally several sharing each id"""
+    rng = random.Random(seed)
+    intervals = []
+    for number in range(count):
+        start = rng.randrange(40)
+        interval_id = rng.randrange(count // 3 + 1) if duplicate_ids else number
+        intervals.append(Interval(interval_id, start, start + rng.randrange(1, 20), 'blue'))
+    return intervals
+
+
+def _without_timestamps(steps):
+    return [{key: value for key, value in step.items() if key != 'timestamp'}
+            for step in steps]
+
+
+@pytest.mark.parametrize('duplicate_ids', [False, True])
+@pytest.mark.parametrize('keyframe_interval', [1, 2, 3, 7, 1000])
+def test_reconstructed_steps_match_the_full_trace(keyframe_interval, duplicate_ids):
+    """Each rebuilt step has the full trace's intervals, visual states and call stack"""
+    intervals = _intervals(25, keyframe_interval, duplicate_ids)
+    full = IntervalCoverageTracer().remove_covered_intervals(intervals)
+    delta = IntervalCoverageTracer(keyframe_interval).remove_covered_intervals(intervals)
+
+    steps = delta['trace']['steps']
+    assert len(steps) == len(full['trace']['steps'])
+    assert [step['data']['keyframe'] for step in steps] == [
+        index % keyframe_interval == 0 for index in range(len(steps))
+    ]
+    rebuilt = [reconstruct_step(delta['trace'], index) for index in range(len(steps))]
+    assert _without_timestamps(rebuilt) == _without_timestamps(full['trace']['steps'])
+    assert delta['result'] == full['result']
+
+
+def test_full_trace_steps_are_left_alone():
+    """Without keyframe_interval, reconstruct_step returns the step itself"""
+    trace = IntervalCoverageTracer().remove_covered_intervals(_intervals(5, 1))['trace']
+    assert reconstruct_step(trace, 3) is trace['steps'][3]
+
+
+def test_keyframe_interval_must_be_positive():
+    """keyframe_interval below 1 is refused"""
+    with pytest.raises(ValueError):
+        IntervalCoverageTracer(0)